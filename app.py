@@ -1,611 +1,72 @@
+import csv
 import hashlib
 import hmac
 import os
+import random
 import re
 import secrets
-import smtplib
-import ssl
+import threading
+import time
 from email.message import EmailMessage
 from email.utils import formataddr
-from io import BytesIO
-from datetime import datetime, timedelta
+from io import BytesIO, StringIO, TextIOWrapper
+from datetime import date, datetime, timedelta
+from itertools import groupby
 from urllib.parse import urlparse, urljoin
 
-import qrcode
-from flask import Flask, render_template, redirect, url_for, request, flash, abort, send_file, session, has_request_context, jsonify
+from flask import Flask, render_template, redirect, url_for, request, flash, abort, send_file, session, has_request_context, jsonify, g, Response, stream_with_context
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from werkzeug.utils import secure_filename
-from sqlalchemy import func, inspect, text
-
-from models import db, User, Household, Membership, Expense, ExpenseParticipant
-from utils import generate_join_code, current_month_yyyy_mm, format_iqd, compute_net_balances, simplify_debts
-
-TRANSLATIONS = {
-    "en": {
-        "app.name": "Daxli264",
-        "menu.open": "Open menu",
-        "menu.profile": "Profile",
-        "menu.switch_theme": "Switch theme",
-        "menu.switch_to_light": "Switch to light mode",
-        "menu.switch_to_dark": "Switch to dark mode",
-        "menu.language_to_en": "Switch to English",
-        "menu.language_to_ku": "Switch to Kurdish",
-        "menu.logout": "Logout",
-        "menu.settings": "Settings",
-        "nav.dashboard": "Dashboard",
-        "nav.expenses": "Expenses",
-        "nav.household": "Room",
-        "nav.archive": "Archive",
-        "common.confirm_action": "Are you sure",
-        "common.save": "Save",
-        "common.cancel": "Cancel",
-        "common.confirm": "Confirm",
-        "common.you": "You",
-        "common.admin": "Admin",
-        "common.delete": "Delete",
-        "common.add": "Add",
-        "common.filter": "Filter",
-        "common.or": "or",
-        "common.password_placeholder": "Password",
-        "common.logo": "Logo",
-        "common.saving": "Saving...",
-        "common.sending": "Sending",
-        "login.title": "Login",
-        "login.email_label": "Email",
-        "login.password_label": "Password",
-        "login.button": "Login",
-        "login.create_account": "Create account",
-        "login.forgot_password": "Forgot password",
-        "login.email_placeholder": "you@example.com",
-        "login.password_placeholder": "********",
-        "login.email_required": "Email is required",
-        "login.email_invalid": "Please enter a valid email address",
-        "login.password_required": "Password is required",
-        "login.logging_in": "Logging in...",
-        "login.invalid_credentials": "Incorrect email or password",
-        "login.login": "Login",
-        "register.title": "Create account",
-        "register.name_label": "Name",
-        "register.email_label": "Email",
-        "register.password_label": "Password",
-        "register.confirm_password_label": "Confirm password",
-        "register.password_help": "Use at least {min_len} characters, including a letter and a number",
-        "register.password_rules_title": "Password requirements",
-        "register.password_rule_length": "At least {min_len} characters",
-        "register.password_rule_letter": "At least 1 letter (A–Z)",
-        "register.password_rule_number": "At least 1 number (0–9)",
-        "register.button": "Create account",
-        "register.creating_account": "Creating account...",
-        "register.have_account": "Already have an account",
-        "register.name_placeholder": "Name",
-        "register.email_placeholder": "you@example.com",
-        "register.password_placeholder": "********",
-        "register.email_step_title": "What's your email",
-        "register.email_step_subtitle": "We'll use this to sign you in",
-        "register.email_required": "Please enter your email",
-        "register.email_invalid": "Please enter a valid email",
-        "register.have_account_prefix": "Already have an account",
-        "register.login_link": "Sign in",
-        "register.password_step_title": "Create a password",
-        "register.password_step_subtitle": "Choose a secure password",
-        "register.password_required": "Please enter a password",
-        "register.confirm_password_required": "Please confirm your password",
-        "register.verify_step_title": "Check your email",
-        "register.verify_step_subtitle": "Enter the 6-digit code we sent to",
-        "register.start_over": "Start over",
-        "register.change_email": "Change email",
-        "register.profile_step_title": "Set up your profile",
-        "register.profile_step_subtitle": "Tell us a bit about yourself",
-        "register.upload_photo": "Add a photo",
-        "register.name_required": "Please enter your name",
-        "register.complete_button": "Complete setup",
-        "verify.verifying": "Verifying...",
-        "common.continue": "Continue",
-        "common.back": "Back",
-        "common.something_went_wrong": "Something went wrong. Please try again",
-        "welcome.change_later_note": "You can change these later in settings",
-        "reset.request_title": "Reset your password",
-        "reset.request_help": "Enter your email and we'll send a reset link",
-        "reset.email_label": "Email",
-        "reset.email_placeholder": "you@example.com",
-        "reset.request_button": "Send reset link",
-        "reset.title": "Set a new password",
-        "reset.password_label": "New password",
-        "reset.confirm_password_label": "Confirm password",
-        "reset.submit_button": "Update password",
-        "email.greeting": "Hi",
-        "email.there": "there",
-        "email.button_not_working": "If the button does not work, copy and paste this link into your browser",
-        "email.ignore_if_not_requested": "If you did not request a password reset, you can ignore this email",
-        "email.ignore_if_not_requested_account": "If you did not create a Daxli264 account, you can ignore this email",
-        "email.verify.subject": "Verify your Daxli264 email",
-        "email.verify.code_is": "Your Daxli264 verification code is",
-        "email.verify.code_help": "Enter this code in the app to verify your email. This code expires in {ttl_hours} hours",
-        "email.reset.subject": "Reset your Daxli264 password",
-        "email.reset.received_request": "We received a request to reset your Daxli264 password. This link expires in {ttl_minutes} minutes",
-        "verify.title": "Verify your email",
-        "verify.subtitle": "We sent a 6-digit code to {email}",
-        "verify.help": "Enter the code below to verify your email",
-        "verify.code_placeholder": "Enter code",
-        "verify.resend_button": "Resend code",
-        "verify.cancel_button": "Cancel and go back",
-        "verify.logout_button": "Log out",
-        "verify.didnt_receive": "Didn't receive the code? Check spam or",
-        "dashboard.welcome": "Welcome",
-        "dashboard.they_owe_you": "They owe you",
-        "dashboard.you_owe": "You owe",
-        "dashboard.settled": "Settled",
-        "dashboard.spending_by_person": "Spending by person",
-        "dashboard.household_total": "Room total",
-        "dashboard.suggested_payments": "Suggested payments",
-        "dashboard.no_payments": "No payments needed",
-        "dashboard.you_pay": "You pay",
-        "dashboard.pays": "pays",
-        "dashboard.members": "members",
-        "dashboard.since": "Since",
-        "dashboard.all_settled": "All balances are settled",
-        "expenses.title": "Expenses",
-        "expenses.add_title": "Add expense",
-        "expenses.title_label": "Title",
-        "expenses.title_placeholder": "e.g. Groceries",
-        "expenses.amount_label": "Amount (IQD)",
-        "expenses.amount_help": "Steps of 250 IQD",
-        "expenses.date_label": "Date",
-        "expenses.participants_label": "Participants",
-        "expenses.add_button": "Add",
-        "expenses.no_expenses": "No expenses yet",
-        "expenses.delete_button": "Delete",
-        "expenses.delete_confirm": "Delete this expense",
-        "expenses.filtered_by": "Filtered by",
-        "expenses.clear_filter": "Clear",
-        "expenses.add_first": "Add your first expense to get started",
-        "household.page_title": "Room",
-        "household.edit_name": "Edit Name",
-        "household.name_placeholder": "Room name",
-        "household.remove_button": "Remove",
-        "household.remove_confirm": "Remove {name} from the room",
-        "household.join_code": "Join Code",
-        "household.scan_to_join": "Scan to join",
-        "household.qr_alt": "Join room QR code",
-        "household.danger_zone": "Danger zone",
-        "household.leave_title": "Leave room",
-        "household.leave_help": "You can leave your current room and join another",
-        "household.confirm_password": "Confirm password",
-        "household.leave_button": "Leave Room",
-        "household.leave_confirm": "Leave this room",
-        "household.admin_transfer_warning": "As admin, ownership will transfer to the oldest member",
-        "household.removing": "Removing...",
-        "household.leaving": "Leaving...",
-        "setup.create_title": "Create room",
-        "setup.household_name_label": "Room name",
-        "setup.household_name_placeholder": "Room",
-        "setup.create_button": "Create",
-        "setup.join_title": "Join room",
-        "setup.join_code_label": "Join code",
-        "setup.join_code_placeholder": "CODE",
-        "setup.join_button": "Join",
-        "setup.qr_title": "Join using a QR code",
-        "setup.qr_description": "Scan live with your camera or select a QR image from your gallery",
-        "setup.qr_scan_button": "Scan with camera",
-        "setup.qr_select_button": "Select from gallery",
-        "setup.qr_modal_title": "Scan QR",
-        "setup.qr_modal_subtitle": "Join household",
-        "setup.qr_modal_help": "Point your camera at the QR code",
-        "setup.qr_close": "Close",
-        "setup.qr_detected": "Detected code",
-        "setup.qr_join_button": "Join Household",
-        "setup.qr_scan_again": "Scan Again",
-        "setup.qr_status.camera_not_supported": "Camera not supported in this browser",
-        "setup.qr_status.scanner_unavailable": "Scanner not available. Reload and try again",
-        "setup.qr_status.starting_camera": "Starting camera...",
-        "setup.qr_status.camera_blocked": "Camera access blocked. Enable permissions and try again",
-        "setup.qr_status.camera_failed": "Camera could not start. Try again",
-        "setup.qr_status.invalid_code": "This QR code is not a household join code",
-        "setup.qr_status.reading": "Reading QR...",
-        "setup.qr_status.not_found": "No QR code found in that image. Try another one",
-        "setup.qr_status.detected": "QR detected. Review to join",
-        "setup.creating": "Creating...",
-        "setup.joining": "Joining...",
-        "archive.title": "Archive",
-        "archive.sort_month": "By month",
-        "archive.sort_settle": "By settle",
-        "archive.sort_person": "By person",
-        "archive.all_months": "All months",
-        "archive.all_settles": "All settles",
-        "archive.all_members": "All members",
-        "archive.confirm_action": "Confirm action",
-        "archive.settle_active": "Settle active expenses",
-        "archive.settle_help": "This will archive all active expenses and reset balances for everyone",
-        "archive.enter_password": "Enter your password",
-        "archive.password_help": "We ask for your password to prevent accidental settles",
-        "archive.confirm_settle": "Confirm settle",
-        "archive.total_archived": "Total archived",
-        "archive.expense_count": "expense",
-        "archive.no_archived": "No archived expenses",
-        "archive.danger_zone": "Danger zone",
-        "archive.settle_button": "Settle",
-        "archive.settle_label": "settle",
-        "archive.archived_expenses": "Archived Expenses",
-        "archive.items": "items",
-        "archive.settled_appear_here": "Settled expenses will appear here",
-        "profile.title": "Profile",
-        "profile.subtitle": "Update your account details and preferences",
-        "profile.email_verified": "Email verified",
-        "profile.email_unverified": "Email not verified",
-        "profile.resend_verification": "Resend verification email",
-        "profile.upload_photo": "Upload photo",
-        "profile.picture_alt": "Profile picture",
-        "profile.password_heading": "Password",
-        "profile.current_password": "Current password",
-        "profile.current_password_placeholder": "Leave blank to keep",
-        "profile.new_password": "New password",
-        "profile.confirm_new_password": "Confirm new password",
-        "profile.password_help": "Leave password fields empty to keep your current password",
-        "profile.save_changes": "Save changes",
-        "profile.danger_zone": "Danger zone",
-        "profile.delete_title": "Delete account",
-        "profile.delete_help": "This action cannot be undone",
-        "profile.confirm_password": "Confirm password",
-        "profile.delete_button": "Delete account",
-        "profile.delete_confirm": "Delete your account? This cannot be undone",
-        "profile.preferences": "Preferences",
-        "profile.preferences_subtitle": "Customize your language and theme settings",
-        "profile.language": "Language",
-        "profile.theme": "Theme",
-        "profile.dark": "Dark",
-        "profile.light": "Light",
-        "flash.fill_all_fields": "Please fill all fields",
-        "flash.email_registered": "Email already registered. Please login",
-        "flash.invalid_login": "Invalid email or password",
-        "flash.already_in_household": "You are already in a household",
-        "flash.invalid_join_code": "Invalid join code",
-        "flash.joined_household": "Joined household {name}",
-        "flash.name_empty": "Name cannot be empty",
-        "flash.email_empty": "Email cannot be empty",
-        "flash.email_invalid": "Please enter a valid email address",
-        "flash.email_in_use": "That email is already in use",
-        "flash.email_change_cancelled": "Email change cancelled",
-        "flash.email_change_cancel_failed": "Couldn't cancel email change. Please try again",
-        "flash.enter_current_password": "Enter your current password to change it",
-        "flash.current_password_incorrect": "Current password is incorrect",
-        "flash.new_passwords_no_match": "New passwords do not match",
-        "flash.passwords_no_match": "Passwords do not match",
-        "flash.password_too_weak": "Password must be at least {min_len} characters and include a letter and a number",
-        "flash.avatar_type_invalid": "Unsupported image type. Use PNG, JPG, or WEBP",
-        "flash.profile_updated": "Profile updated",
-        "flash.verification_email_sent": "Verification code sent. Please check your inbox",
-        "flash.email_verified": "Your email has been verified",
-        "flash.email_already_verified": "Your email is already verified",
-        "flash.verification_code_invalid": "That verification code is incorrect",
-        "flash.verification_code_expired": "That verification code has expired. Please request a new one",
-        "flash.password_reset_sent": "If that email is registered, you'll receive a reset link shortly",
-        "flash.password_reset_invalid": "That reset link is invalid or has expired",
-        "flash.password_reset_success": "Your password has been updated. You can log in now",
-        "flash.household_created": "Room created. Share the join code with your roommates",
-        "flash.password_required": "Please enter your password to confirm",
-        "flash.password_incorrect": "Incorrect password",
-        "flash.admin_cant_leave": "Admins can't leave the room",
-        "flash.settle_admin_only": "Only room admins can settle expenses",
-        "flash.left_household": "You left the room",
-        "flash.delete_account_blocked": "Remove other members or leave the room before deleting your account",
-        "flash.account_deleted": "Account deleted",
-        "flash.enter_join_code": "Please enter a join code",
-        "flash.already_in_this_household": "You're already in this room",
-        "flash.switched_household": "Switched to room {name}",
-        "flash.admin_cant_switch": "Admins can't switch rooms while other members are in the room. Remove members first",
-        "flash.use_leave_household": "Use 'Leave room' to remove yourself",
-        "flash.cant_remove_admin": "You can't remove the room admin",
-        "flash.user_not_member": "User is not a member of this room",
-        "flash.member_removed": "Member removed",
-        "flash.household_name_empty": "Room name cannot be empty",
-        "flash.household_name_updated": "Room name updated",
-        "flash.title_required": "Title is required",
-        "flash.amount_positive": "Amount must be a positive integer (IQD)",
-        "flash.select_participant": "Select at least one participant (who benefits from the expense)",
-        "flash.invalid_participants": "Invalid participants selected",
-        "flash.expense_added": "Expense added",
-        "flash.only_payer_delete": "Only the payer can delete this expense",
-        "flash.expense_deleted": "Expense deleted",
-        "flash.nothing_to_settle": "Nothing to settle - no active expenses",
-        "flash.settled_up": "Settled up! Archived expenses for {month}. Balances are now reset",
-        "household.default_name": "My Household",
-    },
-    "ku": {
-        "app.name": "Daxli264",
-        "menu.open": "کردنەوەی لیست",
-        "menu.profile": "پڕۆفایل",
-        "menu.switch_theme": "گۆڕینی ڕووکار",
-        "menu.switch_to_light": "دۆخی ڕووناک",
-        "menu.switch_to_dark": "دۆخی تاریک",
-        "menu.language_to_en": "English",
-        "menu.language_to_ku": "کوردی",
-        "menu.logout": "چوونەدەرەوە",
-        "menu.settings": "ڕێکخستنەکان",
-        "nav.dashboard": "سەرەکی",
-        "nav.expenses": "خەرجییەکان",
-        "nav.household": "ژوور",
-        "nav.archive": "ئەرشیف",
-        "common.confirm_action": "دڵنیایت؟",
-        "common.save": "هەڵگرتن",
-        "common.cancel": "پاشگەزبوونەوە",
-        "common.confirm": "پشتڕاستکردنەوە",
-        "common.you": "تۆ",
-        "common.admin": "بەڕێوەبەر",
-        "common.delete": "سڕینەوە",
-        "common.add": "زیادکردن",
-        "common.filter": "فلتەر",
-        "common.or": "یان",
-        "common.password_placeholder": "وشەی تێپەڕ",
-        "common.logo": "لۆگۆ",
-        "common.saving": "خەریکە هەڵدەگیرێت...",
-        "common.sending": "ناردن...",
-        "login.title": "چوونەژوورەوە",
-        "login.email_label": "ئیمەیڵ",
-        "login.password_label": "وشەی تێپەڕ",
-        "login.button": "بچۆ ژوورەوە",
-        "login.create_account": "هەژمار دروست بکە",
-        "login.forgot_password": "وشەی تێپەڕت بیرچووە؟",
-        "login.email_placeholder": "ناو@نموونە.com",
-        "login.password_placeholder": "********",
-        "login.email_required": "ئیمەیڵ پێویستە",
-        "login.email_invalid": "تکایە ئیمەیڵێکی ڕاست بنووسە",
-        "login.password_required": "وشەی تێپەڕ بنووسە",
-        "login.logging_in": "خەریکە دەچیتە ژوورەوە...",
-        "login.invalid_credentials": "ئیمەیڵ یان وشەی تێپەڕ هەڵەیە",
-        "login.login": "چوونەژوورەوە",
-        "register.title": "دروستکردنی هەژمار",
-        "register.name_label": "ناوەکەت",
-        "register.email_label": "ئیمەیڵ",
-        "register.password_label": "وشەی تێپەڕ",
-        "register.confirm_password_label": "دووبارەکردنەوەی وشەی تێپەڕ",
-        "register.password_help": "دەبێت لانیکەم {min_len} نووسە بێت، پیت و ژمارەی تێدابێت",
-        "register.password_rules_title": "مەرجەکانی وشەی تێپەڕ",
-        "register.password_rule_length": "لانیکەم {min_len} نووسە",
-        "register.password_rule_letter": "لانیکەم ١ پیت (A–Z)",
-        "register.password_rule_number": "لانیکەم ١ ژمارە (0–9)",
-        "register.button": "تۆمارکردن",
-        "register.creating_account": "خەریکە هەژمار دروست دەکرێت...",
-        "register.have_account": "هەژمارت هەیە؟",
-        "register.name_placeholder": "ناوت لێرە بنووسە",
-        "register.email_placeholder": "name@example.com",
-        "register.password_placeholder": "********",
-        "register.email_step_title": "ئیمەیڵەکەت بنووسە",
-        "register.email_step_subtitle": "ئەم ئیمەیڵە بەکاردێت بۆ چوونەژوورەوە",
-        "register.email_required": "تکایە ئیمەیڵەکەت بنووسە",
-        "register.email_invalid": "ئیمەیڵەکە نادروستە",
-        "register.have_account_prefix": "پێشتر هەژمارت دروستکردووە؟",
-        "register.login_link": "بچۆ ژوورەوە",
-        "register.password_step_title": "وشەی تێپەڕ دابنێ",
-        "register.password_step_subtitle": "وشەیەکی بەهێز هەڵبژێرە",
-        "register.password_required": "وشەی تێپەڕ پێویستە",
-        "register.confirm_password_required": "تکایە وشەی تێپەڕ دووبارە بکەرەوە",
-        "register.verify_step_title": "ئیمەیڵەکەت بپشکنە",
-        "register.verify_step_subtitle": "کۆدێکی ٦ ژمارەییمان نارد بۆ",
-        "register.start_over": "دەستپێکردنەوە",
-        "register.change_email": "گۆڕینی ئیمەیڵ",
-        "register.profile_step_title": "ڕێکخستنی پڕۆفایل",
-        "register.profile_step_subtitle": "کەمێک زانیاری دەربارەی خۆت بنووسە",
-        "register.upload_photo": "وێنەیەک دابنێ",
-        "register.name_required": "تکایە ناوەکەت بنووسە",
-        "register.complete_button": "تەواوکردنی ڕێکخستن",
-        "verify.verifying": "خەریکە پشتڕاست دەکرێتەوە...",
-        "common.continue": "بەردەوامبە",
-        "common.back": "گەڕانەوە",
-        "common.something_went_wrong": "هەڵەیەک ڕوویدا، تکایە دووبارە هەوڵبدەوە",
-        "welcome.change_later_note": "دەتوانیت دواتر لە ڕێکخستنەکاندا ئەم زانیارییانە بگۆڕیت",
-        "reset.request_title": "گۆڕینی وشەی تێپەڕ",
-        "reset.request_help": "ئیمەیڵەکەت بنووسە بۆ ئەوەی لینکی گۆڕینت بۆ بنێرین",
-        "reset.email_label": "ئیمەیڵ",
-        "reset.email_placeholder": "you@example.com",
-        "reset.request_button": "ناردنی لینک",
-        "reset.title": "وشەی تێپەڕی نوێ",
-        "reset.password_label": "وشەی تێپەڕی نوێ",
-        "reset.confirm_password_label": "دووبارەکردنەوەی وشەی تێپەڕ",
-        "reset.submit_button": "نوێکردنەوە",
-        "email.greeting": "سڵاو",
-        "email.there": "بەکارهێنەر",
-        "email.button_not_working": "ئەگەر دوگمەکە کاری نەکرد، ئەم لینکە کۆپی بکە و لە وێبگەڕەکەتدا بیکەرەوە",
-        "email.ignore_if_not_requested": "ئەگەر تۆ داوای گۆڕینی وشەی تێپەڕت نەکردووە، دەتوانیت ئەم ئیمەیڵە پشتگوێ بخەیت",
-        "email.ignore_if_not_requested_account": "ئەگەر تۆ لە Daxli264 هەژمارت دروست نەکردووە، پشتگوێی بخە",
-        "email.verify.subject": "پشتڕاستکردنەوەی ئیمەیڵ - Daxli264",
-        "email.verify.code_is": "کۆدی پشتڕاستکردنەوەی تۆ:",
-        "email.verify.code_help": "ئەم کۆدە لە ئەپەکەدا بەکاربهێنە. کۆدەکە تەنها بۆ {ttl_hours} کاتژمێر کار دەکات",
-        "email.reset.subject": "گۆڕینی وشەی تێپەڕ - Daxli264",
-        "email.reset.received_request": "داواکارییەکمان پێگەیشت بۆ گۆڕینی وشەی تێپەڕ. ئەم لینکە بۆ {ttl_minutes} خولەک کار دەکات",
-        "verify.title": "پشتڕاستکردنەوە",
-        "verify.subtitle": "کۆدێکی ٦ ژمارەییمان نارد بۆ {email}",
-        "verify.help": "کۆدەکە لێرە بنووسە",
-        "verify.code_placeholder": "کۆدەکە بنووسە",
-        "verify.resend_button": "ناردنەوەی کۆد",
-        "verify.cancel_button": "هەڵوەشاندنەوە و گەڕانەوە",
-        "verify.logout_button": "چوونەدەرەوە",
-        "verify.didnt_receive": "کۆدەکەت پێ نەگەیشتووە؟ سپام بپشکنە یان",
-        "dashboard.welcome": "بەخێربێیت",
-        "dashboard.they_owe_you": "قەرزداری تۆن",
-        "dashboard.you_owe": "تۆ قەرزداریت",
-        "dashboard.settled": "پاکتاوکراوە",
-        "dashboard.spending_by_person": "خەرجییەکان بەپێی ئەندام",
-        "dashboard.household_total": "کۆی گشتی خەرجی ژوور",
-        "dashboard.suggested_payments": "پێشنیاری پارەدان",
-        "dashboard.no_payments": "هیچ پارەدانێک پێویست نییە",
-        "dashboard.you_pay": "تۆ دەدەیت بە",
-        "dashboard.pays": "دەدات بە",
-        "dashboard.members": "ئەندام",
-        "dashboard.since": "لە ڕێکەوتی",
-        "dashboard.all_settled": "هەموو حسابەکان پاکتاوکراون",
-        "expenses.title": "خەرجییەکان",
-        "expenses.add_title": "خەرجییەکی نوێ",
-        "expenses.title_label": "بابەت",
-        "expenses.title_placeholder": "بۆ نموونە: کڕینی سەوزە",
-        "expenses.amount_label": "بڕ (بە دینار)",
-        "expenses.amount_help": "جیاوازییەکە بە ٢٥٠ دینار دەبێت",
-        "expenses.date_label": "ڕێکەوت",
-        "expenses.participants_label": "بەشداربووان (کێ لێی سوودمەند بووە)",
-        "expenses.add_button": "زیادکردن",
-        "expenses.no_expenses": "هێشتا هیچ خەرجییەک تۆمار نەکراوە",
-        "expenses.delete_button": "سڕینەوە",
-        "expenses.delete_confirm": "دڵنیایت لە سڕینەوەی ئەم خەرجییە؟",
-        "expenses.filtered_by": "فلتەرکراوە بەپێی:",
-        "expenses.clear_filter": "لابردنی فلتەر",
-        "expenses.add_first": "بۆ دەستپێکردن، یەکەم خەرجی زیاد بکە",
-        "household.page_title": "ژوور",
-        "household.edit_name": "گۆڕینی ناوی ژوور",
-        "household.name_placeholder": "ناوی ژوور",
-        "household.remove_button": "لابردن",
-        "household.remove_confirm": "دڵنیایت لە لابردنی {name} لەم ژوورە؟",
-        "household.join_code": "کۆدی ژوور",
-        "household.scan_to_join": "سکان بکە بۆ هاتنەژوورەوە",
-        "household.qr_alt": "QR کۆدی هاتنەژوورەوە",
-        "household.danger_zone": "ناوچەی مەترسیدار",
-        "household.leave_title": "جێهێشتنی ژوور",
-        "household.leave_help": "دەتوانیت ئەم ژوورە جێبهێڵیت و بچیتە ژوورێکی تر",
-        "household.confirm_password": "وشەی تێپەڕت بنووسە",
-        "household.leave_button": "جێهێشتنی ژوور",
-        "household.leave_confirm": "دڵنیایت لە جێهێشتنی ژوورەکە؟",
-        "household.admin_transfer_warning": "وەک بەڕێوەبەر، ئەگەر بڕۆیت، بەڕێوەبەرایەتی دەدرێت بە کۆنترین ئەندام",
-        "household.removing": "خەریکە لادەبرێت...",
-        "household.leaving": "خەریکە جێدەهێڵرێت...",
-        "setup.create_title": "دروستکردنی ژوور",
-        "setup.household_name_label": "ناوی ژوور",
-        "setup.household_name_placeholder": "ناوی ژوورەکە بنووسە",
-        "setup.create_button": "دروستکردن",
-        "setup.join_title": "چوونە ناو ژوور",
-        "setup.join_code_label": "کۆدی هاتنەژوورەوە",
-        "setup.join_code_placeholder": "کۆدەکە لێرە بنووسە",
-        "setup.join_button": "بچۆ ناو ژوور",
-        "setup.qr_title": "چوونەژوورەوە بە QR کۆد",
-        "setup.qr_description": "سکان بکە یان وێنەی QR کۆدەکە لێرە دابنێ",
-        "setup.qr_scan_button": "سکانکردن بە کامێرا",
-        "setup.qr_select_button": "هەڵبژاردن لە گەلەری",
-        "setup.qr_modal_title": "سکانکردنی کۆد",
-        "setup.qr_modal_subtitle": "بۆ هاتنە ناو ژوور",
-        "setup.qr_modal_help": "کامێراکەت ڕوو لە کۆدەکە بکە",
-        "setup.qr_close": "داخستن",
-        "setup.qr_detected": "کۆد دۆزرایەوە",
-        "setup.qr_join_button": "بچۆ ناو ژوور",
-        "setup.qr_scan_again": "دووبارە سکانکردنەوە",
-        "setup.qr_status.camera_not_supported": "کامێرا لەم وێبگەڕەدا کار ناکات",
-        "setup.qr_status.scanner_unavailable": "سکانەر بەردەست نییە، لاپەڕەکە نوێ بکەرەوە",
-        "setup.qr_status.starting_camera": "خەریکە کامێرا دەکرێتەوە...",
-        "setup.qr_status.camera_blocked": "ڕێگە بە کامێرا نەدراوە، تکایە مۆڵەت بدە",
-        "setup.qr_status.camera_failed": "کامێرا نەکرایەوە، دووبارە هەوڵبدەوە",
-        "setup.qr_status.invalid_code": "ئەم کۆدە هی هیچ ژوورێک نییە",
-        "setup.qr_status.reading": "خوێندنەوەی کۆد...",
-        "setup.qr_status.not_found": "هیچ کۆدێک لەم وێنەیەدا نەدۆزرایەوە",
-        "setup.qr_status.detected": "کۆد دۆزرایەوە، پشتڕاستی بکەرەوە",
-        "setup.creating": "خەریکە دروست دەکرێت...",
-        "setup.joining": "خەریکە دەچیتە ناو ژوور...",
-        "archive.title": "ئەرشیف",
-        "archive.sort_month": "بەپێی مانگ",
-        "archive.sort_settle": "بەپێی پاکتاوکردن",
-        "archive.sort_person": "بەپێی ئەندام",
-        "archive.all_months": "هەموو مانگەکان",
-        "archive.all_settles": "هەموو پاکتاوەکان",
-        "archive.all_members": "هەموو ئەندامەکان",
-        "archive.confirm_action": "دڵنیابوونەوە",
-        "archive.settle_active": "پاکتاوکردنی خەرجییەکان",
-        "archive.settle_help": "بەمە هەموو خەرجییەکان ئەرشیف دەکرێن و حسابی هەمووان دەبێتەوە بە سفر",
-        "archive.enter_password": "وشەی تێپەڕ بنووسە",
-        "archive.password_help": "بۆ ئەوەی بە هەڵە پاکتاو نەکرێت، وشەی تێپەڕ پێویستە",
-        "archive.confirm_settle": "پاکتاوکردن",
-        "archive.total_archived": "کۆی گشتی ئەرشیفکراو",
-        "archive.expense_count": "خەرجی",
-        "archive.no_archived": "هیچ خەرجییەکی ئەرشیفکراو نییە",
-        "archive.danger_zone": "ناوچەی مەترسیدار",
-        "archive.settle_button": "پاکتاوکردنی ئێستا",
-        "archive.settle_label": "پاکتاوکردن",
-        "archive.archived_expenses": "خەرجییە ئەرشیفکراوەکان",
-        "archive.items": "دانە",
-        "archive.settled_appear_here": "خەرجییە پاکتاوکراوەکان لێرە دەردەکەون",
-        "profile.title": "پڕۆفایل",
-        "profile.subtitle": "زانیارییەکانت نوێ بکەرەوە",
-        "profile.email_verified": "ئیمەیڵ پشتڕاستکراوەتەوە",
-        "profile.email_unverified": "ئیمەیڵ پشتڕاست نەکراوەتەوە",
-        "profile.resend_verification": "ناردنەوەی ئیمەیڵی پشتڕاستکردنەوە",
-        "profile.upload_photo": "گۆڕینی وێنە",
-        "profile.picture_alt": "وێنەی پڕۆفایل",
-        "profile.password_heading": "گۆڕینی وشەی تێپەڕ",
-        "profile.current_password": "وشەی تێپەڕی ئێستا",
-        "profile.current_password_placeholder": "بەتاڵی بکە ئەگەر ناتەوێت بیگۆڕیت",
-        "profile.new_password": "وشەی تێپەڕی نوێ",
-        "profile.confirm_new_password": "دووبارەکردنەوەی وشەی تێپەڕ",
-        "profile.password_help": "ئەگەر ناتەوێت وشەی تێپەڕ بگۆڕیت، ئەم خانانە پڕ مەکەرەوە",
-        "profile.save_changes": "هەڵگرتنی گۆڕانکارییەکان",
-        "profile.danger_zone": "ناوچەی مەترسیدار",
-        "profile.delete_title": "سڕینەوەی هەژمار",
-        "profile.delete_help": "ئەم کارە ناگەڕێتەوە و هەژمارەکەت بە یەکجاری دەسڕێتەوە",
-        "profile.confirm_password": "وشەی تێپەڕ بنووسە",
-        "profile.delete_button": "سڕینەوەی هەژمار",
-        "profile.delete_confirm": "دڵنیایت لە سڕینەوەی هەژمارەکەت؟",
-        "profile.preferences": "هەڵبژاردنەکان",
-        "profile.preferences_subtitle": "زمان و ڕووکاری بەرنامە بگۆڕە",
-        "profile.language": "زمان",
-        "profile.theme": "ڕووکار",
-        "profile.dark": "تاریک",
-        "profile.light": "ڕووناک",
-        "flash.fill_all_fields": "تکایە هەموو خانەکان پڕ بکەرەوە",
-        "flash.email_registered": "ئەم ئیمەیڵە پێشتر تۆمارکراوە، تکایە بچۆ ژوورەوە",
-        "flash.invalid_login": "ئیمەیڵ یان وشەی تێپەڕ هەڵەیە",
-        "flash.already_in_household": "تۆ پێشتر لە ناو ژوورێکدایت",
-        "flash.invalid_join_code": "کۆدەکە هەڵەیە، تکایە دڵنیابەرەوە",
-        "flash.joined_household": "چوویتە ناو ژووری {name}",
-        "flash.name_empty": "ناو پێویستە",
-        "flash.email_empty": "ئیمەیڵ پێویستە",
-        "flash.email_invalid": "تکایە ئیمەیڵێکی ڕاست بنووسە",
-        "flash.email_in_use": "ئەم ئیمەیڵە پێشتر بەکارهێنراوە",
-        "flash.email_change_cancelled": "گۆڕینی ئیمەیڵ هەڵوەشێندراوە",
-        "flash.email_change_cancel_failed": "نەتوانرا گۆڕینی ئیمەیڵ هەڵبوەشێنرێتەوە، دووبارە هەوڵبدە",
-        "flash.enter_current_password": "بۆ گۆڕین، دەبێت وشەی تێپەڕی ئێستات بنووسیت",
-        "flash.current_password_incorrect": "وشەی تێپەڕی ئێستا هەڵەیە",
-        "flash.new_passwords_no_match": "وشە تێپەڕە نوێیەکان وەک یەک نین",
-        "flash.passwords_no_match": "وشە تێپەڕەکان وەک یەک نین",
-        "flash.password_too_weak": "وشەی تێپەڕ دەبێت لانیکەم {min_len} نووسە بێت و پیت و ژمارەی تێدابێت",
-        "flash.avatar_type_invalid": "جۆری وێنەکە گونجاو نییە، تەنها PNG, JPG یان WEBP",
-        "flash.profile_updated": "زانیارییەکانت نوێکرانەوە",
-        "flash.verification_email_sent": "کۆدەکە نێردرا، تکایە ئیمەیڵەکەت بپشکنە",
-        "flash.email_verified": "ئیمەیڵەکەت پشتڕاستکرایەوە",
-        "flash.email_already_verified": "ئیمەیڵەکەت پێشتر پشتڕاستکراوەتەوە",
-        "flash.verification_code_invalid": "کۆدەکە هەڵەیە",
-        "flash.verification_code_expired": "کاتی کۆدەکە بەسەرچووە، داوای یەکێکی نوێ بکە",
-        "flash.password_reset_sent": "ئەگەر ئیمەیڵەکە تۆمار کرابێت، لینکی گۆڕینت بۆ دێت",
-        "flash.password_reset_invalid": "لینکەکە هەڵەیە یان کاتی بەسەرچووە",
-        "flash.password_reset_success": "وشەی تێپەڕ گۆڕدرا، ئێستا دەتوانیت بچیتە ژوورەوە",
-        "flash.household_created": "ژوور دروستکرا، کۆدەکە بدە بە هاوڕێکانت",
-        "flash.password_required": "بۆ دڵنیابوونەوە، وشەی تێپەڕ بنووسە",
-        "flash.password_incorrect": "وشەی تێپەڕ هەڵەیە",
-        "flash.admin_cant_leave": "بەڕێوەبەر ناتوانێت ژوور جێبهێڵێت",
-        "flash.settle_admin_only": "تەنها بەڕێوەبەر دەتوانێت پاکتاو بکات",
-        "flash.left_household": "ژوورەکەت جێهێشت",
-        "flash.delete_account_blocked": "پێش سڕینەوە، دەبێت ژوورەکە جێبهێڵیت یان ئەندامەکان لادەیت",
-        "flash.account_deleted": "هەژمارەکەت سڕایەوە",
-        "flash.enter_join_code": "تکایە کۆدی هاتنەژوورەوە بنووسە",
-        "flash.already_in_this_household": "تۆ پێشتر لەم ژوورەیت",
-        "flash.switched_household": "گواسترایەوە بۆ ژووری {name}",
-        "flash.admin_cant_switch": "بەڕێوەبەر ناتوانێت ژوور بگۆڕێت تا ئەندامی تر مابێت",
-        "flash.use_leave_household": "بۆ دەرچوون 'جێهێشتنی ژوور' بەکاربهێنە",
-        "flash.cant_remove_admin": "ناتوانیت بەڕێوەبەری ژوور لابەیت",
-        "flash.user_not_member": "ئەم بەکارهێنەرە ئەندامی ئەم ژوورە نییە",
-        "flash.member_removed": "ئەندامەکە لابرا",
-        "flash.household_name_empty": "ناوی ژوور نابێت بەتاڵ بێت",
-        "flash.household_name_updated": "ناوی ژوور گۆڕدرا",
-        "flash.title_required": "ناونیشانی خەرجی بنووسە",
-        "flash.amount_positive": "بڕی پارە دەبێت ژمارەیەکی دروست بێت",
-        "flash.select_participant": "لانیکەم یەک کەس دیاری بکە کە خەرجییەکە دەگرێتەوە",
-        "flash.invalid_participants": "بەشداربووی هەڵە دیاری کراوە",
-        "flash.expense_added": "خەرجییەکە زیادکرا",
-        "flash.only_payer_delete": "تەنها ئەو کەسەی پارەکەی داوە دەتوانێت بیسڕێتەوە",
-        "flash.expense_deleted": "خەرجییەکە سڕایەوە",
-        "flash.nothing_to_settle": "هیچ خەرجییەک نییە بۆ پاکتاوکردن",
-        "flash.settled_up": "هەموو حسابەکان پاکتاوکران بۆ مانگی {month}",
-        "household.default_name": "ژوورەکەی من",
-    },
-}
+from sqlalchemy import and_, false, func, or_
+from sqlalchemy.orm import aliased
+
+import database
+import emails
+import importer
+import jobs
+import ledger
+import mailer
+import migrations
+from models import db, User, Household, Membership, Expense, ExpenseParticipant, HouseholdBalance, SettleSession, SettleSessionBalance
+from translations import get_translations
+from utils import generate_join_code, current_month_yyyy_mm, current_month_start, parse_iso_date, month_bounds, format_iqd, split_amount, simplify_debts_for_mode, net_balances_from_totals, encode_cursor, decode_cursor, DEBT_MODES, LRUTTLCache
+
 
 def create_app():
+    """Build the app. Nothing touches the database here, so workers boot without waiting on it:
+
+        gunicorn -k gthread --threads 4 'app:create_app()'
+
+    With threaded workers a request waiting on the database, SMTP or a slow
+    client only holds its own thread instead of the whole worker. Rendering
+    still holds the GIL, so a few threads per CPU is the useful range, and
+    never more than the database pool (DB_POOL_SIZE + DB_MAX_OVERFLOW).
+    Background jobs (emails, purges) run in their own process next to it:
+
+        python app.py worker
+    """
     app = Flask(__name__)
     app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "dev-secret-change-me")
     app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///roommates.db")
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    # Connection pool (ignored for in-memory SQLite); pool_recycle -1 keeps connections forever
+    app.config["DB_POOL_SIZE"] = max(1, int(os.environ.get("DB_POOL_SIZE", "5")))
+    app.config["DB_MAX_OVERFLOW"] = max(0, int(os.environ.get("DB_MAX_OVERFLOW", "10")))
+    app.config["DB_POOL_TIMEOUT_SECONDS"] = max(1, int(os.environ.get("DB_POOL_TIMEOUT_SECONDS", "30")))
+    app.config["DB_POOL_RECYCLE_SECONDS"] = int(os.environ.get("DB_POOL_RECYCLE_SECONDS", "1800"))
+    app.config["DB_POOL_PRE_PING"] = os.environ.get("DB_POOL_PRE_PING", "1") == "1"
+    # Per-statement limit on PostgreSQL/MySQL (0 = none)
+    app.config["DB_STATEMENT_TIMEOUT_MS"] = max(0, int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", "0")))
+    # SQLite pragmas set on every new connection; an empty mode leaves SQLite's default
+    app.config["SQLITE_JOURNAL_MODE"] = os.environ.get("SQLITE_JOURNAL_MODE", "WAL").strip()
+    app.config["SQLITE_SYNCHRONOUS"] = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL").strip()
+    app.config["SQLITE_BUSY_TIMEOUT_MS"] = max(0, int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "15000")))
+    app.config["SQLITE_MMAP_SIZE"] = max(0, int(os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))))
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = database.engine_options(app.config)
+    # Read replicas (comma-separated URLs) for the GET views in REPLICA_READ_ENDPOINTS
+    app.config["DATABASE_REPLICA_URLS"] = [u.strip() for u in os.environ.get("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+    # After a write, the same user reads from the primary for this long so they see their change
+    app.config["DB_REPLICA_STICKY_SECONDS"] = max(0, int(os.environ.get("DB_REPLICA_STICKY_SECONDS", "15")))
     app.config["SESSION_COOKIE_HTTPONLY"] = True
     app.config["SESSION_COOKIE_SAMESITE"] = os.environ.get("SESSION_COOKIE_SAMESITE", "Lax")
     app.config["SESSION_COOKIE_SECURE"] = os.environ.get("SESSION_COOKIE_SECURE", "0") == "1"
@@ -633,17 +94,43 @@ def create_app():
     app.config["MAIL_USE_SSL"] = os.environ.get("MAIL_USE_SSL", "0") == "1"
     app.config["MAIL_FROM"] = os.environ.get("MAIL_FROM", "no-reply@example.com")
     app.config["MAIL_TIMEOUT_SECONDS"] = max(1, int(os.environ.get("MAIL_TIMEOUT_SECONDS", "10")))
+    # SMTP connections kept open per process and reused across emails
+    app.config["MAIL_POOL_SIZE"] = max(1, int(os.environ.get("MAIL_POOL_SIZE", "2")))
+    app.config["MAIL_POOL_MAX_IDLE_SECONDS"] = max(1, int(os.environ.get("MAIL_POOL_MAX_IDLE_SECONDS", "60")))
+    app.config["MAIL_POOL_MAX_MESSAGES"] = max(1, int(os.environ.get("MAIL_POOL_MAX_MESSAGES", "100")))
+    app.config["MAIL_POOL_CHECK_SECONDS"] = max(0, int(os.environ.get("MAIL_POOL_CHECK_SECONDS", "5")))
+    # Email every member their payments when the household settles
+    app.config["SETTLE_NOTIFY_EMAILS"] = os.environ.get("SETTLE_NOTIFY_EMAILS", "1") == "1"
+    app.config["DASHBOARD_CACHE_SIZE"] = max(0, int(os.environ.get("DASHBOARD_CACHE_SIZE", "512")))
+    app.config["DASHBOARD_CACHE_TTL_SECONDS"] = max(1, int(os.environ.get("DASHBOARD_CACHE_TTL_SECONDS", "300")))
+    app.config["LIST_PAGE_SIZE"] = max(1, int(os.environ.get("LIST_PAGE_SIZE", "50")))
+    app.config["EXPENSE_BATCH_MAX"] = max(1, int(os.environ.get("EXPENSE_BATCH_MAX", "500")))
+    # Households with at least this many expenses are purged in the background (0 disables)
+    app.config["BACKGROUND_PURGE_MIN_EXPENSES"] = max(0, int(os.environ.get("BACKGROUND_PURGE_MIN_EXPENSES", "20000")))
+    # Background jobs: worker threads started in each app process; by default none, and
+    # `python app.py worker` runs the queue (every gunicorn worker would otherwise poll it)
+    app.config["JOB_WORKER_THREADS"] = max(0, int(os.environ.get("JOB_WORKER_THREADS", "0")))
+    app.config["JOB_POLL_SECONDS"] = max(0.1, float(os.environ.get("JOB_POLL_SECONDS", "1")))
+    app.config["JOB_MAX_ATTEMPTS"] = max(1, int(os.environ.get("JOB_MAX_ATTEMPTS", "5")))
+    app.config["JOB_RETRY_BASE_SECONDS"] = max(1, int(os.environ.get("JOB_RETRY_BASE_SECONDS", "30")))
+    app.config["JOB_LOCK_TIMEOUT_SECONDS"] = max(60, int(os.environ.get("JOB_LOCK_TIMEOUT_SECONDS", "900")))
+    app.config["JOB_RETENTION_DAYS"] = max(1, int(os.environ.get("JOB_RETENTION_DAYS", "7")))
+    app.config["AVATAR_MAX_PIXELS"] = max(64, int(os.environ.get("AVATAR_MAX_PIXELS", "512")))
 
     db.init_app(app)
+    with app.app_context():
+        database.configure_engine(db.engine, app.config)
+    db_replicas = database.create_replica_engines(app.config)
+    app.extensions["db_replicas"] = db_replicas
 
     def get_lang():
         # Check session first, then cookie, then default to 'en'
         lang = (session.get("lang") or request.cookies.get("lang") or "en").lower()
         return "ku" if lang == "ku" else "en"
 
-    def t(key: str, **kwargs) -> str:
-        lang = get_lang()
-        text = TRANSLATIONS.get(lang, {}).get(key) or TRANSLATIONS.get("en", {}).get(key) or key
+    def translate(lang: str, key: str, /, **kwargs) -> str:
+        translations = get_translations()
+        text = translations.get(lang, {}).get(key) or translations.get("en", {}).get(key) or key
         if kwargs:
             try:
                 text = text.format(**kwargs)
@@ -651,6 +138,9 @@ def create_app():
                 pass
         return text
 
+    def t(key: str, /, **kwargs) -> str:
+        return translate(get_lang(), key, **kwargs)
+
     app.jinja_env.globals["t"] = t
     app.jinja_env.globals["password_min_length"] = app.config["PASSWORD_MIN_LENGTH"]
 
@@ -728,16 +218,40 @@ def create_app():
     def email_enabled() -> bool:
         return bool(app.config["MAIL_HOST"])
 
+    def print_email(to_email: str, subject: str, text_body: str) -> None:
+        # Print to terminal for development
+        print("\n" + "=" * 60)
+        print(f"EMAIL TO: {to_email}")
+        print(f"SUBJECT: {subject}")
+        print("-" * 60)
+        print(text_body)
+        print("=" * 60 + "\n")
+
     def send_email(to_email: str, subject: str, text_body: str, html_body=None) -> bool:
+        """Queue an email for the job workers; delivery (and retries) happen outside the request."""
         if not email_enabled():
-            # Print to terminal for development
-            print("\n" + "=" * 60)
-            print(f"EMAIL TO: {to_email}")
-            print(f"SUBJECT: {subject}")
-            print("-" * 60)
-            print(text_body)
-            print("=" * 60 + "\n")
+            print_email(to_email, subject, text_body)
             return True  # Return True so the flow continues
+        jobs.enqueue("email", {"to_email": to_email, "subject": subject, "text_body": text_body, "html_body": html_body})
+        db.session.commit()
+        return True
+
+    mail_pool = mailer.SMTPPool(
+        host=app.config["MAIL_HOST"],
+        port=app.config["MAIL_PORT"],
+        username=app.config["MAIL_USERNAME"],
+        password=app.config["MAIL_PASSWORD"],
+        use_tls=app.config["MAIL_USE_TLS"],
+        use_ssl=app.config["MAIL_USE_SSL"],
+        timeout=app.config["MAIL_TIMEOUT_SECONDS"],
+        size=app.config["MAIL_POOL_SIZE"],
+        max_idle_seconds=app.config["MAIL_POOL_MAX_IDLE_SECONDS"],
+        max_messages=app.config["MAIL_POOL_MAX_MESSAGES"],
+        check_after_seconds=app.config["MAIL_POOL_CHECK_SECONDS"],
+    )
+    app.extensions["mail_pool"] = mail_pool
+
+    def build_email_message(to_email: str, subject: str, text_body: str, html_body=None) -> EmailMessage:
         msg = EmailMessage()
         msg["Subject"] = subject
         msg["From"] = formataddr(("Daxli264", app.config["MAIL_FROM"]))
@@ -745,53 +259,33 @@ def create_app():
         msg.set_content(text_body or "")
         if html_body:
             msg.add_alternative(html_body, subtype="html")
+        return msg
 
-        host = app.config["MAIL_HOST"]
-        port = app.config["MAIL_PORT"]
-        username = app.config["MAIL_USERNAME"]
-        password = app.config["MAIL_PASSWORD"]
+    def deliver_email(to_email: str, subject: str, text_body: str, html_body=None) -> None:
+        """Send one email over a pooled SMTP connection; raises on failure so the job is retried."""
+        mail_pool.send(build_email_message(to_email, subject, text_body, html_body))
 
-        try:
-            timeout = app.config["MAIL_TIMEOUT_SECONDS"]
-            if app.config["MAIL_USE_SSL"]:
-                context = ssl.create_default_context()
-                with smtplib.SMTP_SSL(host, port, context=context, timeout=timeout) as smtp:
-                    smtp.ehlo()
-                    if username:
-                        smtp.login(username, password)
-                    smtp.send_message(msg)
-            else:
-                with smtplib.SMTP(host, port, timeout=timeout) as smtp:
-                    smtp.ehlo()
-                    if app.config["MAIL_USE_TLS"]:
-                        context = ssl.create_default_context()
-                        smtp.starttls(context=context)
-                        smtp.ehlo()
-                    if username:
-                        smtp.login(username, password)
-                    smtp.send_message(msg)
-        except (smtplib.SMTPException, OSError):
-            app.logger.exception("Email send failed: to=%s subject=%s", to_email, subject)
-            return False
-        return True
+    email_renderer = emails.EmailRenderer(app.jinja_env, translate)
+    app.extensions["email_renderer"] = email_renderer
 
     def send_verification_email(user: User, code: str) -> bool:
         if not email_enabled():
             print(f"Email verification code for {user.email}: {code}")
             return False
-        text_body = render_template(
-            "emails/verify_email.txt",
-            user=user,
-            code=code,
-            ttl_hours=app.config["EMAIL_VERIFICATION_TTL_HOURS"],
-        )
-        html_body = render_template(
-            "emails/verify_email.html",
+        rendered = email_renderer.render(
+            "verify_email",
+            get_lang(),
+            "email.verify.subject",
             user=user,
             code=code,
             ttl_hours=app.config["EMAIL_VERIFICATION_TTL_HOURS"],
         )
-        return send_email(user.email, t("email.verify.subject"), text_body, html_body)
+        return send_email(user.email, *rendered)
+
+    def send_registration_code(email: str, code: str) -> bool:
+        # The account does not exist yet, so there is no name to greet
+        rendered = email_renderer.render("verify_email", get_lang(), "email.verify.subject", user={"name": None}, code=code, ttl_hours=1)
+        return send_email(email, *rendered)
 
     def send_password_reset_email(user: User, token: str) -> bool:
         reset_url = build_external_url("reset_password", token=token)
@@ -801,63 +295,133 @@ def create_app():
                 return True
             app.logger.warning("Email not configured; password reset email not sent for %s", user.email)
             return False
-        text_body = render_template(
-            "emails/reset_password.txt",
-            user=user,
-            reset_url=reset_url,
-            ttl_minutes=app.config["PASSWORD_RESET_TTL_MINUTES"],
-        )
-        html_body = render_template(
-            "emails/reset_password.html",
+        rendered = email_renderer.render(
+            "reset_password",
+            get_lang(),
+            "email.reset.subject",
             user=user,
             reset_url=reset_url,
             ttl_minutes=app.config["PASSWORD_RESET_TTL_MINUTES"],
         )
-        return send_email(user.email, t("email.reset.subject"), text_body, html_body)
-
-    def ensure_user_schema() -> None:
-        inspector = inspect(db.engine)
-        if "user" not in inspector.get_table_names():
+        return send_email(user.email, *rendered)
+
+    def notify_settle(settle_id: str, lang: str, archive_url: str) -> None:
+        """Email each verified member of a settle session what they pay or receive.
+
+        All summaries are rendered in one pass and sent over a single SMTP
+        connection; recipients whose copy was not delivered get their own
+        email job, so a retry never resends to the others.
+        """
+        settle_session = db.session.get(SettleSession, settle_id)
+        household = db.session.get(Household, settle_session.household_id) if settle_session else None
+        if household is None or household.deleted_at is not None:
             return
-        existing = {col["name"] for col in inspector.get_columns("user")}
-        table = db.engine.dialect.identifier_preparer.quote("user")
-        dialect = db.engine.dialect.name
-        bool_default = "TRUE" if dialect in ("postgresql", "mysql") else "1"
-        datetime_type = "TIMESTAMP" if dialect in ("postgresql", "mysql") else "DATETIME"
-        updates = {
-            "email_verified": f"BOOLEAN NOT NULL DEFAULT {bool_default}",
-            "email_verification_token_hash": "VARCHAR(64)",
-            "email_verification_sent_at": datetime_type,
-            "password_reset_token_hash": "VARCHAR(64)",
-            "password_reset_sent_at": datetime_type,
-            "password_reset_expires_at": datetime_type,
+        net = {
+            uid: int(net_iqd)
+            for uid, net_iqd in db.session.query(SettleSessionBalance.user_id, SettleSessionBalance.net_iqd).filter_by(settle_id=settle_id)
         }
-        with db.engine.begin() as conn:
-            for col, sql_type in updates.items():
-                if col not in existing:
-                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {col} {sql_type}"))
+        user_ids = set(net) | {settle_session.settled_by_id}
+        users = {u.id: u for u in User.query.filter(User.id.in_(user_ids))}
+        transfers = simplify_debts_for_mode(net, household.debt_mode)
+
+        def name_of(uid):
+            return users[uid].name if uid in users else "?"
+
+        recipients = [
+            {
+                "user": u,
+                "pays": [(name_of(to), amt) for frm, to, amt in transfers if frm == u.id],
+                "receives": [(name_of(frm), amt) for frm, to, amt in transfers if to == u.id],
+            }
+            for u in sorted(users.values(), key=lambda u: u.id)
+            if u.id in net and u.email_verified and u.deleted_at is None
+        ]
+        if not recipients:
+            return
+        settled_by = users.get(settle_session.settled_by_id)
+        rendered = email_renderer.render_many(
+            "settle_summary",
+            lang,
+            "email.settle.subject",
+            recipients,
+            household_name=household.name,
+            settled_by_name=settled_by.name if settled_by else household.name,
+            expense_count=settle_session.expense_count,
+            total_iqd=settle_session.total_iqd,
+            start_date=settle_session.start_date,
+            end_date=settle_session.end_date,
+            archive_url=archive_url,
+        )
+        if not email_enabled():
+            for r, email in zip(recipients, rendered):
+                print_email(r["user"].email, email.subject, email.text_body)
+            return
+
+        messages = [build_email_message(r["user"].email, *email) for r, email in zip(recipients, rendered)]
+        failed = {id(msg) for msg, _error in mail_pool.send_many(messages)}
+        for r, email, msg in zip(recipients, rendered, messages):
+            if id(msg) in failed:
+                jobs.enqueue("email", {"to_email": r["user"].email, **email._asdict()})
+        if failed:
+            db.session.commit()
+            app.logger.warning("Settle %s: %s of %s summaries queued for retry", settle_id, len(failed), len(messages))
 
     login_manager = LoginManager()
     login_manager.login_view = "login"
     login_manager.session_protection = "strong"
     login_manager.init_app(app)
 
-    with app.app_context():
-        ensure_user_schema()
-
     @login_manager.user_loader
     def load_user(user_id):
-        return db.session.get(User, int(user_id))
+        u = db.session.get(User, int(user_id))
+        return u if u and u.deleted_at is None else None
+
+    def schedule_purge(household_ids=(), user_ids=()) -> None:
+        """Queue a purge job for soft-deleted households and users; it commits with the caller."""
+        jobs.enqueue("purge", {"household_ids": list(household_ids), "user_ids": list(user_ids)})
+
+    def remove_household(hid: int, purge_user_ids=()) -> bool:
+        """Delete a household and all of its data; the caller commits.
+
+        Very large households are only detached here (members removed and
+        deleted_at set) and purged in the background, followed by any
+        purge_user_ids the caller marks deleted. Returns True in that case.
+        """
+        threshold = app.config["BACKGROUND_PURGE_MIN_EXPENSES"]
+        if threshold and db.session.query(func.count(Expense.id)).filter(Expense.household_id == hid).scalar() >= threshold:
+            Membership.query.filter_by(household_id=hid).delete(synchronize_session=False)
+            Household.query.filter_by(id=hid).update({Household.deleted_at: datetime.utcnow()})
+            schedule_purge(household_ids=[hid], user_ids=purge_user_ids)
+            return True
+        ledger.delete_household(hid)
+        return False
+
+    # Process-local cache of computed dashboard balances, keyed on (household_id, household.version)
+    balance_cache = LRUTTLCache(app.config["DASHBOARD_CACHE_SIZE"], app.config["DASHBOARD_CACHE_TTL_SECONDS"])
+    # Rendered join-code QR PNGs, keyed by join URL (a new code means a new key)
+    qr_cache = LRUTTLCache(256, 3600)
 
     @app.template_filter("iqd")
     def _iqd(v):
         return format_iqd(v)
 
-    def get_household_id_or_none():
+    def get_membership_or_none():
+        # Memoised on flask.g so each request runs the membership query at most once
         if not current_user.is_authenticated:
             return None
-        m = Membership.query.filter_by(user_id=current_user.id).first()
-        return m.household_id if m else None
+        if "membership" not in g:
+            m = Membership.query.filter_by(user_id=current_user.id).first()
+            g.membership = (m, m.household_id if m else None)
+        return g.membership[0]
+
+    def get_household_id_or_none():
+        if get_membership_or_none() is None:
+            return None
+        return g.membership[1]
+
+    def invalidate_membership_cache():
+        """Forget the request's cached membership; call after joining, leaving or removing members."""
+        g.pop("membership", None)
 
     def require_household_id():
         hid = get_household_id_or_none()
@@ -875,6 +439,96 @@ def create_app():
         )
         return rows
 
+    def load_dashboard_data(user_id: int):
+        """Load the user's household, its members and their ledger totals in one round trip.
+
+        Returns (household, members, totals_by_user_id) or None when the user has no household.
+        """
+        me = aliased(Membership)
+        rows = (
+            db.session.query(
+                me,
+                Household,
+                User,
+                HouseholdBalance.paid_iqd,
+                HouseholdBalance.consumed_num,
+                HouseholdBalance.consumed_den,
+            )
+            .select_from(me)
+            .join(Household, Household.id == me.household_id)
+            .join(Membership, Membership.household_id == me.household_id)
+            .join(User, User.id == Membership.user_id)
+            .outerjoin(
+                HouseholdBalance,
+                (HouseholdBalance.household_id == Membership.household_id)
+                & (HouseholdBalance.user_id == Membership.user_id),
+            )
+            .filter(me.user_id == user_id)
+            .all()
+        )
+        if not rows:
+            g.membership = (None, None)
+            return None
+        membership, household = rows[0][0], rows[0][1]
+        g.membership = (membership, household.id)
+        members = []
+        totals = {}
+        for _m, h, u, paid, num, den in rows:
+            if h.id != household.id:
+                continue
+            members.append(u)
+            totals[u.id] = (int(paid or 0), int(num or 0), int(den or 1))
+        return household, members, totals
+
+    def keyset_after(keys, values):
+        """Condition matching rows strictly after `values` in the ordering described by keys.
+
+        keys are (column, descending, nullable) triples; nullable columns sort NULLs last.
+        """
+        branches = []
+        for i, (col, desc, nullable) in enumerate(keys):
+            v = values[i]
+            if v is None:
+                # NULLs sort last in either direction, so no value of this column comes after one
+                after = false()
+            else:
+                after = col < v if desc else col > v
+                if nullable:
+                    after = or_(after, col.is_(None))
+            prefix = [c.is_(None) if pv is None else c == pv for (c, _d, _n), pv in zip(keys[:i], values[:i])]
+            branches.append(and_(*prefix, after))
+        return or_(*branches)
+
+    def keyset_page(q, keys, cursor: str, key_of):
+        """Return (rows, next_cursor) for one page of q ordered by keys.
+
+        The last key must be unique (the primary key); key_of(row) returns the row's key values.
+        """
+        page_size = app.config["LIST_PAGE_SIZE"]
+        values = decode_cursor(cursor) if cursor else None
+        if values is not None and len(values) == len(keys):
+            q = q.filter(keyset_after(keys, values))
+        order = []
+        for col, desc, nullable in keys:
+            clause = col.desc() if desc else col.asc()
+            order.append(clause.nullslast() if nullable else clause)
+        rows = q.order_by(*order).limit(page_size + 1).all()
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = encode_cursor(key_of(rows[-1]))
+        return rows, next_cursor
+
+    def wants_page_fragment() -> bool:
+        # Infinite-scroll requests only need the list items; tab navigation sends "fetch" and gets the full page
+        return bool(request.args.get("cursor")) and request.headers.get("X-Requested-With") == "page-fragment"
+
+    def add_missing_users(user_by_id: dict, user_ids) -> None:
+        missing_ids = set(user_ids) - set(user_by_id.keys())
+        if missing_ids:
+            for u in User.query.filter(User.id.in_(missing_ids)).all():
+                user_by_id[u.id] = u
+
     def is_household_owner(household_id: int) -> bool:
         h = db.session.get(Household, household_id)
         if not h:
@@ -899,6 +553,81 @@ def create_app():
                 return path
         return None
 
+    def process_avatar(user_id: int) -> None:
+        """Apply EXIF rotation and shrink an uploaded avatar in place (runs as a background job)."""
+        path = avatar_path_for(user_id)
+        if not path:
+            return
+        try:
+            from PIL import Image, ImageOps
+        except ImportError:
+            return  # Pillow is optional; avatars are then served as uploaded
+        max_px = app.config["AVATAR_MAX_PIXELS"]
+        with Image.open(path) as img:
+            fmt = img.format
+            upright = img.getexif().get(0x0112, 1) == 1  # EXIF Orientation
+            if upright and img.width <= max_px and img.height <= max_px:
+                return
+            processed = ImageOps.exif_transpose(img)
+            processed.thumbnail((max_px, max_px))
+            if fmt == "JPEG" and processed.mode not in ("RGB", "L"):
+                processed = processed.convert("RGB")
+            tmp_path = path + ".tmp"
+            processed.save(tmp_path, format=fmt, quality=85)
+        os.replace(tmp_path, path)
+
+    jobs.register("email", lambda payload: deliver_email(**payload))
+    jobs.register("avatar", lambda payload: process_avatar(payload["user_id"]))
+    jobs.register("purge", lambda payload: ledger.purge_deleted(payload["household_ids"], payload["user_ids"]))
+    jobs.register("settle_notify", lambda payload: notify_settle(**payload))
+
+    job_workers = []
+    job_workers_lock = threading.Lock()
+
+    # Read-only views that may be served from a replica
+    REPLICA_READ_ENDPOINTS = {"dashboard", "expenses", "archive", "household", "avatar"}
+
+    schema_checked = []
+
+    @app.before_request
+    def require_current_schema():
+        # Migrations run once per deploy (python app.py migrate); serving processes only check the version
+        if schema_checked:
+            return None
+        version = migrations.current_version()
+        if version < migrations.LATEST_VERSION:
+            app.logger.error("Database schema is at version %s, expected %s; run `python app.py migrate`", version, migrations.LATEST_VERSION)
+            abort(503)
+        schema_checked.append(version)
+        return None
+
+    @app.before_request
+    def route_reads_to_replica():
+        g.db_replica = None
+        if not db_replicas or request.method not in ("GET", "HEAD") or request.endpoint not in REPLICA_READ_ENDPOINTS:
+            return None
+        if session.get("db_primary_until", 0) > time.time():
+            return None
+        g.db_replica = random.choice(db_replicas)
+        return None
+
+    @app.after_request
+    def stick_to_primary_after_write(response):
+        # Replicas lag the primary; keep this user's reads on the primary for a while
+        if db_replicas and request.method not in ("GET", "HEAD", "OPTIONS"):
+            session["db_primary_until"] = time.time() + app.config["DB_REPLICA_STICKY_SECONDS"]
+        return response
+
+    @app.before_request
+    def start_job_workers():
+        # Started lazily so CLI commands and imports do not spawn threads
+        if job_workers or not app.config["JOB_WORKER_THREADS"]:
+            return None
+        with job_workers_lock:
+            if not job_workers:
+                job_workers.extend(jobs.start_workers(app, app.config["JOB_WORKER_THREADS"]))
+        return None
+
     @app.context_processor
     def inject_household_state():
         return {
@@ -993,9 +722,7 @@ def create_app():
 
         # Send verification email
         try:
-            html_body = render_template("emails/verify_email.html", user={"name": None}, code=code, ttl_hours=1)
-            text_body = render_template("emails/verify_email.txt", user={"name": None}, code=code, ttl_hours=1)
-            send_email(email, "Verify your Daxli264 email", text_body, html_body)
+            send_registration_code(email, code)
         except Exception as e:
             app.logger.error(f"Failed to send verification email: {e}")
 
@@ -1043,9 +770,7 @@ def create_app():
 
         email = session["reg_email"]
         try:
-            html_body = render_template("emails/verify_email.html", user={"name": None}, code=code, ttl_hours=1)
-            text_body = render_template("emails/verify_email.txt", user={"name": None}, code=code, ttl_hours=1)
-            send_email(email, "Verify your Daxli264 email", text_body, html_body)
+            send_registration_code(email, code)
             flash(t("flash.verification_email_sent"), "success")
         except Exception as e:
             app.logger.error(f"Failed to send verification email: {e}")
@@ -1100,6 +825,8 @@ def create_app():
                 os.makedirs(avatar_dir(), exist_ok=True)
                 dest = os.path.join(avatar_dir(), f"user_{u.id}{ext}")
                 avatar_file.save(dest)
+                jobs.enqueue("avatar", {"user_id": u.id})
+                db.session.commit()
 
         session.permanent = True
         login_user(u, remember=True)
@@ -1374,13 +1101,15 @@ def create_app():
             flash(t("flash.already_in_household"), "info")
             return redirect(url_for("dashboard"))
 
-        h = Household.query.filter_by(join_code=code).first()
+        h = Household.query.filter_by(join_code=code, deleted_at=None).first()
         if not h:
             flash(t("flash.invalid_join_code"), "error")
             return redirect(url_for("setup_household"))
 
         db.session.add(Membership(user_id=current_user.id, household_id=h.id))
+        ledger.rebuild_household(h.id)
         db.session.commit()
+        invalidate_membership_cache()
         flash(t("flash.joined_household", name=h.name), "success")
         return redirect(url_for("dashboard"))
 
@@ -1451,6 +1180,7 @@ def create_app():
                 if os.path.exists(old_path):
                     os.remove(old_path)
             avatar_file.save(os.path.join(avatar_dir(), f"user_{current_user.id}{ext}"))
+            jobs.enqueue("avatar", {"user_id": current_user.id})
 
         email_changed = email != current_user.email
         if email_changed:
@@ -1499,6 +1229,7 @@ def create_app():
 
         db.session.add(Membership(user_id=current_user.id, household_id=h.id))
         db.session.commit()
+        invalidate_membership_cache()
 
         flash(t("flash.household_created"), "success")
         # After creating a household during initial setup, send the user to the dashboard
@@ -1512,7 +1243,7 @@ def create_app():
             return redirect(url_for("household"))
 
         code = request.form.get("join_code", "").strip().upper()
-        h = Household.query.filter_by(join_code=code).first()
+        h = Household.query.filter_by(join_code=code, deleted_at=None).first()
         if not h:
             if request.headers.get("X-Requested-With") == "XMLHttpRequest":
                 return jsonify({"error": t("flash.invalid_join_code")}), 400
@@ -1520,7 +1251,9 @@ def create_app():
             return redirect(url_for("setup_household"))
 
         db.session.add(Membership(user_id=current_user.id, household_id=h.id))
+        ledger.rebuild_household(h.id)
         db.session.commit()
+        invalidate_membership_cache()
         flash(t("flash.joined_household", name=h.name), "success")
         return redirect(url_for("dashboard"))
 
@@ -1599,9 +1332,12 @@ def create_app():
             
             # If this was the last member, delete the household
             if is_last_member:
-                db.session.delete(h)
+                remove_household(hid)
+            else:
+                ledger.rebuild_household(hid)
 
             db.session.commit()
+            invalidate_membership_cache()
             flash(t("flash.left_household"), "success")
             return redirect(url_for("setup_household"))
         except Exception as e:
@@ -1637,17 +1373,20 @@ def create_app():
                     db.session.commit()
 
             Membership.query.filter_by(user_id=user_id).delete()
-            if h:
-                exp_ids = [e.id for e in Expense.query.filter_by(household_id=hid).all()]
-                if exp_ids:
-                    ExpenseParticipant.query.filter(ExpenseParticipant.expense_id.in_(exp_ids)).delete(synchronize_session=False)
-                Expense.query.filter_by(household_id=hid).delete()
-                db.session.delete(h)
-
-        # Clean up any stray records tied to this user
-        ExpenseParticipant.query.filter_by(user_id=user_id).delete()
-        Expense.query.filter_by(payer_id=user_id).delete()
-        Membership.query.filter_by(user_id=user_id).delete()
+            purge_later = bool(h) and remove_household(hid, purge_user_ids=[user_id])
+        else:
+            purge_later = False
+
+        u = db.session.get(User, user_id)
+        if purge_later:
+            # The household is still being purged and its expenses reference this user,
+            # so the account is closed now and deleted after the household
+            u.deleted_at = datetime.utcnow()
+            u.email = f"deleted-{user_id}-{secrets.token_hex(4)}@invalid"
+            u.password_hash = secrets.token_hex(32)
+        else:
+            # Removes the user and any stray records tied to them
+            ledger.delete_user(user_id)
 
         # Remove avatar files
         for ext in AVATAR_EXTS:
@@ -1656,10 +1395,8 @@ def create_app():
                 os.remove(path)
 
         logout_user()
-        u = db.session.get(User, user_id)
-        if u:
-            db.session.delete(u)
         db.session.commit()
+        invalidate_membership_cache()
         flash(t("flash.account_deleted"), "success")
         return redirect(url_for("login"))
 
@@ -1677,7 +1414,7 @@ def create_app():
             flash(t("flash.enter_join_code"), "error")
             return redirect(url_for("household"))
 
-        target = Household.query.filter_by(join_code=join_code).first()
+        target = Household.query.filter_by(join_code=join_code, deleted_at=None).first()
         if not target:
             flash(t("flash.invalid_join_code"), "error")
             return redirect(url_for("household"))
@@ -1709,17 +1446,17 @@ def create_app():
 
             # If this was the last member and also the owner, delete the household (and related data) to avoid orphaned data.
             if current_house.owner_id == current_user.id and member_count <= 1:
-                exp_ids = [e.id for e in Expense.query.filter_by(household_id=current_hid).all()]
-                if exp_ids:
-                    ExpenseParticipant.query.filter(ExpenseParticipant.expense_id.in_(exp_ids)).delete(synchronize_session=False)
-                Expense.query.filter_by(household_id=current_hid).delete()
-                db.session.delete(current_house)
+                remove_household(current_hid)
+            else:
+                ledger.rebuild_household(current_hid)
 
             db.session.commit()
 
         # Join target household
         db.session.add(Membership(user_id=current_user.id, household_id=target.id))
+        ledger.rebuild_household(target.id)
         db.session.commit()
+        invalidate_membership_cache()
         flash(t("flash.switched_household", name=target.name), "success")
         return redirect(url_for("dashboard"))
 
@@ -1758,7 +1495,9 @@ def create_app():
             return redirect(url_for("household"))
 
         Membership.query.filter_by(user_id=user_id, household_id=hid).delete()
+        ledger.rebuild_household(hid)
         db.session.commit()
+        invalidate_membership_cache()
         flash(t("flash.member_removed"), "success")
         return redirect(url_for("household"))
 
@@ -1785,6 +1524,29 @@ def create_app():
         flash(t("flash.household_name_updated"), "success")
         return redirect(url_for("household"))
 
+    @app.post("/household/debt-mode")
+    @login_required
+    def set_debt_mode():
+        hid = require_household_id()
+        if not hid:
+            return redirect(url_for("setup_household"))
+
+        h = db.session.get(Household, hid)
+        if not h:
+            abort(404)
+        if h.owner_id != current_user.id:
+            abort(403)
+
+        mode = request.form.get("debt_mode", "").strip().lower()
+        if mode not in DEBT_MODES:
+            abort(400)
+
+        h.debt_mode = mode
+        ledger.bump_version(hid)
+        db.session.commit()
+        flash(t("flash.debt_mode_updated"), "success")
+        return redirect(url_for("household"))
+
     @app.get("/household/qr.png")
     @login_required
     def household_qr():
@@ -1797,11 +1559,16 @@ def create_app():
             abort(404)
 
         join_url = url_for("qr_join", code=h.join_code, _external=True)
-        img = qrcode.make(join_url)
-        bio = BytesIO()
-        img.save(bio, format="PNG")
-        bio.seek(0)
-        return send_file(bio, mimetype="image/png", max_age=0)
+        png = qr_cache.get(join_url)
+        if png is None:
+            # qrcode pulls in PIL; loaded on first use rather than by every worker at boot
+            import qrcode
+
+            bio = BytesIO()
+            qrcode.make(join_url).save(bio, format="PNG")
+            png = bio.getvalue()
+            qr_cache.set(join_url, png)
+        return send_file(BytesIO(png), mimetype="image/png", max_age=0)
 
     # ---------- Expenses ----------
     @app.get("/expenses")
@@ -1818,9 +1585,20 @@ def create_app():
         filter_user = request.args.get("filter_user", "").strip()
         sort_by = request.args.get("sort", "date").strip()
         
+        selected_month = request.args.get("month", "").strip()
+        cursor = request.args.get("cursor", "").strip()
+        
         q = Expense.query.filter_by(household_id=hid, is_archived=False)
+
+        # Month filter as a date range so it can use the expense_date index
+        bounds = month_bounds(selected_month)
+        if bounds:
+            q = q.filter(Expense.expense_date >= bounds[0], Expense.expense_date < bounds[1])
+        else:
+            selected_month = ""
         
         # Apply user filter
+        filter_user_id = None
         if filter_user:
             try:
                 filter_user_id = int(filter_user)
@@ -1828,39 +1606,57 @@ def create_app():
             except ValueError:
                 filter_user = ""
         
-        # Apply sorting
+        # Apply sorting (keyset-paginated; id breaks ties)
         if sort_by == "person":
-            q = q.join(User, Expense.payer_id == User.id).order_by(User.name.asc(), Expense.expense_date.desc())
+            q = q.join(User, Expense.payer_id == User.id)
+            keys = [(User.name, False, False), (Expense.expense_date, True, False), (Expense.id, True, False)]
+            key_of = lambda e: [db.session.get(User, e.payer_id).name, e.expense_date, e.id]
         else:
             sort_by = "date"
-            q = q.order_by(Expense.expense_date.desc(), Expense.created_at.desc())
+            keys = [(Expense.expense_date, True, False), (Expense.created_at, True, False), (Expense.id, True, False)]
+            key_of = lambda e: [e.expense_date, e.created_at, e.id]
         
-        exp = q.all()
+        exp, next_cursor = keyset_page(q, keys, cursor, key_of)
+
+        # Participants of the visible page only
+        shown_ids = [e.id for e in exp]
+        participants = []
+        if shown_ids:
+            participants = (
+                db.session.query(ExpenseParticipant.expense_id, ExpenseParticipant.user_id)
+                .filter(ExpenseParticipant.expense_id.in_(shown_ids))
+                .all()
+            )
+
+        parts_map = {}
+        for expense_id, uid in participants:
+            parts_map.setdefault(expense_id, []).append(uid)
 
-        # payer names (include former members who have expenses)
+        # Include former members who paid or took part in the visible expenses
         user_by_id = {u.id: u for u in members}
-        payer_ids = {e.payer_id for e in exp}
-        missing_ids = payer_ids - set(user_by_id.keys())
-        if missing_ids:
-            missing_users = User.query.filter(User.id.in_(missing_ids)).all()
-            for u in missing_users:
-                user_by_id[u.id] = u
+        add_missing_users(
+            user_by_id,
+            {e.payer_id for e in exp} | {uid for _eid, uid in participants} | ({filter_user_id} if filter_user_id else set()),
+        )
 
-        participants = ExpenseParticipant.query.join(
-            Expense, ExpenseParticipant.expense_id == Expense.id
-        ).filter(Expense.household_id == hid, Expense.is_archived == False).all()
+        next_url = None
+        if next_cursor:
+            next_url = url_for(
+                "expenses",
+                filter_user=filter_user or None,
+                sort=sort_by if sort_by != "date" else None,
+                month=selected_month or None,
+                cursor=next_cursor,
+            )
 
-        parts_map = {}
-        for p in participants:
-            parts_map.setdefault(p.expense_id, []).append(p.user_id)
-
-        # Also include former members who are participants
-        participant_ids = {p.user_id for p in participants}
-        missing_participant_ids = participant_ids - set(user_by_id.keys())
-        if missing_participant_ids:
-            missing_users = User.query.filter(User.id.in_(missing_participant_ids)).all()
-            for u in missing_users:
-                user_by_id[u.id] = u
+        if wants_page_fragment():
+            return render_template(
+                "expense_items.html",
+                expenses=exp,
+                user_by_id=user_by_id,
+                parts_map=parts_map,
+                next_url=next_url,
+            )
 
         today = datetime.now().strftime("%Y-%m-%d")
         return render_template(
@@ -1872,8 +1668,29 @@ def create_app():
             today=today,
             filter_user=filter_user,
             sort_by=sort_by,
+            next_url=next_url,
         )
 
+    def validate_expense_fields(title: str, amount_str: str, expense_date: str):
+        """Return ((title, amount_iqd, expense_date), None), or (None, translation key of the error)."""
+        if not title:
+            return None, "flash.title_required"
+
+        try:
+            amount_iqd = int(amount_str)
+        except ValueError:
+            amount_iqd = 0
+
+        if amount_iqd <= 0:
+            return None, "flash.amount_positive"
+
+        if not expense_date:
+            expense_date = datetime.now().strftime("%Y-%m-%d")
+        parsed_date = parse_iso_date(expense_date)
+        if parsed_date is None:
+            return None, "flash.invalid_date"
+        return (title, amount_iqd, parsed_date), None
+
     @app.post("/expenses/add")
     @login_required
     def add_expense():
@@ -1887,27 +1704,16 @@ def create_app():
 
         participant_ids = request.form.getlist("participants")  # list of strings
         try:
-            participant_ids = [int(x) for x in participant_ids]
+            participant_ids = list(dict.fromkeys(int(x) for x in participant_ids))
         except ValueError:
             participant_ids = []
 
         # basic validations
-        if not title:
-            flash(t("flash.title_required"), "error")
+        fields, error = validate_expense_fields(title, amount_str, expense_date)
+        if error:
+            flash(t(error), "error")
             return redirect(url_for("expenses"))
 
-        try:
-            amount_iqd = int(amount_str)
-        except ValueError:
-            amount_iqd = 0
-
-        if amount_iqd <= 0:
-            flash(t("flash.amount_positive"), "error")
-            return redirect(url_for("expenses"))
-
-        if not expense_date:
-            expense_date = datetime.now().strftime("%Y-%m-%d")
-
         if len(participant_ids) == 0:
             flash(t("flash.select_participant"), "error")
             return redirect(url_for("expenses"))
@@ -1919,23 +1725,130 @@ def create_app():
             flash(t("flash.invalid_participants"), "error")
             return redirect(url_for("expenses"))
 
-        e = Expense(
-            household_id=hid,
-            payer_id=current_user.id,
-            title=title,
-            amount_iqd=amount_iqd,
-            expense_date=expense_date,
-            is_archived=False,
-            archived_month=None,
-        )
-        db.session.add(e)
+        # Expense, participants and ledger change are committed together
+        ledger.insert_expenses(hid, [(current_user.id, *fields, participant_ids)], member_ids)
         db.session.commit()
 
-        for uid in participant_ids:
-            db.session.add(ExpenseParticipant(expense_id=e.id, user_id=uid))
+        flash(t("flash.expense_added"), "success")
+        return redirect(url_for("expenses"))
+
+    @app.post("/expenses/batch")
+    @login_required
+    def add_expense_batch():
+        """Add many expenses paid by the current user in one transaction.
+
+        Accepts JSON ({"expenses": [{"title", "amount_iqd", "expense_date", "participants"}]})
+        or a pasted CSV list in the "lines" form field (title, amount, optional date per line),
+        where the form's "participants" apply to every line. Nothing is added if any entry is invalid.
+        """
+        hid = require_household_id()
+        if not hid:
+            return redirect(url_for("setup_household"))
+
+        wants_json = request.is_json or request.headers.get("X-Requested-With") == "XMLHttpRequest"
+
+        def batch_error(message: str):
+            if wants_json:
+                return jsonify({"success": False, "error": message}), 400
+            flash(message, "error")
+            return redirect(url_for("expenses"))
+
+        # (line, title, amount, date, participant ids)
+        entries = []
+        if request.is_json:
+            payload = request.get_json(silent=True)
+            raw = payload.get("expenses") if isinstance(payload, dict) else None
+            for line, item in enumerate(raw if isinstance(raw, list) else [], start=1):
+                if not isinstance(item, dict):
+                    item = {}
+                pids = item.get("participants")
+                entries.append((
+                    line,
+                    str(item.get("title") or "").strip(),
+                    str(item.get("amount_iqd") or "").strip(),
+                    str(item.get("expense_date") or "").strip(),
+                    pids if isinstance(pids, list) else [],
+                ))
+        else:
+            pids = request.form.getlist("participants")
+            reader = csv.reader(StringIO(request.form.get("lines", "")))
+            for row in reader:
+                cells = [c.strip() for c in row]
+                if not any(cells):
+                    continue
+                cells += [""] * (3 - len(cells))
+                entries.append((reader.line_num, cells[0], cells[1], cells[2], pids))
+
+        if not entries:
+            return batch_error(t("flash.batch_empty"))
+        batch_max = app.config["EXPENSE_BATCH_MAX"]
+        if len(entries) > batch_max:
+            return batch_error(t("flash.batch_too_large", max=batch_max))
+
+        member_ids = {uid for (uid,) in db.session.query(Membership.user_id).filter_by(household_id=hid).all()}
+        items = []
+        for line, title, amount_str, expense_date, pids in entries:
+            fields, error = validate_expense_fields(title, amount_str, expense_date)
+            if not error:
+                try:
+                    pids = list(dict.fromkeys(int(x) for x in pids))
+                except (TypeError, ValueError):
+                    pids = []
+                if not pids:
+                    error = "flash.select_participant"
+                elif not set(pids).issubset(member_ids):
+                    error = "flash.invalid_participants"
+            if error:
+                return batch_error(t("flash.batch_line_error", line=line, error=t(error)))
+            items.append((current_user.id, *fields, pids))
+
+        expense_ids = ledger.insert_expenses(hid, items, member_ids)
         db.session.commit()
 
-        flash(t("flash.expense_added"), "success")
+        if wants_json:
+            return jsonify({"success": True, "count": len(expense_ids), "ids": expense_ids})
+        flash(t("flash.batch_added", count=len(expense_ids)), "success")
+        return redirect(url_for("expenses"))
+
+    @app.post("/expenses/import")
+    @login_required
+    def import_expenses():
+        """Import historical expenses from an uploaded CSV or JSON file (owner only)."""
+        hid = require_household_id()
+        if not hid:
+            return redirect(url_for("setup_household"))
+        if not is_household_owner(hid):
+            abort(403)
+
+        wants_json = request.headers.get("X-Requested-With") == "XMLHttpRequest"
+        upload = request.files.get("file")
+        if not upload or not upload.filename:
+            if wants_json:
+                return jsonify({"success": False, "error": t("flash.import_no_file")}), 400
+            flash(t("flash.import_no_file"), "error")
+            return redirect(url_for("expenses"))
+
+        # Parse the upload as it is read instead of loading it whole
+        stream = TextIOWrapper(upload.stream, encoding="utf-8-sig", newline="")
+        try:
+            stats = importer.import_expenses(hid, importer.iter_file_rows(upload.filename, stream))
+        except (ValueError, csv.Error):
+            db.session.rollback()
+            if wants_json:
+                return jsonify({"success": False, "error": t("flash.import_failed")}), 400
+            flash(t("flash.import_failed"), "error")
+            return redirect(url_for("expenses"))
+
+        if stats["error"]:
+            # Earlier batches are committed; say how far the import got
+            message = t("flash.import_stopped", read=stats["read"], inserted=stats["inserted"])
+            if wants_json:
+                return jsonify({"success": False, **stats, "error": message}), 400
+            flash(message, "error")
+            return redirect(url_for("expenses"))
+        if wants_json:
+            return jsonify({"success": True, **stats})
+        flash(t("flash.import_done", inserted=stats["inserted"], duplicates=stats["duplicates"], invalid=stats["invalid"]), "success")
         return redirect(url_for("expenses"))
 
     @app.post("/expenses/delete/<int:expense_id>")
@@ -1954,6 +1867,10 @@ def create_app():
             flash(t("flash.only_payer_delete"), "error")
             return redirect(url_for("expenses"))
 
+        participant_ids = [
+            uid for (uid,) in db.session.query(ExpenseParticipant.user_id).filter_by(expense_id=e.id).all()
+        ]
+        ledger.apply_expense(hid, e.payer_id, e.amount_iqd, participant_ids, sign=-1)
         ExpenseParticipant.query.filter_by(expense_id=e.id).delete()
         db.session.delete(e)
         db.session.commit()
@@ -1964,62 +1881,53 @@ def create_app():
     @app.get("/dashboard")
     @login_required
     def dashboard():
-        hid = require_household_id()
-        if not hid:
+        loaded = load_dashboard_data(current_user.id)
+        if not loaded:
             return redirect(url_for("setup_household"))
+        household, members, totals = loaded
+        hid = household.id
 
-        members = household_members(hid)
         members.sort(key=lambda u: (u.id != current_user.id, (u.name or "").lower()))
         user_by_id = {u.id: u for u in members}
 
-        active_expenses = Expense.query.filter_by(household_id=hid, is_archived=False).all()
-        participants = ExpenseParticipant.query.join(
-            Expense, ExpenseParticipant.expense_id == Expense.id
-        ).filter(Expense.household_id == hid, Expense.is_archived == False).all()
-
-        parts_map = {}
-        for p in participants:
-            parts_map.setdefault(p.expense_id, []).append(p.user_id)
+        cache_key = (hid, household.version)
+        cached = balance_cache.get(cache_key)
+        if cached is None:
+            # Ledger totals were loaded with the members; transfers only involve members
+            member_totals = {u.id: totals[u.id] for u in members}
+            net = net_balances_from_totals(member_totals)
+            transfers = simplify_debts_for_mode(net, household.debt_mode)
+            spent_by_id = {uid: paid for uid, (paid, _num, _den) in member_totals.items()}
+
+            active_count, household_total, earliest_date = (
+                db.session.query(
+                    func.count(Expense.id),
+                    func.coalesce(func.sum(Expense.amount_iqd), 0),
+                    func.min(Expense.expense_date),
+                )
+                .filter(Expense.household_id == hid, Expense.is_archived == False)
+                .one()
+            )
+            household_total = int(household_total or 0)
 
-        # Include former members who have expenses or are participants
-        all_user_ids = {e.payer_id for e in active_expenses} | {p.user_id for p in participants}
-        missing_ids = all_user_ids - set(user_by_id.keys())
-        if missing_ids:
-            missing_users = User.query.filter(User.id.in_(missing_ids)).all()
-            for u in missing_users:
-                user_by_id[u.id] = u
+            # Fall back to the household period_start_date when nothing is active (set after settle)
+            if not active_count and household.period_start_date:
+                earliest_date = household.period_start_date
 
-        net = compute_net_balances(members, active_expenses, parts_map)
-        transfers = simplify_debts(net)
+            cached = (transfers, spent_by_id, active_count, household_total, earliest_date)
+            balance_cache.set(cache_key, cached)
+        transfers, spent_by_id, active_count, household_total, earliest_date = cached
 
         i_owe = sum(amt for frm, to, amt in transfers if frm == current_user.id)
         owed_to_me = sum(amt for frm, to, amt in transfers if to == current_user.id)
 
         my_net = owed_to_me - i_owe  # positive => they owe me, negative => I owe
-        my_total_spent = sum(e.amount_iqd for e in active_expenses if e.payer_id == current_user.id)
-        household_total = sum(e.amount_iqd for e in active_expenses)
+        my_total_spent = spent_by_id.get(current_user.id, 0)
 
         # Spending by person (active only)
-        spent_rows = (
-            db.session.query(Expense.payer_id, func.coalesce(func.sum(Expense.amount_iqd), 0))
-            .filter(Expense.household_id == hid, Expense.is_archived == False)
-            .group_by(Expense.payer_id)
-            .all()
-        )
-        spent_by_id = {pid: int(total or 0) for pid, total in spent_rows}
         spent_by_user = [(u, spent_by_id.get(u.id, 0)) for u in members]
         max_spent = max((amt for _u, amt in spent_by_user), default=0)
 
-        # Calculate the earliest expense date, fallback to household period_start_date
-        earliest_date = None
-        if active_expenses:
-            earliest_date = min(e.expense_date for e in active_expenses if e.expense_date)
-        else:
-            # No active expenses - use household's period start date (set after settle)
-            household = db.session.get(Household, hid)
-            if household and household.period_start_date:
-                earliest_date = household.period_start_date
-
         month = current_month_yyyy_mm()
         return render_template(
             "dashboard.html",
@@ -2028,7 +1936,7 @@ def create_app():
             my_net=my_net,
             my_total_spent=my_total_spent,
             household_total=household_total,
-            active_count=len(active_expenses),
+            active_count=active_count,
             current_month=month,
             spent_by_user=spent_by_user,
             max_spent=max_spent,
@@ -2055,22 +1963,80 @@ def create_app():
         month = current_month_yyyy_mm()
         settle_id = secrets.token_hex(8)
         settled_at = datetime.utcnow()
-        active = Expense.query.filter_by(household_id=hid, is_archived=False).all()
-        if not active:
+        # Lock the household row first, as expense writes do (ledger.apply_expenses), so the
+        # aggregate and the ledger totals below see the same expenses
+        ledger.bump_version(hid)
+        expense_count, total_iqd, start_date, end_date, max_id = (
+            db.session.query(
+                func.count(Expense.id),
+                func.coalesce(func.sum(Expense.amount_iqd), 0),
+                func.min(Expense.expense_date),
+                func.max(Expense.expense_date),
+                func.max(Expense.id),
+            )
+            .filter(Expense.household_id == hid, Expense.is_archived == False)
+            .one()
+        )
+        if not expense_count:
+            db.session.rollback()
             flash(t("flash.nothing_to_settle"), "info")
             return redirect(url_for("archive"))
 
-        for e in active:
-            e.is_archived = True
-            e.archived_month = month
-            e.archived_settle_id = settle_id
-            e.archived_settled_at = settled_at
+        # Capture each member's totals from the ledger before it is reset
+        member_ids = [uid for (uid,) in db.session.query(Membership.user_id).filter_by(household_id=hid).all()]
+        stored = ledger.stored_household_totals(hid)
+        totals = {uid: stored.get(uid, (0, 0, 1)) for uid in member_ids}
+        net = net_balances_from_totals(totals)
+
+        # Archive in one set-based UPDATE, bounded to the snapshot's ids
+        Expense.query.filter(
+            Expense.household_id == hid,
+            Expense.is_archived == False,
+            Expense.id <= max_id,
+        ).update(
+            {
+                Expense.is_archived: True,
+                Expense.archived_month: current_month_start(),
+                Expense.archived_settle_id: settle_id,
+                Expense.archived_settled_at: settled_at,
+            },
+            synchronize_session=False,
+        )
+
+        db.session.add(SettleSession(
+            id=settle_id,
+            household_id=hid,
+            settled_by_id=current_user.id,
+            month=current_month_start(),
+            settled_at=settled_at,
+            start_date=start_date,
+            end_date=end_date,
+            total_iqd=int(total_iqd or 0),
+            expense_count=expense_count,
+        ))
+        for uid, (paid, num, den) in totals.items():
+            db.session.add(SettleSessionBalance(
+                settle_id=settle_id,
+                user_id=uid,
+                paid_iqd=paid,
+                consumed_num=num,
+                consumed_den=den,
+                net_iqd=net[uid],
+            ))
 
         # Update household period start date to today
         household = db.session.get(Household, hid)
         if household:
-            household.period_start_date = settled_at.strftime("%Y-%m-%d")
-
+            household.period_start_date = settled_at.date()
+
+        ledger.rebuild_household(hid)
+        if app.config["SETTLE_NOTIFY_EMAILS"]:
+            # One job for the whole household; members are emailed from the worker
+            jobs.enqueue("settle_notify", {
+                "settle_id": settle_id,
+                "lang": get_lang(),
+                "archive_url": build_external_url("archive", sort="settle", settle=settle_id),
+            })
         db.session.commit()
 
         flash(t("flash.settled_up", month=month), "success")
@@ -2091,8 +2057,17 @@ def create_app():
         selected_settle = request.args.get("settle", "").strip()
         filter_person = request.args.get("person", "").strip()
 
+        cursor = request.args.get("cursor", "").strip()
+
         q = Expense.query.filter_by(household_id=hid, is_archived=True)
 
+        # Month filter as a date range so it can use the expense_date index
+        bounds = month_bounds(selected_month)
+        if bounds:
+            q = q.filter(Expense.expense_date >= bounds[0], Expense.expense_date < bounds[1])
+        else:
+            selected_month = ""
+
         # Apply person filter when sorting by person
         if sort == "person" and filter_person:
             try:
@@ -2101,37 +2076,69 @@ def create_app():
             except ValueError:
                 filter_person = ""
 
+        # Keyset-paginated; id breaks ties
         if sort == "person":
-            archived = q.join(User, Expense.payer_id == User.id).order_by(User.name.asc(), Expense.expense_date.desc()).all()
+            page_q = q.join(User, Expense.payer_id == User.id)
+            keys = [(User.name, False, False), (Expense.expense_date, True, False), (Expense.id, True, False)]
+            key_of = lambda e: [db.session.get(User, e.payer_id).name, e.expense_date, e.id]
         else:
             sort = "settle"
             if selected_settle:
                 q = q.filter_by(archived_settle_id=selected_settle)
-            archived = q.order_by(Expense.archived_settled_at.desc().nullslast(), Expense.expense_date.desc()).all()
+            page_q = q
+            keys = [(Expense.archived_settled_at, True, True), (Expense.expense_date, True, False), (Expense.id, True, False)]
+            key_of = lambda e: [e.archived_settled_at, e.expense_date, e.id]
+        archived, next_cursor = keyset_page(page_q, keys, cursor, key_of)
 
-        # list available months
-        months_rows = db.session.query(Expense.archived_month).filter(
-            Expense.household_id == hid,
-            Expense.is_archived == True,
-            Expense.archived_month != None
-        ).distinct().order_by(Expense.archived_month.desc()).all()
-        months = [m[0] for m in months_rows if m[0]]
+        shown_ids = [e.id for e in archived]
+        participants = []
+        if shown_ids:
+            participants = (
+                db.session.query(ExpenseParticipant.expense_id, ExpenseParticipant.user_id)
+                .filter(ExpenseParticipant.expense_id.in_(shown_ids))
+                .all()
+            )
+
+        parts_map = {}
+        for expense_id, uid in participants:
+            parts_map.setdefault(expense_id, []).append(uid)
+
+        members = household_members(hid)
+        user_by_id = {u.id: u for u in members}
 
-        # Available settle sessions (id + derived label)
+        # Include former members who have archived expenses or are participants
+        add_missing_users(user_by_id, {e.payer_id for e in archived} | {uid for _eid, uid in participants})
+
+        next_url = None
+        if next_cursor:
+            next_url = url_for(
+                "archive",
+                sort=sort,
+                settle=selected_settle or None,
+                person=filter_person or None,
+                month=selected_month or None,
+                cursor=next_cursor,
+            )
+
+        if wants_page_fragment():
+            return render_template(
+                "archive_items.html",
+                archived=archived,
+                user_by_id=user_by_id,
+                parts_map=parts_map,
+                next_url=next_url,
+            )
+
+        # Available settle sessions (id + derived label), precomputed at settle time
         settle_rows = (
             db.session.query(
-                Expense.archived_settle_id,
-                func.min(Expense.expense_date),
-                func.max(Expense.expense_date),
-                func.max(Expense.archived_settled_at),
+                SettleSession.id,
+                SettleSession.start_date,
+                SettleSession.end_date,
+                SettleSession.settled_at,
             )
-            .filter(
-                Expense.household_id == hid,
-                Expense.is_archived == True,
-                Expense.archived_settle_id != None,
-            )
-            .group_by(Expense.archived_settle_id)
-            .order_by(func.max(Expense.archived_settled_at).desc())
+            .filter(SettleSession.household_id == hid)
+            .order_by(SettleSession.settled_at.desc())
             .all()
         )
 
@@ -2142,19 +2149,13 @@ def create_app():
                 suf = {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
             return f"{n}{suf}"
 
-        def _fmt_settle_label(start_yyyy_mm_dd: str, end_yyyy_mm_dd: str) -> str:
+        def _fmt_settle_label(sdt: date, edt: date) -> str:
             if lang == "ku":
-                if start_yyyy_mm_dd == end_yyyy_mm_dd:
-                    return f"{start_yyyy_mm_dd} {t('archive.settle_label')}"
-                return f"{start_yyyy_mm_dd} - {end_yyyy_mm_dd} {t('archive.settle_label')}"
-            # start/end are strings YYYY-MM-DD
-            try:
-                sdt = datetime.strptime(start_yyyy_mm_dd, "%Y-%m-%d")
-                edt = datetime.strptime(end_yyyy_mm_dd, "%Y-%m-%d")
-            except Exception:
-                return t("archive.settle_label")
+                if sdt == edt:
+                    return f"{sdt.isoformat()} {t('archive.settle_label')}"
+                return f"{sdt.isoformat()} - {edt.isoformat()} {t('archive.settle_label')}"
 
-            if sdt.date() == edt.date():
+            if sdt == edt:
                 return f"{_ordinal(sdt.day)} {sdt.strftime('%b')} {t('archive.settle_label')}"
             # same month => "13th - 25th Dec settle"
             if sdt.year == edt.year and sdt.month == edt.month:
@@ -2173,27 +2174,17 @@ def create_app():
                 "settled_at": sat,
             })
 
-        members = household_members(hid)
-        user_by_id = {u.id: u for u in members}
-
-        shown_ids = [e.id for e in archived]
-        participants = []
-        if shown_ids:
-            participants = ExpenseParticipant.query.filter(ExpenseParticipant.expense_id.in_(shown_ids)).all()
-
-        parts_map = {}
-        for p in participants:
-            parts_map.setdefault(p.expense_id, []).append(p.user_id)
-
-        # Include former members who have archived expenses or are participants
-        all_user_ids = {e.payer_id for e in archived} | {p.user_id for p in participants}
-        missing_ids = all_user_ids - set(user_by_id.keys())
-        if missing_ids:
-            missing_users = User.query.filter(User.id.in_(missing_ids)).all()
-            for u in missing_users:
-                user_by_id[u.id] = u
-
-        total_iqd = sum(e.amount_iqd for e in archived)
+        # Totals cover the whole filtered set, not just the visible page
+        selected_session = None
+        if sort == "settle" and selected_settle and not selected_month:
+            selected_session = SettleSession.query.filter_by(id=selected_settle, household_id=hid).first()
+        if selected_session:
+            archived_count, total_iqd = selected_session.expense_count, int(selected_session.total_iqd)
+        else:
+            archived_count, total_iqd = q.with_entities(
+                func.count(Expense.id), func.coalesce(func.sum(Expense.amount_iqd), 0)
+            ).one()
+            total_iqd = int(total_iqd or 0)
         
         # Get settle info for selected settle
         selected_settle_info = None
@@ -2206,7 +2197,6 @@ def create_app():
         return render_template(
             "archive.html",
             archived=archived,
-            months=months,
             settles=settles,
             settle_label_by_id={s["id"]: s["label"] for s in settles},
             sort=sort,
@@ -2215,34 +2205,224 @@ def create_app():
             selected_settle_info=selected_settle_info,
             filter_person=filter_person,
             total_iqd=total_iqd,
+            archived_count=archived_count,
             user_by_id=user_by_id,
             parts_map=parts_map,
             is_owner=is_owner,
             members=members,
+            next_url=next_url,
         )
 
+    # ---------- Export ----------
+    def csv_text(value: str) -> str:
+        # Keep spreadsheet apps from evaluating user text as a formula
+        return "'" + value if value[:1] in ("=", "+", "-", "@") else value
+
+    def stream_expenses_csv(hid: int, q, order, filename: str, include_settled_at: bool):
+        """Stream the expenses of q as CSV, one row per expense, with participants and their shares.
+
+        Expenses and participants come from one joined query read through a
+        server-side cursor, so memory stays flat however long the history is.
+        """
+        names = {u.id: u.name for u in household_members(hid)}
+
+        def name_of(uid: int) -> str:
+            if uid not in names:
+                u = db.session.get(User, uid)
+                names[uid] = u.name if u else str(uid)
+            return names[uid]
+
+        rows = (
+            q.outerjoin(ExpenseParticipant, ExpenseParticipant.expense_id == Expense.id)
+            .with_entities(
+                Expense.id,
+                Expense.expense_date,
+                Expense.title,
+                Expense.amount_iqd,
+                Expense.payer_id,
+                Expense.archived_settled_at,
+                ExpenseParticipant.user_id,
+            )
+            .order_by(*order, ExpenseParticipant.user_id.asc())
+            .yield_per(1000)
+        )
+
+        header = [t("export.date"), t("export.title"), t("export.amount_iqd"), t("export.payer"), t("export.participants"), t("export.shares")]
+        if include_settled_at:
+            header.append(t("export.settled_at"))
+
+        def generate():
+            buf = StringIO()
+            writer = csv.writer(buf)
+            buf.write("\ufeff")  # BOM so Excel opens the file as UTF-8
+            writer.writerow(header)
+            for n, (_eid, group) in enumerate(groupby(rows, key=lambda r: r[0]), start=1):
+                group = list(group)
+                _id, expense_date, title, amount_iqd, payer_id, settled_at, _uid = group[0]
+                shares = split_amount(amount_iqd, [r[6] for r in group if r[6] is not None])
+                row = [
+                    expense_date.isoformat(),
+                    csv_text(title),
+                    amount_iqd,
+                    csv_text(name_of(payer_id)),
+                    csv_text("; ".join(name_of(uid) for uid, _share in shares)),
+                    csv_text("; ".join(f"{name_of(uid)}={share}" for uid, share in shares)),
+                ]
+                if include_settled_at:
+                    row.append(settled_at.strftime("%Y-%m-%d %H:%M") if settled_at else "")
+                writer.writerow(row)
+                if n % 500 == 0:
+                    yield buf.getvalue()
+                    buf.seek(0)
+                    buf.truncate(0)
+            yield buf.getvalue()
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
+    @app.get("/expenses/export")
+    @login_required
+    def export_expenses():
+        hid = require_household_id()
+        if not hid:
+            return redirect(url_for("setup_household"))
+
+        q = Expense.query.filter_by(household_id=hid, is_archived=False)
+        filter_user = request.args.get("filter_user", "").strip()
+        if filter_user.isdigit():
+            q = q.filter_by(payer_id=int(filter_user))
+        bounds = month_bounds(request.args.get("month", ""))
+        if bounds:
+            q = q.filter(Expense.expense_date >= bounds[0], Expense.expense_date < bounds[1])
+
+        order = [Expense.expense_date.desc(), Expense.created_at.desc(), Expense.id.desc()]
+        return stream_expenses_csv(hid, q, order, f"expenses-{date.today().isoformat()}.csv", include_settled_at=False)
+
+    @app.get("/archive/export")
+    @login_required
+    def export_archive():
+        hid = require_household_id()
+        if not hid:
+            return redirect(url_for("setup_household"))
+
+        q = Expense.query.filter_by(household_id=hid, is_archived=True)
+        selected_settle = request.args.get("settle", "").strip()
+        if selected_settle:
+            q = q.filter_by(archived_settle_id=selected_settle)
+        filter_person = request.args.get("person", "").strip()
+        if filter_person.isdigit():
+            q = q.filter_by(payer_id=int(filter_person))
+        bounds = month_bounds(request.args.get("month", ""))
+        if bounds:
+            q = q.filter(Expense.expense_date >= bounds[0], Expense.expense_date < bounds[1])
+
+        order = [Expense.archived_settled_at.desc().nullslast(), Expense.expense_date.desc(), Expense.id.desc()]
+        return stream_expenses_csv(hid, q, order, f"archive-{date.today().isoformat()}.csv", include_settled_at=True)
+
     return app
 
-app = create_app()
+def migrate(app):
+    """Apply pending schema migrations; run once per deploy, before starting workers."""
+    with app.app_context():
+        applied = migrations.migrate()
+        if applied:
+            print(f"Applied {len(applied)} migrations; schema is at version {migrations.LATEST_VERSION}.")
+        else:
+            print(f"Schema is up to date (version {migrations.current_version()}).")
 
-# Run migrations on startup
-with app.app_context():
-    db.create_all()
-    # Add period_start_date column if missing (migration for existing DBs)
-    try:
-        db.session.execute(db.text("ALTER TABLE household ADD COLUMN period_start_date VARCHAR(10)"))
+def init_db(app):
+    migrate(app)
+    print("Database initialized.")
+
+def rebuild_balances(app):
+    """Recompute every household ledger from raw expense rows and report drift."""
+    with app.app_context():
+        drifted = 0
+        households = db.session.query(Household.id).order_by(Household.id.asc()).all()
+        for (hid,) in households:
+            drift = ledger.rebuild_household(hid)
+            for uid, (stored, expected) in sorted(drift.items()):
+                print(f"household {hid} user {uid}: stored (paid, num, den)={stored} expected={expected}")
+            if drift:
+                drifted += 1
         db.session.commit()
-    except Exception:
-        db.session.rollback()  # Column likely already exists
+        print(f"Rebuilt {len(households)} household ledgers; {drifted} had drift.")
 
-def init_db():
+def backfill_settle_sessions(app):
+    """Create settle-session summaries for archived expenses settled before they were recorded."""
     with app.app_context():
-        db.create_all()
-        print("Database initialized.")
+        created = ledger.backfill_settle_sessions()
+        db.session.commit()
+        print(f"Created {created} settle session summaries.")
+
+def import_expenses(app, household_id: int, path: str, batch_size: int = importer.IMPORT_BATCH_SIZE):
+    """Stream a CSV or JSON file of historical expenses into a household."""
+    def report(stats):
+        print(f"{stats['read']} rows read, {stats['inserted']} inserted ({stats['rows_per_second']:.0f} rows/s)")
+
+    with app.app_context():
+        if not db.session.get(Household, household_id):
+            print(f"Household {household_id} not found.")
+            return
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            stats = importer.import_expenses(household_id, importer.iter_file_rows(path, f), batch_size, on_batch=report)
+        for error in stats["errors"]:
+            print(f"skipped {error}")
+        if stats["error"]:
+            print(f"Stopped after row {stats['read']}: {stats['error']}")
+        print(
+            f"Imported {stats['inserted']} of {stats['read']} rows in {stats['seconds']:.1f}s "
+            f"({stats['rows_per_second']:.0f} rows/s); {stats['duplicates']} duplicates, {stats['invalid']} invalid."
+        )
+
+def purge_deleted(app):
+    """Finish purging deleted households and accounts (e.g. after an interrupted background purge)."""
+    with app.app_context():
+        households, users = ledger.purge_deleted()
+        print(f"Purged {households} households and {users} accounts.")
+
+def run_worker(app, once: bool = False):
+    """Run background jobs in this process until interrupted (or a single pass with --once)."""
+    with app.app_context():
+        version = migrations.current_version()
+    if version < migrations.LATEST_VERSION:
+        print(f"Database schema is at version {version}, expected {migrations.LATEST_VERSION}; run `python app.py migrate` first.")
+        return
+    try:
+        jobs.work(app, once=once)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mail_pool = app.extensions["mail_pool"]
+        metrics = mail_pool.metrics()
+        if metrics["connects"]:
+            print(f"SMTP pool: {metrics['sent']} sent, {metrics['failed']} failed, {metrics['connects']} connects, {metrics['reconnects']} reconnects, {metrics['noops']} NOOP checks")
+        mail_pool.close()
 
 if __name__ == "__main__":
     import sys
-    if len(sys.argv) >= 2 and sys.argv[1] == "init-db":
-        init_db()
+    app = create_app()
+    if len(sys.argv) >= 2 and sys.argv[1] == "migrate":
+        migrate(app)
+    elif len(sys.argv) >= 2 and sys.argv[1] == "init-db":
+        init_db(app)
+    elif len(sys.argv) >= 2 and sys.argv[1] == "rebuild-balances":
+        rebuild_balances(app)
+    elif len(sys.argv) >= 2 and sys.argv[1] == "backfill-settle-sessions":
+        backfill_settle_sessions(app)
+    elif len(sys.argv) >= 2 and sys.argv[1] == "worker":
+        run_worker(app, once="--once" in sys.argv[2:])
+    elif len(sys.argv) >= 2 and sys.argv[1] == "purge-deleted":
+        purge_deleted(app)
+    elif len(sys.argv) >= 4 and sys.argv[1] == "import-expenses":
+        # python app.py import-expenses <household_id> <file.csv|file.json> [batch_size]
+        import_expenses(app, int(sys.argv[2]), sys.argv[3], *(int(a) for a in sys.argv[4:5]))
     else:
+        # The development server migrates and runs jobs for you; deployments run `migrate` and `worker` explicitly
+        migrate(app)
+        if "JOB_WORKER_THREADS" not in os.environ:
+            app.config["JOB_WORKER_THREADS"] = 1
         app.run(debug=True)
@@ -0,0 +1,40 @@
+"""Compare greedy and minimum-transfer debt simplification.
+
+Usage: python benchmarks/bench_debts.py [households_per_size]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import simplify_debts, simplify_debts_optimal
+
+
+def random_nets(members: int, rng: random.Random) -> dict[int, int]:
+    amounts = [rng.randrange(-40, 41) * 250 for _ in range(members - 1)]
+    amounts.append(-sum(amounts))
+    return {uid: amt for uid, amt in enumerate(amounts, start=1)}
+
+
+def main() -> None:
+    per_size = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    rng = random.Random(264)
+    print(f"{'members':>7} {'greedy tx':>10} {'minimal tx':>10} {'greedy ms':>10} {'minimal ms':>10}")
+    for members in (3, 4, 6, 8, 10, 12, 14, 16, 18, 20):
+        cases = [random_nets(members, rng) for _ in range(per_size)]
+        results = {}
+        for name, solver in (("greedy", simplify_debts), ("minimal", simplify_debts_optimal)):
+            started = time.perf_counter()
+            count = sum(len(solver(net)) for net in cases)
+            elapsed_ms = (time.perf_counter() - started) * 1000 / per_size
+            results[name] = (count / per_size, elapsed_ms)
+        print(
+            f"{members:>7} {results['greedy'][0]:>10.2f} {results['minimal'][0]:>10.2f}"
+            f" {results['greedy'][1]:>10.3f} {results['minimal'][1]:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Compare a new SMTP connection per email with the pooled mailer.
+
+Runs a local stub SMTP server that adds a delay to the greeting and to
+login, standing in for the TCP + TLS + AUTH round trips of a real provider.
+
+Usage: python benchmarks/bench_smtp_pool.py [messages] [handshake_ms]
+"""
+import os
+import smtplib
+import socketserver
+import sys
+import threading
+import time
+from email.message import EmailMessage
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mailer import SMTPPool
+
+
+def start_stub_server(handshake_seconds: float):
+    received = []
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            time.sleep(handshake_seconds / 2)
+            self.wfile.write(b"220 stub ESMTP\r\n")
+            in_data = False
+            while True:
+                line = self.rfile.readline()
+                if not line:
+                    return
+                if in_data:
+                    if line in (b".\r\n", b".\n"):
+                        in_data = False
+                        received.append(1)
+                        self.wfile.write(b"250 queued\r\n")
+                    continue
+                cmd = line.strip().upper()
+                if cmd.startswith((b"EHLO", b"HELO")):
+                    self.wfile.write(b"250-stub\r\n250 AUTH PLAIN\r\n")
+                elif cmd.startswith(b"AUTH"):
+                    time.sleep(handshake_seconds / 2)
+                    self.wfile.write(b"235 ok\r\n")
+                elif cmd == b"DATA":
+                    in_data = True
+                    self.wfile.write(b"354 go ahead\r\n")
+                elif cmd == b"QUIT":
+                    self.wfile.write(b"221 bye\r\n")
+                    return
+                else:
+                    self.wfile.write(b"250 ok\r\n")
+
+    class Server(socketserver.ThreadingTCPServer):
+        allow_reuse_address = True
+        daemon_threads = True
+
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, received
+
+
+def make_message(i: int) -> EmailMessage:
+    msg = EmailMessage()
+    msg["Subject"] = f"Verify your email ({i})"
+    msg["From"] = "no-reply@example.com"
+    msg["To"] = f"user{i}@example.com"
+    msg.set_content("Your code is 123456")
+    return msg
+
+
+def send_unpooled(port: int, msg: EmailMessage) -> None:
+    # What send_email did before the pool: connect, EHLO, login, send, QUIT
+    with smtplib.SMTP("127.0.0.1", port, timeout=10) as smtp:
+        smtp.ehlo()
+        smtp.login("user", "secret")
+        smtp.send_message(msg)
+
+
+def main() -> None:
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    handshake_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 40
+    server, received = start_stub_server(handshake_ms / 1000)
+    port = server.server_address[1]
+
+    started = time.perf_counter()
+    for i in range(messages):
+        send_unpooled(port, make_message(i))
+    unpooled = time.perf_counter() - started
+
+    pool = SMTPPool("127.0.0.1", port, username="user", password="secret", use_tls=False, size=1)
+    started = time.perf_counter()
+    for i in range(messages):
+        pool.send(make_message(i))
+    pooled = time.perf_counter() - started
+    metrics = pool.metrics()
+    pool.close()
+    server.shutdown()
+
+    print(f"{'mode':>9} {'messages':>9} {'total s':>9} {'ms/msg':>9} {'msgs/s':>9} {'connects':>9}")
+    for name, elapsed, connects in (("unpooled", unpooled, messages), ("pooled", pooled, metrics["connects"])):
+        print(f"{name:>9} {messages:>9} {elapsed:>9.2f} {elapsed * 1000 / messages:>9.2f} {messages / elapsed:>9.1f} {connects:>9}")
+    assert len(received) == 2 * messages
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Concurrent writers on one SQLite file, with and without the WAL/pragma tuning.
+
+Each of N processes logs in as a different household member and repeats
+"add an expense, then load the dashboard" through the app, like several
+gunicorn workers would. The baseline leaves SQLite's defaults (rollback
+journal, synchronous=FULL, the driver's 5 s lock wait); "tuned" uses the
+app's defaults (WAL, synchronous=NORMAL, busy_timeout, mmap).
+
+Usage: python benchmarks/bench_sqlite_writers.py [processes] [writes_per_process]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SETTINGS = {
+    "baseline": {"SQLITE_JOURNAL_MODE": "", "SQLITE_SYNCHRONOUS": "", "SQLITE_BUSY_TIMEOUT_MS": "5000", "SQLITE_MMAP_SIZE": "0"},
+    "tuned": {},
+}
+
+
+def seed(members: int) -> None:
+    from app import create_app
+    from models import db, User, Household, Membership
+    import migrations
+
+    flask_app = create_app()
+    with flask_app.app_context():
+        migrations.migrate(log=lambda _msg: None)
+        users = [User(name=f"writer{i}", email=f"writer{i}@example.com", password_hash="pw", email_verified=True) for i in range(members)]
+        db.session.add_all(users)
+        db.session.flush()
+        household = Household(name="Bench", join_code="WRITE1", owner_id=users[0].id)
+        db.session.add(household)
+        db.session.flush()
+        db.session.add_all(Membership(household_id=household.id, user_id=u.id) for u in users)
+        db.session.commit()
+
+
+def worker(index: int, writes: int, member_ids: list[int], start_at: float) -> None:
+    from app import create_app
+
+    client = create_app().test_client()
+    client.post("/login", data={"email": f"writer{index}@example.com", "password": "pw"})
+    latencies, errors = [], 0
+    # Start together once every process has imported the app
+    time.sleep(max(0.0, start_at - time.time()))
+    for i in range(writes):
+        t0 = time.perf_counter()
+        r = client.post("/expenses/add", data={
+            "title": f"w{index}-{i}",
+            "amount_iqd": "1000",
+            "expense_date": "2024-05-01",
+            "participants": [str(uid) for uid in member_ids],
+        })
+        latencies.append(time.perf_counter() - t0)
+        if r.status_code != 302:
+            errors += 1
+        if client.get("/dashboard").status_code != 200:
+            errors += 1
+    print(json.dumps({"finished_at": time.time(), "latencies": latencies, "errors": errors}))
+
+
+def run(name: str, processes: int, writes: int) -> dict:
+    workdir = tempfile.mkdtemp(prefix=f"bench-sqlite-{name}-")
+    env = dict(
+        os.environ,
+        DATABASE_URL="sqlite:///" + os.path.join(workdir, "bench.db"),
+        JOB_WORKER_THREADS="0",
+        **SETTINGS[name],
+    )
+    subprocess.run([sys.executable, __file__, "seed", str(processes)], env=env, check=True, cwd=workdir)
+    member_ids = ",".join(str(i) for i in range(1, processes + 1))
+    start_at = time.time() + 2 + processes * 0.5
+    procs = [
+        subprocess.Popen(
+            [sys.executable, __file__, "worker", str(i), str(writes), member_ids, str(start_at)],
+            env=env, cwd=workdir, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+        for i in range(processes)
+    ]
+    results = [json.loads(p.communicate()[0].decode().strip().splitlines()[-1]) for p in procs]
+    elapsed = max(r["finished_at"] for r in results) - start_at
+    latencies = sorted(l for r in results for l in r["latencies"])
+    return {
+        "writes": len(latencies),
+        "errors": sum(r["errors"] for r in results),
+        "writes_per_second": len(latencies) / elapsed,
+        "p50": latencies[len(latencies) // 2] * 1000,
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+def main() -> None:
+    if sys.argv[1:2] == ["seed"]:
+        seed(int(sys.argv[2]))
+        return
+    if sys.argv[1:2] == ["worker"]:
+        worker(int(sys.argv[2]), int(sys.argv[3]), [int(x) for x in sys.argv[4].split(",")], float(sys.argv[5]))
+        return
+
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    writes = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    print(f"{processes} processes x {writes} writes")
+    print(f"{'settings':>9} {'writes':>7} {'errors':>7} {'writes/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for name in SETTINGS:
+        r = run(name, processes, writes)
+        print(f"{name:>9} {r['writes']:>7} {r['errors']:>7} {r['writes_per_second']:>9.1f} {r['p50']:>8.1f} {r['p99']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Worker boot time: importing app.py and building the app with create_app().
+
+Each run uses a fresh interpreter against an empty SQLite file. The import
+is profiled with `python -X importtime` to list the slowest modules app.py
+pulls in; create_app() is timed separately and must not open a database
+connection. --record appends the medians to startup_history.jsonl (next to
+this file) with the current commit, so regressions show up over time.
+
+Usage: python benchmarks/bench_startup.py [runs] [--record]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HISTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_history.jsonl")
+
+FACTORY_PROBE = """
+import json, time
+import app
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+
+connections = []
+event.listen(Pool, "connect", lambda *args: connections.append(1))
+started = time.perf_counter()
+app.create_app()
+print(json.dumps({"create_app_ms": (time.perf_counter() - started) * 1000, "connections": len(connections)}))
+"""
+
+
+def parse_importtime(stderr: str) -> tuple[float, list[tuple[str, float]]]:
+    """app.py's cumulative import time, and app.py's direct imports by cumulative time (ms)."""
+    total, direct = 0.0, []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        if name.strip() == "app" and depth == 0:
+            total = int(cumulative_us) / 1000
+        elif depth == 1:
+            direct.append((name.strip(), int(cumulative_us) / 1000))
+    return total, sorted(direct, key=lambda item: -item[1])
+
+
+def run_once(env: dict) -> dict:
+    r = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"], env=env, cwd=ROOT, capture_output=True, text=True, check=True)
+    import_ms, direct = parse_importtime(r.stderr)
+    r = subprocess.run([sys.executable, "-c", FACTORY_PROBE], env=env, cwd=ROOT, capture_output=True, text=True, check=True)
+    return {"import_ms": import_ms, "direct": direct, **json.loads(r.stdout.strip().splitlines()[-1])}
+
+
+def main() -> None:
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    runs = int(args[0]) if args else 5
+    workdir = tempfile.mkdtemp(prefix="bench-startup-")
+    env = dict(
+        os.environ,
+        DATABASE_URL="sqlite:///" + os.path.join(workdir, "bench.db"),
+        JOB_WORKER_THREADS="0",
+        PYTHONPATH=ROOT,
+    )
+    # The first run also writes bytecode caches; leave it out
+    run_once(env)
+    results = [run_once(env) for _ in range(runs)]
+
+    import_ms = statistics.median(r["import_ms"] for r in results)
+    create_app_ms = statistics.median(r["create_app_ms"] for r in results)
+    connections = max(r["connections"] for r in results)
+    slowest = {}
+    for r in results:
+        for name, ms in r["direct"]:
+            slowest.setdefault(name, []).append(ms)
+    slowest = sorted(((name, statistics.median(ms)) for name, ms in slowest.items()), key=lambda item: -item[1])[:10]
+
+    print(f"median of {runs} runs")
+    print(f"import app    {import_ms:8.1f} ms")
+    print(f"create_app()  {create_app_ms:8.1f} ms, {connections} database connections")
+    print("slowest imports (cumulative ms):")
+    for name, ms in slowest:
+        print(f"  {name:<28} {ms:8.1f}")
+
+    if "--record" in sys.argv:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+        entry = {
+            "date": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "commit": commit,
+            "python": sys.version.split()[0],
+            "runs": runs,
+            "import_ms": round(import_ms, 1),
+            "create_app_ms": round(create_app_ms, 1),
+            "db_connections": connections,
+            "slowest": {name: round(ms, 1) for name, ms in slowest},
+        }
+        with open(HISTORY, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        print(f"recorded in {os.path.relpath(HISTORY, ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
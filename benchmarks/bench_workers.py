@@ -0,0 +1,194 @@
+"""Compare gunicorn sync workers with threaded (gthread) workers at equal worker counts.
+
+Seeds a throwaway SQLite database, then drives /dashboard, /expenses,
+/archive and /avatar/<id> with concurrent keep-alive clients against each
+server. db_latency_ms sleeps before every SQL statement, standing in for the
+round trip to a database on another host (0 = local SQLite only, where the
+work is mostly CPU and threads help less). GUNICORN_THREADS (default 4) sets
+the threads per gthread worker.
+
+Measured on a 1-CPU box with 2 workers, 4 threads and 32 clients, against
+the thread-pooled ASGI adapter this replaced (run under uvicorn):
+
+  ms per SQL    sync    gthread    asgi adapter
+  0             102     85         102 req/s
+  2              84     87          75 req/s
+  10             45     80-113     81-94 req/s
+
+The adapter never clearly beat gthread, which needs no code of its own,
+so it was dropped. Neither helps the CPU-bound case at 0 ms.
+
+Usage: python benchmarks/bench_workers.py [workers] [concurrency] [seconds] [db_latency_ms]
+"""
+import http.client
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+MEMBERS = 8
+EXPENSES = 3000
+
+
+def add_db_latency(flask_app) -> None:
+    latency = float(os.environ.get("BENCH_DB_LATENCY_MS", "0")) / 1000
+    if not latency:
+        return
+    from sqlalchemy import event
+    from models import db
+
+    with flask_app.app_context():
+        event.listen(db.engine, "before_cursor_execute", lambda *args: time.sleep(latency))
+
+
+def make_wsgi():
+    """gunicorn factory: the plain Flask app."""
+    from app import create_app
+
+    flask_app = create_app()
+    add_db_latency(flask_app)
+    return flask_app
+
+
+def seed() -> tuple[str, list[int]]:
+    """Create a household with MEMBERS users and EXPENSES expenses; return a session cookie and the user ids."""
+    from app import create_app
+    from models import db, User, Household, Membership
+    import ledger
+    import migrations
+
+    rng = random.Random(264)
+    flask_app = create_app()
+    with flask_app.app_context():
+        migrations.migrate(log=lambda _msg: None)
+        users = [User(name=f"member{i}", email=f"member{i}@example.com", password_hash="pw", email_verified=True) for i in range(MEMBERS)]
+        db.session.add_all(users)
+        db.session.flush()
+        household = Household(name="Bench", join_code="BENCH1", owner_id=users[0].id)
+        db.session.add(household)
+        db.session.flush()
+        db.session.add_all(Membership(household_id=household.id, user_id=u.id) for u in users)
+        ids = [u.id for u in users]
+        ledger.insert_expenses(
+            household.id,
+            [
+                (rng.choice(ids), f"expense {i}", rng.randrange(1, 200) * 250, date(2024, 1, 1) + timedelta(days=i % 365), rng.sample(ids, rng.randint(1, MEMBERS)))
+                for i in range(EXPENSES)
+            ],
+            set(ids),
+        )
+        db.session.commit()
+
+    client = flask_app.test_client()
+    client.post("/login", data={"email": "member0@example.com", "password": "pw"})
+    return client.get_cookie("session").value, ids
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until_up(port: int, proc: subprocess.Popen) -> None:
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("server exited during startup")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/login")
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+def load(port: int, cookie: str, paths: list[str], concurrency: int, seconds: float) -> dict:
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def client(n: int) -> None:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        mine, failed = [], 0
+        i = n
+        while time.monotonic() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            started = time.perf_counter()
+            try:
+                conn.request("GET", path, headers={"Cookie": f"session={cookie}"})
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status != 200:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+                continue
+            mine.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(mine)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    started = time.perf_counter()
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0.0
+    return {"requests": len(latencies), "rps": len(latencies) / elapsed, "p50": pct(0.5), "p95": pct(0.95), "errors": errors[0]}
+
+
+def main() -> None:
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 10
+    latency_ms = sys.argv[4] if len(sys.argv) > 4 else "2"
+
+    workdir = tempfile.mkdtemp(prefix="bench-workers-")
+    env = dict(
+        os.environ,
+        DATABASE_URL="sqlite:///" + os.path.join(workdir, "bench.db"),
+        SECRET_KEY="bench-secret",
+        JOB_WORKER_THREADS="0",
+        PYTHONPATH=os.pathsep.join([ROOT, BENCH_DIR]),
+    )
+    os.environ.update(env)
+    cookie, ids = seed()
+    paths = ["/dashboard", "/expenses", "/archive"] + [f"/avatar/{uid}" for uid in ids[:3]]
+    env["BENCH_DB_LATENCY_MS"] = latency_ms
+
+    threads = os.environ.get("GUNICORN_THREADS", "4")
+    print(f"{workers} workers ({threads} threads each for gthread), {concurrency} clients, {seconds:g}s each, {latency_ms} ms per SQL statement")
+    print(f"{'server':>16} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+    for name, worker_args in (("gunicorn sync", []), ("gunicorn gthread", ["-k", "gthread", "--threads", threads])):
+        port = free_port()
+        args = ["-m", "gunicorn", "-w", str(workers), *worker_args, "-b", f"127.0.0.1:{port}", "--log-level", "warning", "bench_workers:make_wsgi()"]
+        proc = subprocess.Popen([sys.executable, *args], cwd=workdir, env=env)
+        try:
+            wait_until_up(port, proc)
+            r = load(port, cookie, paths, concurrency, seconds)
+        finally:
+            proc.terminate()
+            proc.wait(30)
+        print(f"{name:>16} {r['requests']:>9} {r['rps']:>8.1f} {r['p50']:>8.1f} {r['p95']:>8.1f} {r['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+
+# Values SQLite accepts for the journal_mode and synchronous pragmas
+SQLITE_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SQLITE_SYNCHRONOUS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+
+def is_sqlite_memory(url) -> bool:
+    return url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+
+
+def engine_options(config) -> dict:
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured database, from the DB_* and SQLITE_* settings."""
+    url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    backend = url.get_backend_name()
+    options = {"pool_pre_ping": config["DB_POOL_PRE_PING"]}
+    connect_args = {}
+
+    if backend == "sqlite":
+        # The driver's own lock wait, in seconds; the busy_timeout pragma sets the same thing
+        connect_args["timeout"] = config["SQLITE_BUSY_TIMEOUT_MS"] / 1000
+        if is_sqlite_memory(url):
+            # Flask-SQLAlchemy uses a single shared connection (StaticPool) here
+            return {**options, "connect_args": connect_args}
+    elif backend == "postgresql" and config["DB_STATEMENT_TIMEOUT_MS"]:
+        connect_args["options"] = f"-c statement_timeout={config['DB_STATEMENT_TIMEOUT_MS']}"
+    elif backend == "mysql" and config["DB_STATEMENT_TIMEOUT_MS"]:
+        connect_args["init_command"] = f"SET SESSION max_execution_time={config['DB_STATEMENT_TIMEOUT_MS']}"
+
+    options.update(
+        pool_size=config["DB_POOL_SIZE"],
+        max_overflow=config["DB_MAX_OVERFLOW"],
+        pool_timeout=config["DB_POOL_TIMEOUT_SECONDS"],
+        pool_recycle=config["DB_POOL_RECYCLE_SECONDS"],
+    )
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+def configure_engine(engine, config) -> None:
+    """Apply per-connection settings that engine options cannot express (SQLite pragmas)."""
+    if engine.dialect.name != "sqlite":
+        return
+    pragmas = []
+    journal_mode = config["SQLITE_JOURNAL_MODE"].upper()
+    if journal_mode in SQLITE_JOURNAL_MODES and not is_sqlite_memory(engine.url):
+        # WAL lets readers run alongside the single writer instead of blocking on it
+        pragmas.append(f"PRAGMA journal_mode={journal_mode}")
+    synchronous = config["SQLITE_SYNCHRONOUS"].upper()
+    if synchronous in SQLITE_SYNCHRONOUS:
+        # NORMAL is durable across application crashes in WAL mode; only an OS crash can lose the last commits
+        pragmas.append(f"PRAGMA synchronous={synchronous}")
+    pragmas.append(f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}")
+    if config["SQLITE_MMAP_SIZE"]:
+        pragmas.append(f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}")
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def create_replica_engines(config) -> list:
+    """Engines for DATABASE_REPLICA_URLS, with the same pool options and pragmas as the primary."""
+    engines = []
+    for url in config["DATABASE_REPLICA_URLS"]:
+        engine = create_engine(url, **engine_options({**config, "SQLALCHEMY_DATABASE_URI": url}))
+        configure_engine(engine, config)
+        engines.append(engine)
+    return engines
+
+
+def _is_write(clause) -> bool:
+    return clause is not None and (getattr(clause, "is_dml", False) or getattr(clause, "_for_update_arg", None) is not None)
+
+
+class RoutingSession(Session):
+    """db.session class that sends reads to the replica picked for the current request.
+
+    A request opts in by setting g.db_replica to a replica engine; without
+    it (and outside requests) everything uses the primary. Flushes, DML and
+    SELECT ... FOR UPDATE always go to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_app_context():
+            replica = g.get("db_replica")
+            if replica is not None and not _is_write(clause):
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
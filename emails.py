@@ -0,0 +1,69 @@
+import threading
+from typing import NamedTuple
+
+
+class RenderedEmail(NamedTuple):
+    subject: str
+    text_body: str
+    html_body: str
+
+
+class EmailRenderer:
+    """Renders templates/emails/<name>.txt and .html for a given language.
+
+    Jinja compiles each template once and caches it, with its static text
+    kept as constants, so a render only evaluates the template's
+    expressions. The renderer adds a translator per language that looks up
+    placeholder-free strings once. Rendering does not need a request, which
+    lets background jobs send mail in the recipient's language.
+    """
+
+    def __init__(self, jinja_env, translate, base_context=None):
+        # translate(lang, key, **kwargs) -> str
+        self.env = jinja_env
+        self.translate = translate
+        self.base_context = dict(base_context or {})
+        self._translators = {}
+        self._lock = threading.Lock()
+
+    def translator(self, lang: str):
+        """A t() bound to lang; strings without placeholders are looked up once."""
+        t = self._translators.get(lang)
+        if t is not None:
+            return t
+        cache = {}
+
+        def t(key: str, /, **kwargs) -> str:
+            if kwargs:
+                return self.translate(lang, key, **kwargs)
+            text = cache.get(key)
+            if text is None:
+                text = cache[key] = self.translate(lang, key)
+            return text
+
+        with self._lock:
+            return self._translators.setdefault(lang, t)
+
+    def render(self, name: str, lang: str, subject_key: str, **context) -> RenderedEmail:
+        return self.render_many(name, lang, subject_key, [context])[0]
+
+    def render_many(self, name: str, lang: str, subject_key: str, recipients, **shared) -> list[RenderedEmail]:
+        """Render one email per recipient context.
+
+        shared holds values common to every recipient (amounts, dates,
+        URLs); each item of recipients holds the per-recipient values, such
+        as user. The templates, translator, shared context and subject are
+        set up once for the batch; each recipient is then one run of the
+        text and HTML templates. The subject may use the shared values as
+        placeholders.
+        """
+        text_template = self.env.get_template(f"emails/{name}.txt")
+        html_template = self.env.get_template(f"emails/{name}.html")
+        t = self.translator(lang)
+        base = {**self.base_context, **shared, "t": t, "lang": lang}
+        subject = t(subject_key, **shared)
+        rendered = []
+        for context in recipients:
+            values = {**base, **context}
+            rendered.append(RenderedEmail(subject, text_template.render(values), html_template.render(values)))
+        return rendered
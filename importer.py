@@ -0,0 +1,199 @@
+import csv
+import json
+import time
+
+from models import db, User, Membership, Expense
+from utils import parse_iso_date
+import ledger
+
+IMPORT_BATCH_SIZE = 1000
+# Errors kept for the report; the rest are only counted
+MAX_REPORTED_ERRORS = 20
+
+
+def iter_csv_rows(stream):
+    """Yield (line number, row dict) from a CSV text stream with a header row."""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, {(k or "").strip().lower(): v for k, v in row.items()}
+
+
+def iter_json_rows(stream, chunk_size: int = 1 << 16):
+    """Yield (index, object) from a JSON array or JSON Lines text stream, reading it in chunks."""
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+    in_array = None
+    index = 0
+    while True:
+        # Skip whitespace and separators, refilling the buffer as needed
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buf) or eof:
+                break
+            chunk = stream.read(chunk_size)
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+        if pos >= len(buf):
+            return
+        if in_array is None:
+            in_array = buf[pos] == "["
+            if in_array:
+                pos += 1
+                continue
+        if in_array and buf[pos] == "]":
+            return
+        try:
+            obj, pos = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # The next value is incomplete; read more and retry
+            chunk = stream.read(chunk_size)
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+        index += 1
+        yield index, obj
+        if pos > chunk_size:
+            buf, pos = buf[pos:], 0
+
+
+def iter_file_rows(filename: str, stream):
+    """Pick the CSV or JSON reader from the file extension (.csv, .json, .jsonl, .ndjson)."""
+    ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if ext == "csv":
+        return iter_csv_rows(stream)
+    if ext in ("json", "jsonl", "ndjson"):
+        return iter_json_rows(stream)
+    raise ValueError(f"unsupported import file type: {filename}")
+
+
+def _member_lookup(household_id: int):
+    """Map member ids, emails and unambiguous names to user ids for the household."""
+    members = (
+        db.session.query(User)
+        .join(Membership, Membership.user_id == User.id)
+        .filter(Membership.household_id == household_id)
+        .all()
+    )
+    lookup = {}
+    name_counts = {}
+    for u in members:
+        name_counts[u.name.strip().casefold()] = name_counts.get(u.name.strip().casefold(), 0) + 1
+    for u in members:
+        lookup[str(u.id)] = u.id
+        lookup[u.email.strip().lower()] = u.id
+        name = u.name.strip().casefold()
+        if name_counts[name] == 1:
+            lookup.setdefault(name, u.id)
+    return lookup, [u.id for u in members]
+
+
+def _resolve(lookup: dict, token) -> int | None:
+    token = str(token).strip()
+    return lookup.get(token) or lookup.get(token.lower()) or lookup.get(token.casefold())
+
+
+def _until_unreadable(rows, stats: dict):
+    # Stop at the first part of the file that cannot be parsed, keeping the reason
+    try:
+        yield from rows
+    except (ValueError, csv.Error) as exc:
+        stats["error"] = str(exc)
+
+
+def import_expenses(household_id: int, rows, batch_size: int = IMPORT_BATCH_SIZE, on_batch=None) -> dict:
+    """Import (ref, row) pairs as active expenses of the household.
+
+    Each row has title, amount_iqd (or amount), expense_date (or date), payer
+    (member id, email or unique name) and participants (a list, or a string
+    separated by ";" or "|"; empty means every current member). Rows that
+    repeat an existing expense or an earlier row (same payer, title, amount
+    and date) are skipped, as are invalid rows. Expenses are inserted and
+    committed batch_size at a time; on_batch(stats) is called after each
+    batch. Returns the final stats.
+
+    When the file cannot be parsed past some point (malformed CSV or JSON,
+    bad UTF-8), the rows read before it are still imported and stats["error"]
+    says why reading stopped; it is None otherwise. Importing the fixed file
+    again skips the rows already imported as duplicates.
+    """
+    lookup, all_member_ids = _member_lookup(household_id)
+    member_ids = set(all_member_ids)
+
+    seen = set()
+    existing = (
+        db.session.query(Expense.payer_id, Expense.title, Expense.amount_iqd, Expense.expense_date)
+        .filter(Expense.household_id == household_id)
+        .yield_per(5000)
+    )
+    for payer_id, title, amount_iqd, expense_date in existing:
+        seen.add((payer_id, title, amount_iqd, expense_date))
+
+    stats = {"read": 0, "inserted": 0, "duplicates": 0, "invalid": 0, "errors": [], "error": None, "seconds": 0.0, "rows_per_second": 0.0}
+    started = time.monotonic()
+
+    def invalid(ref, message: str):
+        stats["invalid"] += 1
+        if len(stats["errors"]) < MAX_REPORTED_ERRORS:
+            stats["errors"].append(f"{ref}: {message}")
+
+    def flush(batch):
+        if batch:
+            ledger.insert_expenses(household_id, batch, member_ids)
+            db.session.commit()
+            stats["inserted"] += len(batch)
+        stats["seconds"] = time.monotonic() - started
+        stats["rows_per_second"] = stats["read"] / stats["seconds"] if stats["seconds"] else 0.0
+        if on_batch:
+            on_batch(stats)
+
+    batch = []
+    for ref, row in _until_unreadable(rows, stats):
+        stats["read"] += 1
+        if not isinstance(row, dict):
+            invalid(ref, "not an object")
+            continue
+
+        title = str(row.get("title") or "").strip()
+        if not title:
+            invalid(ref, "missing title")
+            continue
+        try:
+            amount_iqd = int(str(row.get("amount_iqd") or row.get("amount") or "").replace(",", "").strip())
+        except ValueError:
+            amount_iqd = 0
+        if amount_iqd <= 0:
+            invalid(ref, "amount must be a positive integer")
+            continue
+        expense_date = parse_iso_date(str(row.get("expense_date") or row.get("date") or ""))
+        if expense_date is None:
+            invalid(ref, "date must be YYYY-MM-DD")
+            continue
+        payer_id = _resolve(lookup, row.get("payer") or row.get("payer_id") or row.get("payer_email") or "")
+        if payer_id is None:
+            invalid(ref, "payer is not a member of the household")
+            continue
+
+        raw = row.get("participants") or []
+        if isinstance(raw, str):
+            raw = [p for p in raw.replace("|", ";").split(";") if p.strip()]
+        participant_ids = [_resolve(lookup, p) for p in raw] if raw else list(all_member_ids)
+        if None in participant_ids:
+            invalid(ref, "participant is not a member of the household")
+            continue
+        participant_ids = list(dict.fromkeys(participant_ids))
+
+        key = (payer_id, title, amount_iqd, expense_date)
+        if key in seen:
+            stats["duplicates"] += 1
+            continue
+        seen.add(key)
+
+        batch.append((payer_id, title, amount_iqd, expense_date, participant_ids))
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    flush(batch)
+    return stats
@@ -0,0 +1,181 @@
+import json
+import os
+import random
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from models import db, Job
+
+# kind -> callable(payload dict); registered by create_app()
+HANDLERS = {}
+
+# Longest wait between retries, whatever the attempt count
+MAX_BACKOFF_SECONDS = 3600
+# How often each worker looks for jobs whose worker died (locks expire after JOB_LOCK_TIMEOUT_SECONDS >= 60)
+RECOVER_INTERVAL_SECONDS = 60
+
+
+def register(kind: str, handler) -> None:
+    HANDLERS[kind] = handler
+
+
+def enqueue(kind: str, payload: dict, delay_seconds: float = 0, max_attempts: int | None = None) -> Job:
+    """Queue a job. It is added to the session, so it commits (or rolls back) with the caller's changes."""
+    job = Job(
+        kind=kind,
+        payload=json.dumps(payload),
+        status="queued",
+        attempts=0,
+        max_attempts=max_attempts or current_app.config["JOB_MAX_ATTEMPTS"],
+        run_at=datetime.utcnow() + timedelta(seconds=delay_seconds),
+    )
+    db.session.add(job)
+    return job
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Exponential backoff with +/-10% jitter: base, 2*base, 4*base, ... capped at MAX_BACKOFF_SECONDS."""
+    base = current_app.config["JOB_RETRY_BASE_SECONDS"]
+    delay = min(base * 2 ** max(attempts - 1, 0), MAX_BACKOFF_SECONDS)
+    return delay * random.uniform(0.9, 1.1)
+
+
+def recover_stale() -> int:
+    """Requeue jobs whose worker died mid-run, or fail them once out of attempts. Returns how many changed.
+
+    Runs on the maintenance schedule in work(), not on every poll, and only
+    writes when a stale lock exists, so idle polls never take a write lock.
+    """
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=current_app.config["JOB_LOCK_TIMEOUT_SECONDS"])
+    if not db.session.query(Job.query.filter(Job.status == "running", Job.locked_at < stale).exists()).scalar():
+        db.session.commit()
+        return 0
+    requeued = Job.query.filter(Job.status == "running", Job.locked_at < stale, Job.attempts < Job.max_attempts).update(
+        {Job.status: "queued", Job.locked_at: None, Job.locked_by: None}, synchronize_session=False
+    )
+    failed = Job.query.filter(Job.status == "running", Job.locked_at < stale).update(
+        {Job.status: "failed", Job.finished_at: now, Job.last_error: "worker lock expired"}, synchronize_session=False
+    )
+    db.session.commit()
+    return requeued + failed
+
+
+def claim(worker_id: str) -> Job | None:
+    """Mark the next due job as running for this worker and return it, or None if nothing is due.
+
+    Looking for due jobs is a plain SELECT; only a job found due is claimed,
+    with a conditional UPDATE on its status, so concurrent workers (threads
+    or processes, SQLite or Postgres) never run a job twice.
+    """
+    now = datetime.utcnow()
+    due = (
+        db.session.query(Job.id)
+        .filter(Job.status == "queued", Job.run_at <= now)
+        .order_by(Job.run_at.asc(), Job.id.asc())
+        .limit(10)
+        .all()
+    )
+    # End the read transaction (no write lock was taken); each claim below commits on its own
+    db.session.commit()
+    for (job_id,) in due:
+        claimed = Job.query.filter(Job.id == job_id, Job.status == "queued").update(
+            {Job.status: "running", Job.locked_at: now, Job.locked_by: worker_id, Job.attempts: Job.attempts + 1},
+            synchronize_session=False,
+        )
+        db.session.commit()
+        if claimed:
+            return db.session.get(Job, job_id)
+    return None
+
+
+def run(job: Job) -> bool:
+    """Run a claimed job, then mark it done or schedule a retry. Returns True on success."""
+    job_id, kind = job.id, job.kind
+    try:
+        handler = HANDLERS.get(kind)
+        if handler is None:
+            raise LookupError(f"no handler registered for job kind {kind!r}")
+        handler(json.loads(job.payload))
+    except Exception as e:
+        db.session.rollback()
+        job = db.session.get(Job, job_id)
+        now = datetime.utcnow()
+        job.last_error = f"{type(e).__name__}: {e}"[:2000]
+        job.locked_at = None
+        job.locked_by = None
+        if job.attempts >= job.max_attempts:
+            job.status = "failed"
+            job.finished_at = now
+        else:
+            job.status = "queued"
+            job.run_at = now + timedelta(seconds=backoff_seconds(job.attempts))
+        db.session.commit()
+        current_app.logger.warning("Job %s (%s) attempt %s failed: %s", job_id, kind, job.attempts, job.last_error)
+        return False
+
+    job = db.session.get(Job, job_id)
+    job.status = "done"
+    job.finished_at = datetime.utcnow()
+    job.last_error = None
+    job.locked_at = None
+    job.locked_by = None
+    db.session.commit()
+    return True
+
+
+def run_pending(worker_id: str = "inline", limit: int | None = None) -> int:
+    """Run due jobs in the current thread until none are left (or limit is reached). Returns how many ran."""
+    count = 0
+    while limit is None or count < limit:
+        job = claim(worker_id)
+        if job is None:
+            break
+        run(job)
+        count += 1
+    return count
+
+
+def prune(retention_days: int) -> int:
+    """Delete finished jobs older than retention_days."""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    deleted = Job.query.filter(Job.status.in_(("done", "failed")), Job.finished_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+
+def work(app, stop: threading.Event | None = None, once: bool = False) -> None:
+    """Poll for and run jobs until stop is set (or a single pass with once=True)."""
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+    stop = stop or threading.Event()
+    next_recover = next_prune = 0.0
+    while not stop.is_set():
+        with app.app_context():
+            try:
+                if time.monotonic() >= next_recover:
+                    recover_stale()
+                    next_recover = time.monotonic() + RECOVER_INTERVAL_SECONDS
+                run_pending(worker_id)
+                if time.monotonic() >= next_prune:
+                    prune(app.config["JOB_RETENTION_DAYS"])
+                    next_prune = time.monotonic() + 3600
+            except Exception:
+                db.session.rollback()
+                app.logger.exception("Job worker %s failed to poll", worker_id)
+        if once:
+            return
+        stop.wait(app.config["JOB_POLL_SECONDS"])
+
+
+def start_workers(app, count: int) -> list[threading.Thread]:
+    """Start count daemon worker threads in this process."""
+    threads = []
+    for i in range(count):
+        thread = threading.Thread(target=work, args=(app,), name=f"job-worker-{i + 1}", daemon=True)
+        thread.start()
+        threads.append(thread)
+    return threads
@@ -0,0 +1,283 @@
+from datetime import datetime
+
+from sqlalchemy import func, insert, or_
+
+from models import db, User, Household, Membership, Expense, ExpenseParticipant, HouseholdBalance, SettleSession, SettleSessionBalance
+from utils import add_share, compute_balance_totals, net_balances_from_totals
+
+
+def _member_ids(household_id: int) -> set[int]:
+    rows = db.session.query(Membership.user_id).filter(Membership.household_id == household_id).all()
+    return {uid for (uid,) in rows}
+
+
+def bump_version(household_id: int) -> None:
+    """Invalidate cached balances for the household (see Household.version)."""
+    Household.query.filter_by(id=household_id).update({Household.version: Household.version + 1})
+
+
+def apply_expense(household_id: int, payer_id: int, amount_iqd: int, participant_ids, member_ids=None, sign: int = 1) -> None:
+    """Add (sign=1) or remove (sign=-1) one active expense from the household ledger.
+
+    Follows compute_net_balances: nothing is recorded when the payer is not a
+    current member, and only current members are charged their share.
+    Changes are left in the session for the caller to commit.
+    """
+    apply_expenses(household_id, [(payer_id, amount_iqd, participant_ids)], member_ids, sign)
+
+
+def apply_expenses(household_id: int, expenses, member_ids=None, sign: int = 1) -> None:
+    """Apply several (payer_id, amount_iqd, participant_ids) expenses, locking each ledger row once."""
+    bump_version(household_id)
+    if member_ids is None:
+        member_ids = _member_ids(household_id)
+    expenses = [(payer_id, int(amount), list(pids)) for payer_id, amount, pids in expenses if payer_id in member_ids]
+    if not expenses:
+        return
+
+    touched = set()
+    for payer_id, _amount, participant_ids in expenses:
+        touched.add(payer_id)
+        touched.update(uid for uid in participant_ids if uid in member_ids)
+    rows = {
+        r.user_id: r
+        for r in HouseholdBalance.query.filter(
+            HouseholdBalance.household_id == household_id,
+            HouseholdBalance.user_id.in_(touched),
+        ).with_for_update()
+    }
+    for uid in touched:
+        if uid not in rows:
+            rows[uid] = HouseholdBalance(household_id=household_id, user_id=uid, paid_iqd=0, consumed_num=0, consumed_den=1)
+            db.session.add(rows[uid])
+
+    for payer_id, amount, participant_ids in expenses:
+        amount *= sign
+        rows[payer_id].paid_iqd += amount
+        n = len(participant_ids)
+        for uid in participant_ids:
+            if uid in member_ids:
+                r = rows[uid]
+                r.consumed_num, r.consumed_den = add_share(r.consumed_num, r.consumed_den, amount, n)
+
+
+def insert_expenses(household_id: int, expenses, member_ids=None) -> list[int]:
+    """Insert active (payer_id, title, amount_iqd, expense_date, participant_ids) expenses and apply them.
+
+    Uses one multi-row INSERT for the expenses and one executemany INSERT for
+    their participants. Returns the new ids in input order; changes are left
+    in the session for the caller to commit.
+    """
+    expenses = list(expenses)
+    if not expenses:
+        return []
+    expense_ids = db.session.scalars(
+        insert(Expense).returning(Expense.id, sort_by_parameter_order=True),
+        [
+            {
+                "household_id": household_id,
+                "payer_id": payer_id,
+                "title": title,
+                "amount_iqd": amount_iqd,
+                "expense_date": expense_date,
+                "is_archived": False,
+            }
+            for payer_id, title, amount_iqd, expense_date, _pids in expenses
+        ],
+    ).all()
+    db.session.execute(
+        insert(ExpenseParticipant),
+        [
+            {"expense_id": expense_id, "user_id": uid}
+            for expense_id, (*_fields, pids) in zip(expense_ids, expenses)
+            for uid in pids
+        ],
+    )
+    apply_expenses(household_id, [(payer_id, amount_iqd, pids) for payer_id, _t, amount_iqd, _d, pids in expenses], member_ids)
+    return expense_ids
+
+
+def compute_household_totals(household_id: int) -> dict[int, tuple[int, int, int]]:
+    """Recompute per-member (paid, consumed_num, consumed_den) from raw expense rows."""
+    members = (
+        db.session.query(User)
+        .join(Membership, Membership.user_id == User.id)
+        .filter(Membership.household_id == household_id)
+        .all()
+    )
+    active = Expense.query.filter_by(household_id=household_id, is_archived=False).all()
+    participants = (
+        db.session.query(ExpenseParticipant.expense_id, ExpenseParticipant.user_id)
+        .join(Expense, ExpenseParticipant.expense_id == Expense.id)
+        .filter(Expense.household_id == household_id, Expense.is_archived == False)
+        .all()
+    )
+    parts_map = {}
+    for expense_id, uid in participants:
+        parts_map.setdefault(expense_id, []).append(uid)
+    return compute_balance_totals(members, active, parts_map)
+
+
+def stored_household_totals(household_id: int) -> dict[int, tuple[int, int, int]]:
+    rows = HouseholdBalance.query.filter_by(household_id=household_id).all()
+    return {r.user_id: (int(r.paid_iqd), int(r.consumed_num), int(r.consumed_den)) for r in rows}
+
+
+def rebuild_household(household_id: int) -> dict[int, tuple[tuple[int, int, int], tuple[int, int, int]]]:
+    """Reconcile the household's ledger rows with totals recomputed from raw rows.
+
+    Returns the rows that had drifted as user_id -> (stored, expected).
+    Changes are left in the session for the caller to commit.
+    """
+    bump_version(household_id)
+    expected = compute_household_totals(household_id)
+    rows = {r.user_id: r for r in HouseholdBalance.query.filter_by(household_id=household_id).with_for_update()}
+    zero = (0, 0, 1)
+    drift = {}
+    for uid in set(expected) | set(rows):
+        r = rows.get(uid)
+        have = (int(r.paid_iqd), int(r.consumed_num), int(r.consumed_den)) if r else zero
+        want = expected.get(uid, zero)
+        if have != want:
+            drift[uid] = (have, want)
+        if uid not in expected:
+            db.session.delete(r)
+        elif r is None:
+            db.session.add(HouseholdBalance(household_id=household_id, user_id=uid, paid_iqd=want[0], consumed_num=want[1], consumed_den=want[2]))
+        elif have != want:
+            r.paid_iqd, r.consumed_num, r.consumed_den = want
+    return drift
+
+
+def delete_household(household_id: int) -> None:
+    """Delete a household and everything that belongs to it.
+
+    Child rows are removed with subquery-based deletes, so expense ids are
+    never loaded into Python. Changes are left in the session for the
+    caller to commit.
+    """
+    expense_ids = db.session.query(Expense.id).filter(Expense.household_id == household_id)
+    ExpenseParticipant.query.filter(ExpenseParticipant.expense_id.in_(expense_ids)).delete(synchronize_session=False)
+    Expense.query.filter_by(household_id=household_id).delete(synchronize_session=False)
+    Membership.query.filter_by(household_id=household_id).delete(synchronize_session=False)
+    HouseholdBalance.query.filter_by(household_id=household_id).delete(synchronize_session=False)
+    settle_ids = db.session.query(SettleSession.id).filter(SettleSession.household_id == household_id)
+    SettleSessionBalance.query.filter(SettleSessionBalance.settle_id.in_(settle_ids)).delete(synchronize_session=False)
+    SettleSession.query.filter_by(household_id=household_id).delete(synchronize_session=False)
+    Household.query.filter_by(id=household_id).delete()
+
+
+def delete_user(user_id: int) -> None:
+    """Delete a user and the rows that still reference them, rebuilding the ledgers this changes.
+
+    Changes are left in the session for the caller to commit.
+    """
+    # Households whose active splits change once this user's rows are gone
+    affected = [
+        hid
+        for (hid,) in db.session.query(Expense.household_id)
+        .join(ExpenseParticipant, ExpenseParticipant.expense_id == Expense.id)
+        .filter(ExpenseParticipant.user_id == user_id, Expense.is_archived == False)
+        .distinct()
+    ]
+
+    paid_ids = db.session.query(Expense.id).filter(Expense.payer_id == user_id)
+    ExpenseParticipant.query.filter(
+        or_(ExpenseParticipant.user_id == user_id, ExpenseParticipant.expense_id.in_(paid_ids))
+    ).delete(synchronize_session=False)
+    Expense.query.filter_by(payer_id=user_id).delete(synchronize_session=False)
+    Membership.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+    HouseholdBalance.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+    SettleSessionBalance.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+    SettleSession.query.filter_by(settled_by_id=user_id).update({SettleSession.settled_by_id: None}, synchronize_session=False)
+    Household.query.filter_by(owner_id=user_id).update({Household.owner_id: None}, synchronize_session=False)
+    for hid in affected:
+        rebuild_household(hid)
+    User.query.filter_by(id=user_id).delete()
+
+
+def purge_deleted(household_ids=None, user_ids=None) -> tuple[int, int]:
+    """Purge households and then users marked deleted_at, committing after each one.
+
+    Pass ids to limit the purge; by default everything pending is purged.
+    Returns the number of households and users purged.
+    """
+    households = db.session.query(Household.id).filter(Household.deleted_at != None)
+    if household_ids is not None:
+        households = households.filter(Household.id.in_(household_ids))
+    household_count = 0
+    for (hid,) in households.all():
+        delete_household(hid)
+        db.session.commit()
+        household_count += 1
+
+    users = db.session.query(User.id).filter(User.deleted_at != None)
+    if user_ids is not None:
+        users = users.filter(User.id.in_(user_ids))
+    user_count = 0
+    for (uid,) in users.all():
+        delete_user(uid)
+        db.session.commit()
+        user_count += 1
+    return household_count, user_count
+
+
+def backfill_settle_sessions() -> int:
+    """Create SettleSession summaries for archived settle ids that predate the table.
+
+    Membership at settle time is not recorded, so everyone who paid for or took
+    part in the session's expenses is treated as a member. Returns the number
+    of sessions created; changes are left for the caller to commit.
+    """
+    missing = (
+        db.session.query(
+            Expense.archived_settle_id,
+            Expense.household_id,
+            func.min(Expense.archived_month),
+            func.max(Expense.archived_settled_at),
+            func.min(Expense.expense_date),
+            func.max(Expense.expense_date),
+            func.coalesce(func.sum(Expense.amount_iqd), 0),
+            func.count(Expense.id),
+        )
+        .outerjoin(SettleSession, SettleSession.id == Expense.archived_settle_id)
+        .filter(Expense.is_archived == True, Expense.archived_settle_id != None, SettleSession.id == None)
+        .group_by(Expense.archived_settle_id, Expense.household_id)
+        .all()
+    )
+    for settle_id, hid, month, settled_at, start_date, end_date, total, count in missing:
+        expenses = Expense.query.filter_by(household_id=hid, archived_settle_id=settle_id).all()
+        participants = (
+            db.session.query(ExpenseParticipant.expense_id, ExpenseParticipant.user_id)
+            .join(Expense, ExpenseParticipant.expense_id == Expense.id)
+            .filter(Expense.household_id == hid, Expense.archived_settle_id == settle_id)
+            .all()
+        )
+        parts_map = {}
+        for expense_id, uid in participants:
+            parts_map.setdefault(expense_id, []).append(uid)
+        user_ids = {e.payer_id for e in expenses} | {uid for _eid, uid in participants}
+        users = User.query.filter(User.id.in_(user_ids)).all() if user_ids else []
+        totals = compute_balance_totals(users, expenses, parts_map)
+        net = net_balances_from_totals(totals)
+
+        db.session.add(SettleSession(
+            id=settle_id,
+            household_id=hid,
+            month=month or (settled_at or datetime.utcnow()).date().replace(day=1),
+            settled_at=settled_at or datetime.utcnow(),
+            start_date=start_date,
+            end_date=end_date,
+            total_iqd=int(total or 0),
+            expense_count=count,
+        ))
+        for uid, (paid, num, den) in totals.items():
+            db.session.add(SettleSessionBalance(
+                settle_id=settle_id,
+                user_id=uid,
+                paid_iqd=paid,
+                consumed_num=num,
+                consumed_den=den,
+                net_iqd=net[uid],
+            ))
+    return len(missing)
@@ -0,0 +1,239 @@
+import threading
+import time
+from collections import deque
+from itertools import count
+
+
+def is_connection_error(e: Exception) -> bool:
+    """True if the error means the connection is unusable, not that the server refused the message."""
+    import smtplib
+
+    if isinstance(e, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    # SMTPException subclasses OSError, so plain socket errors are the OSErrors that are not SMTP replies
+    return isinstance(e, OSError) and not isinstance(e, smtplib.SMTPException)
+
+
+class PooledConnection:
+    """One authenticated SMTP session plus its usage counters."""
+
+    _ids = count(1)
+
+    def __init__(self, smtp: "smtplib.SMTP"):
+        self.id = next(self._ids)
+        self.smtp = smtp
+        self.created_at = time.time()
+        self.last_used = time.monotonic()
+        self.messages_sent = 0
+        self.noops = 0
+        self.errors = 0
+
+    def metrics(self) -> dict:
+        return {
+            "id": self.id,
+            "age_seconds": round(time.time() - self.created_at, 1),
+            "idle_seconds": round(time.monotonic() - self.last_used, 1),
+            "messages_sent": self.messages_sent,
+            "noops": self.noops,
+            "errors": self.errors,
+        }
+
+
+class SMTPPool:
+    """A thread-safe pool of logged-in SMTP connections.
+
+    Connections are reused across messages instead of paying for connect,
+    EHLO, STARTTLS and login on every send. A connection that has been idle
+    for check_after_seconds is checked with NOOP before reuse; one idle for
+    max_idle_seconds or used for max_messages is closed and replaced. A send
+    that fails because the connection dropped is retried once on a fresh one.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str = "",
+        password: str = "",
+        use_tls: bool = True,
+        use_ssl: bool = False,
+        timeout: float = 10,
+        size: int = 2,
+        max_idle_seconds: float = 60,
+        max_messages: int = 100,
+        check_after_seconds: float = 5,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self.size = max(1, size)
+        self.max_idle_seconds = max_idle_seconds
+        self.max_messages = max_messages
+        self.check_after_seconds = check_after_seconds
+
+        self._idle = deque()
+        self._in_use = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._totals = {"connects": 0, "reconnects": 0, "sent": 0, "failed": 0, "noops": 0, "closed": 0}
+
+    def _connect(self) -> PooledConnection:
+        # Loaded on first connect, so processes that never send mail skip smtplib and ssl
+        import smtplib
+        import ssl
+
+        if self.use_ssl:
+            smtp = smtplib.SMTP_SSL(self.host, self.port, context=ssl.create_default_context(), timeout=self.timeout)
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            smtp.ehlo()
+            if self.use_tls and not self.use_ssl:
+                smtp.starttls(context=ssl.create_default_context())
+                smtp.ehlo()
+            if self.username:
+                smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        with self._lock:
+            self._totals["connects"] += 1
+        return PooledConnection(smtp)
+
+    def _close(self, conn: PooledConnection, quit: bool = True) -> None:
+        try:
+            if quit:
+                conn.smtp.quit()
+            else:
+                conn.smtp.close()
+        except Exception:
+            conn.smtp.close()
+        with self._lock:
+            self._totals["closed"] += 1
+
+    def _healthy(self, conn: PooledConnection) -> bool:
+        idle = time.monotonic() - conn.last_used
+        if idle >= self.max_idle_seconds or conn.messages_sent >= self.max_messages:
+            return False
+        if idle < self.check_after_seconds:
+            return True
+        conn.noops += 1
+        with self._lock:
+            self._totals["noops"] += 1
+        try:
+            return conn.smtp.noop()[0] == 250
+        except OSError:  # includes SMTPException
+            return False
+
+    def _checkout(self) -> PooledConnection:
+        self._slots.acquire()
+        try:
+            while True:
+                with self._lock:
+                    conn = self._idle.pop() if self._idle else None
+                if conn is None:
+                    conn = self._connect()
+                    break
+                if self._healthy(conn):
+                    break
+                self._close(conn, quit=conn.messages_sent >= self.max_messages)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._in_use[conn.id] = conn
+        return conn
+
+    def _checkin(self, conn: PooledConnection, broken: bool = False) -> None:
+        with self._lock:
+            self._in_use.pop(conn.id, None)
+            if not broken:
+                conn.last_used = time.monotonic()
+                self._idle.append(conn)
+        if broken:
+            self._close(conn, quit=False)
+        self._slots.release()
+
+    def send(self, msg) -> None:
+        """Send an email.message.EmailMessage, raising if it could not be delivered."""
+        failures = self.send_many([msg])
+        if failures:
+            raise failures[0][1]
+
+    def send_many(self, msgs) -> list:
+        """Send several messages over one connection, in order.
+
+        A dropped connection is replaced and the message retried once; a
+        message the server refuses is skipped. Returns (msg, error) for every
+        message that was not delivered.
+        """
+        msgs = list(msgs)
+        failures = []
+        conn = None
+        try:
+            for i, msg in enumerate(msgs):
+                if conn is not None and conn.messages_sent >= self.max_messages:
+                    self._checkin(conn)
+                    conn = None
+                for attempt in (1, 2):
+                    if conn is None:
+                        try:
+                            conn = self._checkout()
+                        except Exception as e:
+                            # Cannot reach the server: nothing else in the batch will go out either
+                            with self._lock:
+                                self._totals["failed"] += len(msgs) - i
+                            failures.extend((m, e) for m in msgs[i:])
+                            return failures
+                    try:
+                        conn.smtp.send_message(msg)
+                    except Exception as e:
+                        conn.errors += 1
+                        if is_connection_error(e):
+                            self._checkin(conn, broken=True)
+                            conn = None
+                            with self._lock:
+                                self._totals["reconnects" if attempt == 1 else "failed"] += 1
+                            if attempt == 1:
+                                continue
+                        else:
+                            # The server said no; reset the transaction so the session can be reused
+                            try:
+                                conn.smtp.rset()
+                            except OSError:  # includes SMTPException
+                                self._checkin(conn, broken=True)
+                                conn = None
+                            with self._lock:
+                                self._totals["failed"] += 1
+                        failures.append((msg, e))
+                        break
+                    conn.messages_sent += 1
+                    with self._lock:
+                        self._totals["sent"] += 1
+                    break
+        finally:
+            if conn is not None:
+                self._checkin(conn)
+        return failures
+
+    def close(self) -> None:
+        """QUIT every idle connection (the pool stays usable and reconnects on the next send)."""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for conn in idle:
+            self._close(conn)
+
+    def metrics(self) -> dict:
+        """Pool totals plus counters for each open connection."""
+        with self._lock:
+            return {
+                **self._totals,
+                "size": self.size,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "connections": [c.metrics() for c in list(self._idle) + list(self._in_use.values())],
+            }
@@ -0,0 +1,461 @@
+"""Versioned schema migrations.
+
+Run once per deploy, before starting the app:
+
+    python app.py migrate
+
+Each migration is applied at most once and recorded in the schema_version
+table; app processes only compare that table with LATEST_VERSION instead of
+inspecting and altering the schema on boot. Migrations 1-7 bring databases
+from before this table existed up to date, so each of them checks what is
+already there rather than assuming an empty database. Add new migrations at
+the end with the next version number; never renumber or edit applied ones.
+
+Migration 1 creates tables from BASELINE, a frozen copy of the schema at
+version 1, not from the models: a fresh database then goes through the same
+later migrations as an upgraded one. When a model changes, add a migration
+that alters the table and leave BASELINE as it is. For the same reason,
+migrations read and write through frozen Core tables, never the ORM models
+or the ledger helpers built on them.
+"""
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from sqlalchemy import (
+    BigInteger, Boolean, Column, Date, DateTime, ForeignKey, Index, Integer, MetaData, String, Table, Text,
+    and_, exists, func, insert, inspect, select, text, update,
+)
+
+from models import db, SchemaVersion
+from utils import compute_balance_totals, net_balances_from_totals
+
+MIGRATIONS = []
+
+# The schema at version 1. Do not edit: later schema changes are migrations of their own.
+BASELINE = MetaData()
+
+Table(
+    "user", BASELINE,
+    Column("id", Integer, primary_key=True),
+    Column("name", String(80), nullable=False),
+    Column("email", String(120), nullable=False, unique=True, index=True),
+    Column("password_hash", String(256), nullable=False),
+    Column("email_verified", Boolean, nullable=False),
+    Column("email_verification_token_hash", String(64)),
+    Column("email_verification_sent_at", DateTime),
+    Column("password_reset_token_hash", String(64)),
+    Column("password_reset_sent_at", DateTime),
+    Column("password_reset_expires_at", DateTime),
+    Column("created_at", DateTime, nullable=False),
+    Column("deleted_at", DateTime),
+)
+Table(
+    "household", BASELINE,
+    Column("id", Integer, primary_key=True),
+    Column("name", String(80), nullable=False),
+    Column("join_code", String(12), nullable=False, unique=True, index=True),
+    Column("owner_id", Integer, ForeignKey("user.id"), index=True),
+    Column("created_at", DateTime, nullable=False),
+    Column("period_start_date", Date),
+    Column("debt_mode", String(16), nullable=False),
+    Column("version", Integer, nullable=False),
+    Column("deleted_at", DateTime),
+)
+Table(
+    "membership", BASELINE,
+    Column("user_id", Integer, ForeignKey("user.id"), primary_key=True),
+    Column("household_id", Integer, ForeignKey("household.id"), primary_key=True),
+    Column("created_at", DateTime, nullable=False),
+    Index("ix_membership_household_created", "household_id", "created_at"),
+)
+Table(
+    "expense", BASELINE,
+    Column("id", Integer, primary_key=True),
+    Column("household_id", Integer, ForeignKey("household.id"), nullable=False, index=True),
+    Column("payer_id", Integer, ForeignKey("user.id"), nullable=False, index=True),
+    Column("title", String(120), nullable=False),
+    Column("amount_iqd", Integer, nullable=False),
+    Column("expense_date", Date, nullable=False),
+    Column("is_archived", Boolean, nullable=False, index=True),
+    Column("archived_month", Date, index=True),
+    Column("archived_settle_id", String(24), index=True),
+    Column("archived_settled_at", DateTime, index=True),
+    Column("created_at", DateTime, nullable=False),
+    Index("ix_expense_household_archived_date", "household_id", "is_archived", "expense_date", "created_at", "id"),
+    Index("ix_expense_household_archived_settled", "household_id", "is_archived", "archived_settled_at", "expense_date", "id"),
+    Index("ix_expense_household_settle", "household_id", "archived_settle_id"),
+    Index("ix_expense_payer_archived", "payer_id", "is_archived"),
+)
+Table(
+    "expense_participant", BASELINE,
+    Column("expense_id", Integer, ForeignKey("expense.id"), primary_key=True),
+    Column("user_id", Integer, ForeignKey("user.id"), primary_key=True),
+    Index("ix_expense_participant_user", "user_id", "expense_id"),
+)
+Table(
+    "household_balance", BASELINE,
+    Column("household_id", Integer, ForeignKey("household.id"), primary_key=True),
+    Column("user_id", Integer, ForeignKey("user.id"), primary_key=True),
+    Column("paid_iqd", BigInteger, nullable=False),
+    Column("consumed_num", BigInteger, nullable=False),
+    Column("consumed_den", BigInteger, nullable=False),
+)
+Table(
+    "settle_session", BASELINE,
+    Column("id", String(24), primary_key=True),
+    Column("household_id", Integer, ForeignKey("household.id"), nullable=False, index=True),
+    Column("settled_by_id", Integer, ForeignKey("user.id")),
+    Column("month", Date, nullable=False),
+    Column("settled_at", DateTime, nullable=False, index=True),
+    Column("start_date", Date),
+    Column("end_date", Date),
+    Column("total_iqd", BigInteger, nullable=False),
+    Column("expense_count", Integer, nullable=False),
+)
+Table(
+    "settle_session_balance", BASELINE,
+    Column("settle_id", String(24), ForeignKey("settle_session.id"), primary_key=True),
+    Column("user_id", Integer, ForeignKey("user.id"), primary_key=True),
+    Column("paid_iqd", BigInteger, nullable=False),
+    Column("consumed_num", BigInteger, nullable=False),
+    Column("consumed_den", BigInteger, nullable=False),
+    Column("net_iqd", BigInteger, nullable=False),
+)
+Table(
+    "job", BASELINE,
+    Column("id", Integer, primary_key=True),
+    Column("kind", String(32), nullable=False),
+    Column("payload", Text, nullable=False),
+    Column("status", String(16), nullable=False),
+    Column("attempts", Integer, nullable=False),
+    Column("max_attempts", Integer, nullable=False),
+    Column("run_at", DateTime, nullable=False),
+    Column("locked_at", DateTime),
+    Column("locked_by", String(120)),
+    Column("last_error", Text),
+    Column("created_at", DateTime, nullable=False),
+    Column("finished_at", DateTime),
+    Index("ix_job_status_run_at", "status", "run_at"),
+)
+Table(
+    "schema_version", BASELINE,
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("name", String(120), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# pg_advisory_lock key that serialises concurrent `migrate` runs
+POSTGRES_LOCK_KEY = 264_024
+
+
+def migration(version: int, name: str):
+    def register(fn):
+        MIGRATIONS.append((version, name, fn))
+        return fn
+    return register
+
+
+def _inspector():
+    # Inspect through the migration's own connection so SQLite sees its uncommitted DDL
+    return inspect(db.session.connection())
+
+
+def _add_missing_columns(table: str, columns: dict[str, str]) -> None:
+    existing = {col["name"] for col in _inspector().get_columns(table)}
+    quoted = db.engine.dialect.identifier_preparer.quote(table)
+    for column, sql_type in columns.items():
+        if column not in existing:
+            db.session.execute(text(f"ALTER TABLE {quoted} ADD COLUMN {column} {sql_type}"))
+
+
+@migration(1, "create missing tables")
+def create_tables() -> None:
+    # Tables are created as of version 1; migrations 2-7 skip what they find, later ones assume it
+    BASELINE.create_all(db.session.connection())
+
+
+@migration(2, "user email verification and password reset columns")
+def add_user_token_columns() -> None:
+    dialect = db.engine.dialect.name
+    bool_default = "TRUE" if dialect in ("postgresql", "mysql") else "1"
+    datetime_type = "TIMESTAMP" if dialect in ("postgresql", "mysql") else "DATETIME"
+    _add_missing_columns("user", {
+        "email_verified": f"BOOLEAN NOT NULL DEFAULT {bool_default}",
+        "email_verification_token_hash": "VARCHAR(64)",
+        "email_verification_sent_at": datetime_type,
+        "password_reset_token_hash": "VARCHAR(64)",
+        "password_reset_sent_at": datetime_type,
+        "password_reset_expires_at": datetime_type,
+    })
+
+
+@migration(3, "household period, debt mode and version; soft-delete columns")
+def add_household_columns() -> None:
+    _add_missing_columns("household", {
+        "period_start_date": "DATE",
+        "debt_mode": "VARCHAR(16) NOT NULL DEFAULT 'greedy'",
+        "version": "INTEGER NOT NULL DEFAULT 0",
+        "deleted_at": "TIMESTAMP",
+    })
+    _add_missing_columns("user", {"deleted_at": "TIMESTAMP"})
+
+
+# Formats older releases let through; anything else is replaced by the column's fallback
+LEGACY_DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%Y-%m", "%Y/%m")
+
+
+def _parse_legacy_date(value) -> date | None:
+    raw = str(value).strip()
+    if len(raw) > 10 and raw[10] in " T":
+        raw = raw[:10]  # a timestamp
+    for fmt in LEGACY_DATE_FORMATS:
+        try:
+            return datetime.strptime(raw, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _clean_date_values(table: str, column: str, is_month: bool, fallback_sql: str) -> None:
+    # Rewrite each distinct value that is not YYYY-MM-DD (YYYY-MM for months) in that form, or
+    # set it to fallback_sql when it cannot be read as a date
+    for (value,) in db.session.execute(text(f"SELECT DISTINCT {column} FROM {table} WHERE {column} IS NOT NULL")).all():
+        parsed = _parse_legacy_date(value)
+        canonical = parsed and (parsed.strftime("%Y-%m") if is_month else parsed.isoformat())
+        if canonical == value:
+            continue
+        db.session.execute(
+            text(f"UPDATE {table} SET {column} = {':canonical' if canonical else fallback_sql} WHERE {column} = :value"),
+            {"canonical": canonical, "value": value},
+        )
+
+
+@migration(4, "date columns stored as DATE")
+def convert_date_columns() -> None:
+    """Convert text date columns to DATE, first repairing values that are not dates.
+
+    Older releases stored dates as YYYY-MM-DD text and months as YYYY-MM text,
+    without validating them. On PostgreSQL, ALTER COLUMN ... TYPE DATE
+    rewrites each table under an ACCESS EXCLUSIVE lock, blocking reads and
+    writes of expense until it finishes; on a large database, run this
+    migration in a maintenance window.
+    """
+    dialect = db.engine.dialect.name
+    if dialect == "postgresql":
+        day_of, month_of = "to_char({}, 'YYYY-MM-DD')", "to_char({}, 'YYYY-MM')"
+    else:
+        day_of, month_of = "substr({}, 1, 10)", "substr({}, 1, 7)"
+    # (table, column, is_month, value used when the stored one is not a date)
+    date_columns = [
+        ("expense", "expense_date", False, day_of.format("created_at")),
+        ("expense", "archived_month", True, "NULL"),
+        ("household", "period_start_date", False, "NULL"),
+        ("settle_session", "month", True, month_of.format("settled_at")),
+        ("settle_session", "start_date", False, "NULL"),
+        ("settle_session", "end_date", False, "NULL"),
+    ]
+    if dialect == "postgresql":
+        inspector = _inspector()
+        for table, column, is_month, fallback_sql in date_columns:
+            col_type = next(c["type"] for c in inspector.get_columns(table) if c["name"] == column)
+            if col_type.python_type is date:
+                continue
+            _clean_date_values(table, column, is_month, fallback_sql)
+            using = f"to_date({column}, 'YYYY-MM')" if is_month else f"{column}::date"
+            db.session.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE DATE USING {using}"))
+    elif dialect == "sqlite":
+        # SQLite keeps DATE values as YYYY-MM-DD text, so only month values need rewriting
+        for table, column, is_month, fallback_sql in date_columns:
+            _clean_date_values(table, column, is_month, fallback_sql)
+            if is_month:
+                db.session.execute(text(f"UPDATE {table} SET {column} = {column} || '-01' WHERE length({column}) = 7"))
+
+
+# Single-column indexes that lead one of the composite expense indexes
+REDUNDANT_INDEXES = ("ix_expense_household_id", "ix_expense_payer_id", "ix_expense_is_archived")
+
+
+@migration(5, "indexes on existing tables")
+def create_missing_indexes() -> None:
+    # create_all() skips tables that already exist, so add any baseline indexes they are missing
+    connection = db.session.connection()
+    for table in BASELINE.sorted_tables:
+        for index in table.indexes:
+            if index.name not in REDUNDANT_INDEXES:
+                index.create(connection, checkfirst=True)
+    # The composites serve the same lookups, so these only slow down every expense insert
+    for index in BASELINE.tables["expense"].indexes:
+        if index.name in REDUNDANT_INDEXES:
+            index.drop(connection, checkfirst=True)
+
+
+def _expenses_and_participants(where):
+    """BASELINE expense rows matching where, and their participant ids by expense id."""
+    expense, participant = BASELINE.tables["expense"], BASELINE.tables["expense_participant"]
+    expenses = db.session.execute(select(expense.c.id, expense.c.payer_id, expense.c.amount_iqd).where(where)).all()
+    parts_map = {}
+    participants = select(participant.c.expense_id, participant.c.user_id).join(expense, participant.c.expense_id == expense.c.id).where(where)
+    for expense_id, uid in db.session.execute(participants):
+        parts_map.setdefault(expense_id, []).append(uid)
+    return expenses, parts_map
+
+
+@migration(6, "balance ledger backfill")
+def backfill_balance_ledger() -> None:
+    # Same result as ledger.rebuild_household for a household without ledger rows
+    household, membership = BASELINE.tables["household"], BASELINE.tables["membership"]
+    expense, balance = BASELINE.tables["expense"], BASELINE.tables["household_balance"]
+    without_ledger = select(household.c.id).where(~exists().where(balance.c.household_id == household.c.id))
+    for (hid,) in db.session.execute(without_ledger).all():
+        member_ids = db.session.scalars(select(membership.c.user_id).where(membership.c.household_id == hid)).all()
+        expenses, parts_map = _expenses_and_participants(and_(expense.c.household_id == hid, expense.c.is_archived == False))
+        totals = compute_balance_totals([SimpleNamespace(id=uid) for uid in member_ids], expenses, parts_map)
+        if totals:
+            db.session.execute(insert(balance), [
+                {"household_id": hid, "user_id": uid, "paid_iqd": paid, "consumed_num": num, "consumed_den": den}
+                for uid, (paid, num, den) in totals.items()
+            ])
+        db.session.execute(update(household).where(household.c.id == hid).values(version=household.c.version + 1))
+
+
+@migration(7, "settle session summaries backfill")
+def backfill_settle_sessions() -> None:
+    # Same result as ledger.backfill_settle_sessions
+    user, expense = BASELINE.tables["user"], BASELINE.tables["expense"]
+    settle_session, settle_balance = BASELINE.tables["settle_session"], BASELINE.tables["settle_session_balance"]
+    missing = db.session.execute(
+        select(
+            expense.c.archived_settle_id,
+            expense.c.household_id,
+            func.min(expense.c.archived_month),
+            func.max(expense.c.archived_settled_at),
+            func.min(expense.c.expense_date),
+            func.max(expense.c.expense_date),
+            func.coalesce(func.sum(expense.c.amount_iqd), 0),
+            func.count(expense.c.id),
+        )
+        .select_from(expense.outerjoin(settle_session, settle_session.c.id == expense.c.archived_settle_id))
+        .where(expense.c.is_archived == True, expense.c.archived_settle_id.is_not(None), settle_session.c.id.is_(None))
+        .group_by(expense.c.archived_settle_id, expense.c.household_id)
+    ).all()
+    for settle_id, hid, month, settled_at, start_date, end_date, total, count in missing:
+        expenses, parts_map = _expenses_and_participants(and_(expense.c.household_id == hid, expense.c.archived_settle_id == settle_id))
+        # Membership at settle time is not recorded; everyone who paid or took part (and still exists) counts
+        user_ids = {e.payer_id for e in expenses} | {uid for uids in parts_map.values() for uid in uids}
+        existing = db.session.scalars(select(user.c.id).where(user.c.id.in_(user_ids))).all()
+        totals = compute_balance_totals([SimpleNamespace(id=uid) for uid in existing], expenses, parts_map)
+        net = net_balances_from_totals(totals)
+
+        settled_at = settled_at or datetime.utcnow()
+        db.session.execute(insert(settle_session).values(
+            id=settle_id,
+            household_id=hid,
+            month=month or settled_at.date().replace(day=1),
+            settled_at=settled_at,
+            start_date=start_date,
+            end_date=end_date,
+            total_iqd=int(total or 0),
+            expense_count=count,
+        ))
+        if totals:
+            db.session.execute(insert(settle_balance), [
+                {"settle_id": settle_id, "user_id": uid, "paid_iqd": paid, "consumed_num": num, "consumed_den": den, "net_iqd": net[uid]}
+                for uid, (paid, num, den) in totals.items()
+            ])
+
+
+
+# household_balance and settle_session_balance as of version 8, for the SQLite table rebuild.
+# Copies of the tables they reference let their foreign keys compile.
+FRACTIONS_AS_TEXT = MetaData()
+for _name in ("user", "household", "settle_session"):
+    BASELINE.tables[_name].to_metadata(FRACTIONS_AS_TEXT)
+Table(
+    "household_balance", FRACTIONS_AS_TEXT,
+    Column("household_id", Integer, ForeignKey("household.id"), primary_key=True),
+    Column("user_id", Integer, ForeignKey("user.id"), primary_key=True),
+    Column("paid_iqd", BigInteger, nullable=False),
+    Column("consumed_num", Text, nullable=False),
+    Column("consumed_den", Text, nullable=False),
+)
+Table(
+    "settle_session_balance", FRACTIONS_AS_TEXT,
+    Column("settle_id", String(24), ForeignKey("settle_session.id"), primary_key=True),
+    Column("user_id", Integer, ForeignKey("user.id"), primary_key=True),
+    Column("paid_iqd", BigInteger, nullable=False),
+    Column("consumed_num", Text, nullable=False),
+    Column("consumed_den", Text, nullable=False),
+    Column("net_iqd", BigInteger, nullable=False),
+)
+
+
+@migration(8, "consumed fractions stored as text")
+def store_fractions_as_text() -> None:
+    """Store consumed_num/consumed_den as decimal text, which BIGINT limits to 2**63.
+
+    On PostgreSQL, ALTER COLUMN ... TYPE TEXT rewrites both balance tables
+    under an ACCESS EXCLUSIVE lock. SQLite cannot change a column's type, and
+    its INTEGER affinity would turn large numbers back into floats, so each
+    table is rebuilt with TEXT columns and its rows copied over.
+    """
+    dialect = db.engine.dialect.name
+    inspector = _inspector()
+    for table in ("household_balance", "settle_session_balance"):
+        types = {c["name"]: c["type"] for c in inspector.get_columns(table)}
+        if types["consumed_num"].python_type is str:
+            continue
+        if dialect == "sqlite":
+            new = FRACTIONS_AS_TEXT.tables[table]
+            old = f"{table}_before_v8"
+            columns = ", ".join(new.c.keys())
+            copied = ", ".join(f"CAST({c} AS TEXT)" if c.startswith("consumed_") else c for c in new.c.keys())
+            db.session.execute(text(f"ALTER TABLE {table} RENAME TO {old}"))
+            new.create(db.session.connection())
+            db.session.execute(text(f"INSERT INTO {table} ({columns}) SELECT {copied} FROM {old}"))
+            db.session.execute(text(f"DROP TABLE {old}"))
+        else:
+            for column in ("consumed_num", "consumed_den"):
+                if dialect == "postgresql":
+                    db.session.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE TEXT USING {column}::text"))
+                else:
+                    db.session.execute(text(f"ALTER TABLE {table} MODIFY {column} TEXT NOT NULL"))
+
+
+LATEST_VERSION = max(version for version, _name, _fn in MIGRATIONS)
+
+
+def current_version() -> int:
+    """The highest applied migration, or 0 for a database that has never been migrated."""
+    if not inspect(db.engine).has_table(SchemaVersion.__tablename__):
+        return 0
+    return db.session.query(func.max(SchemaVersion.version)).scalar() or 0
+
+
+def migrate(log=print) -> list[int]:
+    """Apply pending migrations in order, each in its own transaction; returns the versions applied."""
+    lock = None
+    if db.engine.dialect.name == "postgresql":
+        # Held on its own connection, since db.session returns its connection on every commit
+        lock = db.engine.connect()
+        lock.execute(text("SELECT pg_advisory_lock(:key)"), {"key": POSTGRES_LOCK_KEY})
+    try:
+        BASELINE.tables["schema_version"].create(db.engine, checkfirst=True)
+        applied = {version for (version,) in db.session.query(SchemaVersion.version)}
+        done = []
+        for version, name, fn in sorted(MIGRATIONS, key=lambda m: m[0]):
+            if version in applied:
+                continue
+            log(f"Applying migration {version}: {name}")
+            try:
+                fn()
+                db.session.add(SchemaVersion(version=version, name=name, applied_at=datetime.utcnow()))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            done.append(version)
+        return done
+    finally:
+        if lock is not None:
+            lock.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": POSTGRES_LOCK_KEY})
+            lock.close()
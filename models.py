@@ -1,10 +1,29 @@
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.types import Text, TypeDecorator
 
-db = SQLAlchemy()
+from database import RoutingSession
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+class ExactInteger(TypeDecorator):
+    """An int of any size, stored as decimal text where BIGINT would overflow past 2**63."""
+
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else str(int(value))
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else int(value)
 
 class Membership(db.Model):
     __tablename__ = "membership"
+    __table_args__ = (
+        # Member lists and "first member" owner fallbacks, by household in join order
+        db.Index("ix_membership_household_created", "household_id", "created_at"),
+    )
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
     household_id = db.Column(db.Integer, db.ForeignKey("household.id"), primary_key=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -22,6 +41,8 @@ class User(db.Model):
     password_reset_sent_at = db.Column(db.DateTime, nullable=True)
     password_reset_expires_at = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    # Set when the account is deleted but its rows are still being purged
+    deleted_at = db.Column(db.DateTime, nullable=True)
 
     # Flask-Login requirements
     def is_active(self): return True
@@ -38,20 +59,36 @@ class Household(db.Model):
     owner_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     # Tracks the start of the current expense period (reset on settle)
-    period_start_date = db.Column(db.String(10), nullable=True)  # YYYY-MM-DD
+    period_start_date = db.Column(db.Date, nullable=True)
+    # How suggested payments are computed: "greedy" or "minimal" (fewest transfers)
+    debt_mode = db.Column(db.String(16), default="greedy", nullable=False)
+    # Bumped on every change that affects balances; used as a cache key
+    version = db.Column(db.Integer, default=0, nullable=False)
+    # Set when the household is deleted but its rows are still being purged
+    deleted_at = db.Column(db.DateTime, nullable=True)
 
 class Expense(db.Model):
     __tablename__ = "expense"
+    __table_args__ = (
+        # Active/archived lists in date order (dashboard aggregate, /expenses, ledger rebuilds)
+        db.Index("ix_expense_household_archived_date", "household_id", "is_archived", "expense_date", "created_at", "id"),
+        # Archive in settle order
+        db.Index("ix_expense_household_archived_settled", "household_id", "is_archived", "archived_settled_at", "expense_date", "id"),
+        # Expenses of one settle session
+        db.Index("ix_expense_household_settle", "household_id", "archived_settle_id"),
+        # Per-payer filters and account deletion
+        db.Index("ix_expense_payer_archived", "payer_id", "is_archived"),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    household_id = db.Column(db.Integer, db.ForeignKey("household.id"), nullable=False, index=True)
-    payer_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False, index=True)
+    household_id = db.Column(db.Integer, db.ForeignKey("household.id"), nullable=False)
+    payer_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
 
     title = db.Column(db.String(120), nullable=False)
     amount_iqd = db.Column(db.Integer, nullable=False)  # integer IQD
-    expense_date = db.Column(db.String(10), nullable=False)  # YYYY-MM-DD
+    expense_date = db.Column(db.Date, nullable=False)
 
-    is_archived = db.Column(db.Boolean, default=False, nullable=False, index=True)
-    archived_month = db.Column(db.String(7), nullable=True, index=True)  # YYYY-MM
+    is_archived = db.Column(db.Boolean, default=False, nullable=False)
+    archived_month = db.Column(db.Date, nullable=True, index=True)  # first day of the settle month
 
     # Group archived expenses by "settle" sessions.
     # When /settle is triggered, all active expenses get the same settle_id + settled_at.
@@ -62,5 +99,71 @@ class Expense(db.Model):
 
 class ExpenseParticipant(db.Model):
     __tablename__ = "expense_participant"
+    __table_args__ = (
+        # The primary key leads with expense_id; lookups by user need their own index
+        db.Index("ix_expense_participant_user", "user_id", "expense_id"),
+    )
     expense_id = db.Column(db.Integer, db.ForeignKey("expense.id"), primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+
+class HouseholdBalance(db.Model):
+    """Running balance totals over a household's active expenses, one row per current member."""
+    __tablename__ = "household_balance"
+    household_id = db.Column(db.Integer, db.ForeignKey("household.id"), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    paid_iqd = db.Column(db.BigInteger, default=0, nullable=False)
+    # Consumed share as an exact fraction (kept reduced): consumed_num / consumed_den. The
+    # denominator is the LCM of every split size the member took part in, so it is unbounded
+    consumed_num = db.Column(ExactInteger, default=0, nullable=False)
+    consumed_den = db.Column(ExactInteger, default=1, nullable=False)
+
+class SettleSession(db.Model):
+    """Summary of one /settle run, captured when its expenses were archived."""
+    __tablename__ = "settle_session"
+    # Same value as Expense.archived_settle_id
+    id = db.Column(db.String(24), primary_key=True)
+    household_id = db.Column(db.Integer, db.ForeignKey("household.id"), nullable=False, index=True)
+    settled_by_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=True)
+    month = db.Column(db.Date, nullable=False)  # first day of the settle month
+    settled_at = db.Column(db.DateTime, nullable=False, index=True)
+    start_date = db.Column(db.Date, nullable=True)  # earliest expense_date
+    end_date = db.Column(db.Date, nullable=True)  # latest expense_date
+    total_iqd = db.Column(db.BigInteger, default=0, nullable=False)
+    expense_count = db.Column(db.Integer, default=0, nullable=False)
+
+class SettleSessionBalance(db.Model):
+    """Per-member totals and rounded net for a settle session, as shown at settle time."""
+    __tablename__ = "settle_session_balance"
+    settle_id = db.Column(db.String(24), db.ForeignKey("settle_session.id"), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    paid_iqd = db.Column(db.BigInteger, default=0, nullable=False)
+    consumed_num = db.Column(ExactInteger, default=0, nullable=False)
+    consumed_den = db.Column(ExactInteger, default=1, nullable=False)
+    net_iqd = db.Column(db.BigInteger, default=0, nullable=False)
+
+class Job(db.Model):
+    """A unit of background work (email, avatar processing, purges) picked up by jobs.work()."""
+    __tablename__ = "job"
+    __table_args__ = (
+        # Workers poll for due jobs in run_at order
+        db.Index("ix_job_status_run_at", "status", "run_at"),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(32), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default="{}")  # JSON
+    status = db.Column(db.String(16), nullable=False, default="queued")  # queued, running, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    locked_by = db.Column(db.String(120), nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+class SchemaVersion(db.Model):
+    """A schema migration applied by migrations.migrate()."""
+    __tablename__ = "schema_version"
+    version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String(120), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
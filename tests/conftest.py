@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """An app on a fresh, migrated SQLite database; push app_context() for database work."""
+    monkeypatch.setenv("DATABASE_URL", "sqlite:///" + str(tmp_path / "app.db"))
+    monkeypatch.setenv("SETTLE_NOTIFY_EMAILS", "0")
+    from app import create_app
+    import migrations
+    from models import db
+
+    app = create_app()
+    with app.app_context():
+        migrations.migrate(log=lambda _msg: None)
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
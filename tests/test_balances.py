@@ -0,0 +1,150 @@
+"""compute_net_balances and the ledger/batch paths must match the original Fraction engine exactly."""
+import random
+from datetime import date
+from fractions import Fraction
+from types import SimpleNamespace
+
+import pytest
+
+from utils import compute_balance_totals, compute_household_nets_batch, compute_net_balances, net_balances_from_totals
+
+
+# The Fraction implementation compute_net_balances replaced, kept as the reference
+def _round_net_fractions_to_int(net_frac_by_user_id: dict[int, Fraction]) -> dict[int, int]:
+    base = {}
+    frac_parts = []
+    base_sum = 0
+
+    for uid, net in net_frac_by_user_id.items():
+        floor_int = net.numerator // net.denominator
+        base[uid] = int(floor_int)
+        base_sum += int(floor_int)
+        frac = net - floor_int
+        frac_parts.append((uid, frac))
+
+    residual = -base_sum
+    if residual <= 0:
+        return base
+
+    frac_parts.sort(key=lambda x: (x[1], -x[0]), reverse=True)
+
+    for uid, _frac in frac_parts[:residual]:
+        base[uid] += 1
+
+    return base
+
+
+def reference_net_balances(users, expenses, participants_map):
+    paid = {u.id: 0 for u in users}
+    consumed = {u.id: Fraction(0, 1) for u in users}
+
+    for e in expenses:
+        if e.payer_id not in paid:
+            continue
+        paid[e.payer_id] += int(e.amount_iqd)
+        parts = participants_map.get(e.id, [])
+        if not parts:
+            continue
+
+        n = len(parts)
+        share = Fraction(int(e.amount_iqd), n)
+        for uid in parts:
+            if uid not in consumed:
+                continue
+            consumed[uid] += share
+
+    net_frac = {uid: Fraction(paid[uid], 1) - consumed[uid] for uid in paid.keys()}
+    return _round_net_fractions_to_int(net_frac)
+
+
+def random_household(rng: random.Random):
+    """Members, active expenses and participants; some payers and participants have left the household."""
+    everyone = list(range(1, rng.randint(2, 12)))
+    users = [SimpleNamespace(id=uid) for uid in everyone if rng.random() > 0.15] or [SimpleNamespace(id=everyone[0])]
+    expenses, participants_map = [], {}
+    for eid in range(1, rng.randint(0, 60) + 1):
+        amount = rng.choice([rng.randint(1, 10), rng.randint(1, 500) * 250, rng.randint(1, 10**7)])
+        expenses.append(SimpleNamespace(id=eid, payer_id=rng.choice(everyone), amount_iqd=amount))
+        if rng.random() > 0.05:
+            participants_map[eid] = rng.sample(everyone, rng.randint(1, len(everyone)))
+    return users, expenses, participants_map
+
+
+@pytest.mark.parametrize("seed", range(3000))
+def test_matches_fraction_engine(seed):
+    users, expenses, participants_map = random_household(random.Random(seed))
+    expected = reference_net_balances(users, expenses, participants_map)
+
+    assert compute_net_balances(users, expenses, participants_map) == expected
+    # The ledger stores these totals; the dashboard rounds them the same way
+    assert net_balances_from_totals(compute_balance_totals(users, expenses, participants_map)) == expected
+
+
+def test_rounding_hands_residual_to_largest_remainder_then_lowest_id():
+    users = [SimpleNamespace(id=uid) for uid in (1, 2, 3)]
+    expenses = [SimpleNamespace(id=1, payer_id=1, amount_iqd=100)]
+    participants_map = {1: [1, 2, 3]}
+
+    assert compute_net_balances(users, expenses, participants_map) == reference_net_balances(users, expenses, participants_map) == {1: 67, 2: -33, 3: -34}
+
+
+@pytest.mark.parametrize("use_numpy", [False, None])
+def test_batch_matches_fraction_engine(use_numpy):
+    rng = random.Random(264)
+    columns = {"household_ids": [], "payer_ids": [], "amounts_iqd": [], "part_indptr": [0], "part_user_ids": []}
+    member_household_ids, member_user_ids, expected = [], [], {}
+    for hid in range(1, 201):
+        users, expenses, participants_map = random_household(rng)
+        # User ids are global in the database, so give each household its own range
+        offset = hid * 100
+        for u in users:
+            member_household_ids.append(hid)
+            member_user_ids.append(u.id + offset)
+        for e in expenses:
+            columns["household_ids"].append(hid)
+            columns["payer_ids"].append(e.payer_id + offset)
+            columns["amounts_iqd"].append(e.amount_iqd)
+            columns["part_user_ids"].extend(uid + offset for uid in participants_map.get(e.id, []))
+            columns["part_indptr"].append(len(columns["part_user_ids"]))
+        nets = reference_net_balances(users, expenses, participants_map)
+        expected[hid] = {uid + offset: net for uid, net in nets.items()}
+
+    result = compute_household_nets_batch(**columns, member_household_ids=member_household_ids, member_user_ids=member_user_ids, use_numpy=use_numpy)
+
+    assert result == expected
+
+
+def test_ledger_fractions_past_bigint_survive_the_database(app):
+    import ledger
+    from models import db, User, Household, Membership, SettleSessionBalance
+
+    # Splits among 1..47 members: the first member's consumed share is H(47), whose denominator needs 66 bits
+    members = 47
+    with app.app_context():
+        users = [User(name=f"u{i}", email=f"u{i}@example.com", password_hash="pw", email_verified=True) for i in range(members)]
+        db.session.add_all(users)
+        db.session.flush()
+        household = Household(name="H", join_code="OVERFLOW", owner_id=users[0].id)
+        db.session.add(household)
+        db.session.flush()
+        hid = household.id
+        db.session.add_all(Membership(household_id=hid, user_id=u.id) for u in users)
+        ids = [u.id for u in users]
+        ledger.insert_expenses(hid, [(ids[0], f"e{n}", 1, date(2024, 1, 1), ids[:n]) for n in range(1, members + 1)])
+        db.session.commit()
+        db.session.expire_all()
+
+        stored = ledger.stored_household_totals(hid)
+        harmonic = sum(Fraction(1, n) for n in range(1, members + 1))
+        assert stored[ids[0]] == (members, harmonic.numerator, harmonic.denominator)
+        assert harmonic.denominator > 2**63
+        assert stored == ledger.compute_household_totals(hid)
+
+    client = app.test_client()
+    client.post("/login", data={"email": "u0@example.com", "password": "pw"})
+    assert client.get("/dashboard").status_code == 200
+    client.post("/settle", data={"password": "pw"})
+
+    with app.app_context():
+        settled = db.session.get(SettleSessionBalance, (SettleSessionBalance.query.first().settle_id, ids[0]))
+        assert (settled.consumed_num, settled.consumed_den) == (harmonic.numerator, harmonic.denominator)
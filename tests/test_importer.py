@@ -0,0 +1,187 @@
+"""CSV/JSON parsing, dedupe and error reporting for importer.import_expenses."""
+import io
+import json
+from datetime import date
+
+import pytest
+
+import importer
+
+
+OBJECTS = [
+    {"title": "Rent, March", "amount": 250000, "date": "2024-03-01"},
+    {"title": "Brackets ] and { braces }", "amount": "1,500", "date": "2024-03-02", "participants": ["a@example.com"]},
+    {"title": "كارەبا \"quoted\"", "amount_iqd": 30000, "expense_date": "2024-03-03", "nested": {"list": [1, 2, {"x": "]"}]}},
+]
+LAYOUTS = {
+    "array": json.dumps(OBJECTS),
+    "pretty array": "\n  " + json.dumps(OBJECTS, indent=2, ensure_ascii=False) + "\n",
+    "json lines": "".join(json.dumps(obj) + "\n" for obj in OBJECTS),
+    "json lines with blanks": "\n\n".join(json.dumps(obj, ensure_ascii=False) for obj in OBJECTS) + "\r\n\r\n",
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1 << 16])
+@pytest.mark.parametrize("layout", list(LAYOUTS))
+def test_json_rows_survive_any_chunk_boundary(layout, chunk_size):
+    rows = list(importer.iter_json_rows(io.StringIO(LAYOUTS[layout]), chunk_size=chunk_size))
+
+    assert rows == list(enumerate(OBJECTS, start=1))
+
+
+@pytest.mark.parametrize("text", ["", "  \n", "[]", " [ ] ", "[\n]\n"])
+def test_empty_json_yields_nothing(text):
+    assert list(importer.iter_json_rows(io.StringIO(text), chunk_size=2)) == []
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 1 << 16])
+def test_malformed_json_raises_after_the_rows_before_it(chunk_size):
+    text = json.dumps(OBJECTS[0]) + "\n" + '{"title": "broken", ' + "\n"
+    rows = importer.iter_json_rows(io.StringIO(text), chunk_size=chunk_size)
+
+    assert next(rows) == (1, OBJECTS[0])
+    with pytest.raises(ValueError):
+        next(rows)
+
+
+def test_csv_rows_normalise_headers_and_report_line_numbers():
+    text = ' Title ,AMOUNT,Date\r\nRent,"250,000",2024-03-01\r\n"Two\nlines",1000,2024-03-02\r\n'
+
+    assert list(importer.iter_csv_rows(io.StringIO(text, newline=""))) == [
+        (2, {"title": "Rent", "amount": "250,000", "date": "2024-03-01"}),
+        (4, {"title": "Two\nlines", "amount": "1000", "date": "2024-03-02"}),
+    ]
+
+
+def test_file_type_comes_from_the_extension():
+    assert list(importer.iter_file_rows("old.JSONL", io.StringIO('{"a": 1}'))) == [(1, {"a": 1})]
+    assert list(importer.iter_file_rows("old.csv", io.StringIO("a\n1\n"))) == [(2, {"a": "1"})]
+    with pytest.raises(ValueError):
+        importer.iter_file_rows("old.xlsx", io.StringIO(""))
+
+
+@pytest.fixture
+def household(app):
+    """(household_id, [user ids]) with three verified members; the first owns it."""
+    from models import db, User, Household, Membership
+
+    with app.app_context():
+        users = [User(name=name, email=f"{name.lower()}@example.com", password_hash="pw", email_verified=True) for name in ("Ana", "Bo", "Cy")]
+        db.session.add_all(users)
+        db.session.flush()
+        h = Household(name="H", join_code="IMPORT26", owner_id=users[0].id)
+        db.session.add(h)
+        db.session.flush()
+        db.session.add_all(Membership(household_id=h.id, user_id=u.id) for u in users)
+        db.session.commit()
+        return h.id, [u.id for u in users]
+
+
+def stored_expenses(household_id):
+    from models import db, Expense, ExpenseParticipant
+
+    rows = {}
+    for e in Expense.query.filter_by(household_id=household_id).order_by(Expense.id):
+        pids = sorted(uid for (uid,) in db.session.query(ExpenseParticipant.user_id).filter_by(expense_id=e.id))
+        rows[e.title] = (e.payer_id, e.amount_iqd, e.expense_date, pids)
+    return rows
+
+
+def test_import_reports_invalid_rows_and_resolves_members(app, household):
+    hid, (ana, bo, cy) = household
+    rows = [
+        (1, {"title": "Rent", "amount": "250,000", "date": "2024-03-01", "payer": "ana@example.com"}),
+        (2, {"title": "Power", "amount_iqd": 30000, "expense_date": "2024-03-02", "payer": "bo", "participants": "Ana|Bo"}),
+        (3, {"title": "Tea", "amount": 3000, "date": "2024-03-03", "payer_id": cy, "participants": [str(cy), "ANA@example.com", "cy"]}),
+        (4, ["not", "an", "object"]),
+        (5, {"title": " ", "amount": 1, "date": "2024-03-01", "payer": "Ana"}),
+        (6, {"title": "Free", "amount": "0", "date": "2024-03-01", "payer": "Ana"}),
+        (7, {"title": "When", "amount": 1, "date": "03/01/2024", "payer": "Ana"}),
+        (8, {"title": "Who", "amount": 1, "date": "2024-03-01", "payer": "Dee"}),
+        (9, {"title": "With", "amount": 1, "date": "2024-03-01", "payer": "Ana", "participants": "Ana;Dee"}),
+    ]
+    with app.app_context():
+        stats = importer.import_expenses(hid, rows)
+
+        assert (stats["read"], stats["inserted"], stats["duplicates"], stats["invalid"], stats["error"]) == (9, 3, 0, 6, None)
+        assert stats["errors"] == [
+            "4: not an object",
+            "5: missing title",
+            "6: amount must be a positive integer",
+            "7: date must be YYYY-MM-DD",
+            "8: payer is not a member of the household",
+            "9: participant is not a member of the household",
+        ]
+        assert stored_expenses(hid) == {
+            "Rent": (ana, 250000, date(2024, 3, 1), [ana, bo, cy]),
+            "Power": (bo, 30000, date(2024, 3, 2), [ana, bo]),
+            "Tea": (cy, 3000, date(2024, 3, 3), [ana, cy]),
+        }
+
+
+def test_import_skips_rows_already_stored_or_repeated(app, household):
+    from models import Expense
+
+    hid, _ids = household
+    first = [(1, {"title": "Rent", "amount": 1000, "date": "2024-03-01", "payer": "Ana"})]
+    again = [
+        (1, {"title": "Rent", "amount": 1000, "date": "2024-03-01", "payer": "Ana"}),
+        (2, {"title": "Rent", "amount": 1000, "date": "2024-03-01", "payer": "Bo"}),
+        (3, {"title": "Rent", "amount": 1001, "date": "2024-03-01", "payer": "Ana"}),
+        (4, {"title": "Rent", "amount": 1000, "date": "2024-03-02", "payer": "Ana"}),
+        (5, {"title": "rent", "amount": 1000, "date": "2024-03-01", "payer": "Ana"}),
+        (6, {"title": "Rent", "amount": 1001, "date": "2024-03-01", "payer": "Ana"}),
+    ]
+    with app.app_context():
+        importer.import_expenses(hid, first)
+        stats = importer.import_expenses(hid, again, batch_size=2)
+
+        # Row 1 repeats the stored expense and row 6 repeats row 3
+        assert (stats["inserted"], stats["duplicates"]) == (4, 2)
+        assert Expense.query.filter_by(household_id=hid).count() == 5
+
+
+def test_import_keeps_committed_batches_when_the_file_turns_unreadable(app, household):
+    from models import db, Expense
+
+    hid, _ids = household
+    good = [{"title": f"e{i}", "amount": 1000 + i, "date": "2024-03-01", "payer": "Ana"} for i in range(5)]
+    text = "".join(json.dumps(obj) + "\n" for obj in good) + '{"title": "broken"\n'
+    batches = []
+    with app.app_context():
+        stats = importer.import_expenses(hid, importer.iter_json_rows(io.StringIO(text), chunk_size=8), batch_size=2, on_batch=lambda s: batches.append(s["inserted"]))
+        db.session.rollback()
+
+        assert (stats["read"], stats["inserted"]) == (5, 5)
+        assert stats["error"]
+        assert batches == [2, 4, 5]
+        assert Expense.query.filter_by(household_id=hid).count() == 5
+
+        # Importing the fixed file adds only what was missing
+        fixed = text.replace('{"title": "broken"\n', json.dumps({"title": "fixed", "amount": 1, "date": "2024-03-02", "payer": "Bo"}) + "\n")
+        stats = importer.import_expenses(hid, importer.iter_json_rows(io.StringIO(fixed)))
+        assert (stats["inserted"], stats["duplicates"], stats["error"]) == (1, 5, None)
+
+
+def test_upload_reports_how_many_rows_were_imported_before_bad_utf8(app, household):
+    from models import Expense
+
+    hid, _ids = household
+    # Large enough that the bad bytes are decoded after some rows were already read
+    good = b"".join(f"e{i},{1000 + i},2024-03-01,Ana\n".encode() for i in range(2000))
+    body = b"title,amount,date,payer\n" + good + b"bad,\xff\xfe,2024-03-01,Ana\n"
+    client = app.test_client()
+    client.post("/login", data={"email": "ana@example.com", "password": "pw"})
+    response = client.post(
+        "/expenses/import",
+        data={"file": (io.BytesIO(body), "old.csv")},
+        headers={"X-Requested-With": "XMLHttpRequest"},
+    )
+
+    assert response.status_code == 400
+    payload = response.get_json()
+    assert payload["success"] is False
+    assert 0 < payload["inserted"] == payload["read"] < 2000
+    assert str(payload["inserted"]) in payload["error"]
+    with app.app_context():
+        assert Expense.query.filter_by(household_id=hid).count() == payload["inserted"]
@@ -0,0 +1,145 @@
+"""Claiming, retry with backoff and stale-lock recovery in the database job queue."""
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+import jobs
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Payloads handled by the "record" job kind; a payload with "fail" raises instead."""
+    handled = []
+
+    def record(payload):
+        if payload.get("fail"):
+            raise RuntimeError(payload["fail"])
+        handled.append(payload["n"])
+
+    monkeypatch.setitem(jobs.HANDLERS, "record", record)
+    return handled
+
+
+def test_run_pending_runs_due_jobs_in_run_at_order(app, calls):
+    from models import db, Job
+
+    with app.app_context():
+        for n, delay in [(1, -30), (2, -60), (3, 0), (4, 3600)]:
+            jobs.enqueue("record", {"n": n}, delay_seconds=delay)
+        db.session.commit()
+
+        assert jobs.run_pending() == 3
+        assert calls == [2, 1, 3]
+        statuses = {job.payload: (job.status, job.attempts, job.locked_by) for job in Job.query}
+        assert statuses == {
+            '{"n": 1}': ("done", 1, None),
+            '{"n": 2}': ("done", 1, None),
+            '{"n": 3}': ("done", 1, None),
+            '{"n": 4}': ("queued", 0, None),
+        }
+
+
+def test_claim_takes_each_job_once(app, calls):
+    from models import db
+
+    with app.app_context():
+        jobs.enqueue("record", {"n": 1})
+        db.session.commit()
+
+        job = jobs.claim("worker-a")
+        assert (job.status, job.locked_by, job.attempts) == ("running", "worker-a", 1)
+        assert jobs.claim("worker-b") is None
+
+
+def test_failed_job_backs_off_then_fails_after_max_attempts(app, calls):
+    from models import db, Job
+
+    base = app.config["JOB_RETRY_BASE_SECONDS"]
+    with app.app_context():
+        job = jobs.enqueue("record", {"fail": "smtp down"}, max_attempts=3)
+        db.session.commit()
+        job_id = job.id
+
+        for attempt in (1, 2):
+            started = datetime.utcnow()
+            assert jobs.run_pending() == 1
+            job = db.session.get(Job, job_id)
+            assert (job.status, job.attempts, job.last_error) == ("queued", attempt, "RuntimeError: smtp down")
+            delay = (job.run_at - started).total_seconds()
+            expected = base * 2 ** (attempt - 1)
+            assert expected * 0.9 - 1 <= delay <= expected * 1.1 + 1
+            # Not due again until the backoff has passed
+            assert jobs.run_pending() == 0
+            job.run_at = datetime.utcnow() - timedelta(seconds=1)
+            db.session.commit()
+
+        assert jobs.run_pending() == 1
+        job = db.session.get(Job, job_id)
+        assert (job.status, job.attempts, job.locked_at) == ("failed", 3, None)
+        assert job.finished_at is not None
+        assert jobs.run_pending() == 0
+        assert calls == []
+
+
+def test_backoff_is_capped():
+    from flask import Flask
+
+    app = Flask(__name__)
+    app.config["JOB_RETRY_BASE_SECONDS"] = 30
+    with app.app_context():
+        assert jobs.backoff_seconds(30) <= jobs.MAX_BACKOFF_SECONDS * 1.1
+
+
+def test_unknown_kind_fails_like_a_handler_error(app):
+    from models import db, Job
+
+    with app.app_context():
+        job = jobs.enqueue("nobody-handles-this", {}, max_attempts=1)
+        db.session.commit()
+        job_id = job.id
+
+        jobs.run_pending()
+        job = db.session.get(Job, job_id)
+        assert job.status == "failed"
+        assert "no handler registered" in job.last_error
+
+
+def test_recover_stale_requeues_or_fails_jobs_of_dead_workers(app):
+    from models import db, Job
+
+    with app.app_context():
+        long_ago = datetime.utcnow() - timedelta(seconds=app.config["JOB_LOCK_TIMEOUT_SECONDS"] + 60)
+        retry = Job(kind="record", payload="{}", status="running", attempts=1, max_attempts=3, locked_at=long_ago, locked_by="dead")
+        spent = Job(kind="record", payload="{}", status="running", attempts=3, max_attempts=3, locked_at=long_ago, locked_by="dead")
+        alive = Job(kind="record", payload="{}", status="running", attempts=1, max_attempts=3, locked_at=datetime.utcnow(), locked_by="alive")
+        db.session.add_all([retry, spent, alive])
+        db.session.commit()
+
+        assert jobs.recover_stale() == 2
+        db.session.expire_all()
+        assert (retry.status, retry.locked_by) == ("queued", None)
+        assert (spent.status, spent.last_error) == ("failed", "worker lock expired")
+        assert (alive.status, alive.locked_by) == ("running", "alive")
+        assert jobs.recover_stale() == 0
+
+
+def test_concurrent_workers_run_each_job_once(app, calls):
+    from models import db
+
+    with app.app_context():
+        for n in range(60):
+            jobs.enqueue("record", {"n": n})
+        db.session.commit()
+
+    def worker(name):
+        with app.app_context():
+            jobs.run_pending(name)
+
+    threads = [threading.Thread(target=worker, args=(f"worker-{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(calls) == list(range(60))
@@ -0,0 +1,172 @@
+"""SMTPPool against a local stub SMTP server: reuse, health checks and reconnects."""
+import socket
+import socketserver
+import threading
+from email.message import EmailMessage
+
+import pytest
+
+from mailer import SMTPPool
+
+
+class StubSMTPServer(socketserver.ThreadingTCPServer):
+    """Accepts every message unless told otherwise; records what each connection did."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubSMTPHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.received = []  # (connection number, recipient)
+        self.rejected = set()  # recipients refused with 550
+        self.noop_code = 250
+        self.drop_after_messages = None  # close the connection after this many messages
+
+
+class StubSMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str) -> None:
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+            number = server.connections
+        self.reply("220 stub ESMTP")
+        sent, recipient, in_data = 0, None, False
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            if in_data:
+                if line in (b".\r\n", b".\n"):
+                    in_data = False
+                    with server.lock:
+                        server.received.append((number, recipient))
+                    self.reply("250 queued")
+                    sent += 1
+                    if server.drop_after_messages and sent >= server.drop_after_messages:
+                        return
+                continue
+            cmd = line.decode().strip()
+            verb = cmd.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self.wfile.write(b"250-stub\r\n250 AUTH PLAIN\r\n")
+            elif verb == "AUTH":
+                self.reply("235 ok")
+            elif verb == "RCPT":
+                recipient = cmd.split(":", 1)[1].strip(" <>")
+                self.reply("550 no such user" if recipient in server.rejected else "250 ok")
+            elif verb == "DATA":
+                in_data = True
+                self.reply("354 go ahead")
+            elif verb == "NOOP":
+                self.reply(f"{server.noop_code} noop")
+            elif verb == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("250 ok")
+
+
+@pytest.fixture
+def server():
+    server = StubSMTPServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_pool(server, **kwargs) -> SMTPPool:
+    return SMTPPool("127.0.0.1", server.server_address[1], username="user", password="secret", use_tls=False, timeout=5, **kwargs)
+
+
+def message(to: str) -> EmailMessage:
+    msg = EmailMessage()
+    msg["Subject"] = "Hello"
+    msg["From"] = "no-reply@example.com"
+    msg["To"] = to
+    msg.set_content("Hi")
+    return msg
+
+
+def recipients(n: int) -> list[str]:
+    return [f"user{i}@example.com" for i in range(n)]
+
+
+def test_send_many_reuses_one_connection(server):
+    pool = make_pool(server)
+
+    assert pool.send_many(message(to) for to in recipients(5)) == []
+    pool.send(message("late@example.com"))
+
+    assert server.connections == 1
+    assert [to for _conn, to in server.received] == recipients(5) + ["late@example.com"]
+    assert pool.metrics()["connects"] == 1
+    pool.close()
+
+
+def test_failed_noop_replaces_the_idle_connection(server):
+    # Check every connection before reuse
+    pool = make_pool(server, check_after_seconds=0)
+    pool.send(message("first@example.com"))
+    server.noop_code = 421
+
+    pool.send(message("second@example.com"))
+
+    assert server.received == [(1, "first@example.com"), (2, "second@example.com")]
+    metrics = pool.metrics()
+    assert (metrics["connects"], metrics["noops"], metrics["sent"]) == (2, 1, 2)
+    pool.close()
+
+
+def test_dropped_connection_is_retried_once_on_a_new_one(server):
+    server.drop_after_messages = 2
+    pool = make_pool(server)
+
+    assert pool.send_many(message(to) for to in recipients(5)) == []
+
+    assert server.received == [(1, "user0@example.com"), (1, "user1@example.com"), (2, "user2@example.com"), (2, "user3@example.com"), (3, "user4@example.com")]
+    metrics = pool.metrics()
+    assert (metrics["connects"], metrics["reconnects"], metrics["failed"]) == (3, 2, 0)
+    pool.close()
+
+
+def test_refused_recipient_is_skipped_and_the_session_kept(server):
+    server.rejected.add("nobody@example.com")
+    pool = make_pool(server)
+    msgs = [message(to) for to in ("a@example.com", "nobody@example.com", "b@example.com")]
+
+    failures = pool.send_many(msgs)
+
+    assert [msg for msg, _error in failures] == [msgs[1]]
+    assert server.received == [(1, "a@example.com"), (1, "b@example.com")]
+    assert server.connections == 1
+    pool.close()
+
+
+def test_connections_are_replaced_after_max_messages(server):
+    pool = make_pool(server, max_messages=2)
+
+    assert pool.send_many(message(to) for to in recipients(5)) == []
+
+    assert [conn for conn, _to in server.received] == [1, 1, 2, 2, 3]
+    pool.close()
+
+
+def test_unreachable_server_fails_every_message():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    pool = SMTPPool("127.0.0.1", port, use_tls=False, timeout=2)
+    msgs = [message(to) for to in recipients(3)]
+
+    failures = pool.send_many(msgs)
+
+    assert [msg for msg, _error in failures] == msgs
+    with pytest.raises(OSError):
+        pool.send(message("again@example.com"))
+    assert pool.metrics()["failed"] == 4
@@ -0,0 +1,206 @@
+"""Fresh and upgraded databases must end up with the schema the models declare and data they can read."""
+import sqlite3
+from contextlib import contextmanager
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import inspect
+
+
+@pytest.fixture
+def migrated(monkeypatch):
+    """Returns a context manager that migrates the SQLite file at a path and yields the app, in its app context."""
+
+    @contextmanager
+    def run(path):
+        monkeypatch.setenv("DATABASE_URL", "sqlite:///" + str(path))
+        from app import create_app
+        import migrations
+        from models import db
+
+        app = create_app()
+        with app.app_context():
+            migrations.migrate(log=lambda _msg: None)
+            assert migrations.current_version() == migrations.LATEST_VERSION
+            try:
+                yield app
+            finally:
+                db.session.remove()
+                db.engine.dispose()
+
+    return run
+
+
+def describe(inspector) -> dict:
+    return {
+        table: (
+            {col["name"] for col in inspector.get_columns(table)},
+            {index["name"] for index in inspector.get_indexes(table)},
+        )
+        for table in inspector.get_table_names()
+    }
+
+
+def model_schema() -> dict:
+    from models import db
+    return {table.name: ({col.name for col in table.columns}, {index.name for index in table.indexes}) for table in db.metadata.sorted_tables}
+
+
+def make_legacy(path, statements) -> None:
+    con = sqlite3.connect(path)
+    for stmt in ["DROP TABLE schema_version", *statements]:
+        con.execute(stmt)
+    con.commit()
+    con.close()
+
+
+def test_fresh_database_matches_models(tmp_path, migrated):
+    from models import db
+    with migrated(tmp_path / "fresh.db"):
+        assert describe(inspect(db.engine)) == model_schema()
+
+
+def test_database_from_before_versioning_matches_models(tmp_path, migrated):
+    from models import db
+    path = tmp_path / "legacy.db"
+    with migrated(path):
+        pass
+    # Roll back to what create_all() used to leave behind on an older release
+    make_legacy(path, [
+        "DROP TABLE household_balance",
+        "DROP TABLE job",
+        "ALTER TABLE household DROP COLUMN version",
+        "ALTER TABLE household DROP COLUMN debt_mode",
+        "ALTER TABLE household DROP COLUMN deleted_at",
+        'ALTER TABLE "user" DROP COLUMN deleted_at',
+        'ALTER TABLE "user" DROP COLUMN password_reset_expires_at',
+        "DROP INDEX ix_membership_household_created",
+        "DROP INDEX ix_expense_household_archived_date",
+    ])
+
+    with migrated(path):
+        assert describe(inspect(db.engine)) == model_schema()
+
+
+def test_backfills_match_ledger_helpers(tmp_path, migrated):
+    import ledger
+    from models import db, User, Household, Membership, Expense, SettleSession, SettleSessionBalance
+
+    def settle_rows():
+        sessions = [(s.id, s.household_id, s.month, s.start_date, s.end_date, s.total_iqd, s.expense_count) for s in SettleSession.query.order_by(SettleSession.id)]
+        balances = [(b.settle_id, b.user_id, b.paid_iqd, b.consumed_num, b.consumed_den, b.net_iqd) for b in SettleSessionBalance.query.order_by(SettleSessionBalance.settle_id, SettleSessionBalance.user_id)]
+        return sessions, balances
+
+    path = tmp_path / "backfill.db"
+    with migrated(path):
+        users = [User(name=f"u{i}", email=f"u{i}@example.com", password_hash="pw") for i in range(4)]
+        db.session.add_all(users)
+        db.session.flush()
+        household = Household(name="H", join_code="BACKFILL", owner_id=users[0].id)
+        db.session.add(household)
+        db.session.flush()
+        hid = household.id
+        db.session.add_all(Membership(household_id=hid, user_id=u.id) for u in users[:3])
+        ids = [u.id for u in users]
+        # users[3] left the household but still took part in some expenses
+        expense_ids = ledger.insert_expenses(hid, [(ids[i % 4], f"e{i}", 1000 + i, date(2024, 1, 1 + i % 28), ids[: 2 + i % 3]) for i in range(40)])
+        Expense.query.filter(Expense.id.in_(expense_ids[:20])).update(
+            {Expense.is_archived: True, Expense.archived_settle_id: "s1", Expense.archived_month: date(2024, 1, 1), Expense.archived_settled_at: datetime(2024, 2, 1)},
+            synchronize_session=False,
+        )
+        db.session.commit()
+        expected_totals = ledger.compute_household_totals(hid)
+
+    make_legacy(path, ["DELETE FROM household_balance", "DELETE FROM settle_session_balance", "DELETE FROM settle_session"])
+
+    with migrated(path):
+        assert ledger.stored_household_totals(hid) == expected_totals
+        migrated_rows = settle_rows()
+        assert migrated_rows[0] and migrated_rows[1]
+        SettleSessionBalance.query.delete()
+        SettleSession.query.delete()
+        ledger.backfill_settle_sessions()
+        assert settle_rows() == migrated_rows
+
+
+def test_date_conversion_repairs_values_that_are_not_dates(tmp_path, migrated):
+    import ledger
+    from models import db, User, Household, Expense, SettleSession
+
+    path = tmp_path / "dates.db"
+    with migrated(path):
+        user = User(name="u", email="u@example.com", password_hash="pw")
+        db.session.add(user)
+        db.session.flush()
+        household = Household(name="H", join_code="DATES264")
+        db.session.add(household)
+        db.session.flush()
+        ids = ledger.insert_expenses(household.id, [(user.id, f"e{i}", 1000, date(2024, 1, 1), [user.id]) for i in range(6)], {user.id})
+        db.session.add(SettleSession(id="s1", household_id=household.id, month=date(2024, 3, 1), settled_at=datetime(2024, 3, 9, 12, 0)))
+        db.session.commit()
+        created = {e.id: e.created_at.date() for e in Expense.query}
+
+    # What an unvalidated add_expense form and the old month strings left behind
+    stored = {ids[0]: "garbage", ids[1]: "2024/05/03", ids[2]: "", ids[3]: "2024-05-04 10:00:00", ids[4]: "2024-02-30", ids[5]: "2024-05-06"}
+    con = sqlite3.connect(path)
+    for expense_id, value in stored.items():
+        con.execute("UPDATE expense SET expense_date = ?, archived_month = ? WHERE id = ?", (value, value[:7], expense_id))
+    con.execute("UPDATE settle_session SET month = 'march'")
+    con.commit()
+    con.close()
+    make_legacy(path, [])
+
+    with migrated(path):
+        expenses = {e.id: e for e in Expense.query}
+        assert {eid: e.expense_date for eid, e in expenses.items()} == {
+            ids[0]: created[ids[0]],
+            ids[1]: date(2024, 5, 3),
+            ids[2]: created[ids[2]],
+            ids[3]: date(2024, 5, 4),
+            ids[4]: created[ids[4]],
+            ids[5]: date(2024, 5, 6),
+        }
+        assert {eid: e.archived_month for eid, e in expenses.items()} == {
+            ids[0]: None,
+            ids[1]: date(2024, 5, 1),
+            ids[2]: None,
+            ids[3]: date(2024, 5, 1),
+            ids[4]: date(2024, 2, 1),
+            ids[5]: date(2024, 5, 1),
+        }
+        assert db.session.get(SettleSession, "s1").month == date(2024, 3, 1)
+
+
+def test_bigint_fraction_columns_become_text_with_their_values(tmp_path, migrated):
+    import ledger
+    from models import db, User, Household, Membership
+
+    path = tmp_path / "fractions.db"
+    with migrated(path):
+        users = [User(name=f"u{i}", email=f"u{i}@example.com", password_hash="pw") for i in range(3)]
+        db.session.add_all(users)
+        db.session.flush()
+        household = Household(name="H", join_code="FRACTION")
+        db.session.add(household)
+        db.session.flush()
+        hid = household.id
+        db.session.add_all(Membership(household_id=hid, user_id=u.id) for u in users)
+        ids = [u.id for u in users]
+        ledger.insert_expenses(hid, [(ids[0], f"e{i}", 1000 + i, date(2024, 1, 1), ids[: 1 + i % 3]) for i in range(5)])
+        db.session.commit()
+        expected = ledger.stored_household_totals(hid)
+
+    # The BIGINT table that version 7 left behind
+    make_legacy(path, [
+        "ALTER TABLE household_balance RENAME TO household_balance_text",
+        "CREATE TABLE household_balance (household_id INTEGER NOT NULL REFERENCES household (id), user_id INTEGER NOT NULL REFERENCES user (id),"
+        " paid_iqd BIGINT NOT NULL, consumed_num BIGINT NOT NULL, consumed_den BIGINT NOT NULL, PRIMARY KEY (household_id, user_id))",
+        "INSERT INTO household_balance SELECT household_id, user_id, paid_iqd, CAST(consumed_num AS INTEGER), CAST(consumed_den AS INTEGER) FROM household_balance_text",
+        "DROP TABLE household_balance_text",
+    ])
+
+    with migrated(path):
+        types = {col["name"]: str(col["type"]) for col in inspect(db.engine).get_columns("household_balance")}
+        assert (types["consumed_num"], types["consumed_den"]) == ("TEXT", "TEXT")
+        assert ledger.stored_household_totals(hid) == expected
+        assert "household_balance_text" not in inspect(db.engine).get_table_names()
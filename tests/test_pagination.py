@@ -0,0 +1,103 @@
+"""Walking /expenses and /archive page by page must return every row once, in order."""
+import html
+import re
+from datetime import date, datetime
+
+import pytest
+
+PAGE_SIZE = 7
+TITLE = re.compile(r"\bexp(\d+)x\b")
+NEXT_PAGE = re.compile(r'data-next-page="([^"]+)"')
+
+
+@pytest.fixture
+def household(app):
+    """Active and archived expenses with many ties on every sort key."""
+    import ledger
+    from models import db, User, Household, Membership, Expense
+
+    app.config["LIST_PAGE_SIZE"] = PAGE_SIZE
+    with app.app_context():
+        # Two members share a name, so the person sort ties on it too
+        users = [User(name=name, email=f"u{i}@example.com", password_hash="pw", email_verified=True) for i, name in enumerate(["Ana", "Bo", "Bo"])]
+        db.session.add_all(users)
+        db.session.flush()
+        h = Household(name="H", join_code="PAGES264", owner_id=users[0].id)
+        db.session.add(h)
+        db.session.flush()
+        db.session.add_all(Membership(household_id=h.id, user_id=u.id) for u in users)
+        ids = [u.id for u in users]
+        expense_ids = ledger.insert_expenses(h.id, [(ids[i % 3], f"e{i}", 1000, date(2024, 1, 1 + i % 4), ids) for i in range(80)])
+        same_time = datetime(2024, 2, 1, 12, 0)
+        for i, expense in enumerate(Expense.query.filter(Expense.id.in_(expense_ids))):
+            expense.title = f"exp{expense.id}x"
+            expense.created_at = same_time
+            if i >= 30:
+                expense.is_archived = True
+                # Three settle sessions, one from before settled_at was recorded (NULL)
+                expense.archived_settle_id = ("s1", "s2", "s3")[i % 3]
+                expense.archived_settled_at = (datetime(2024, 3, 1), datetime(2024, 3, 1), None)[i % 3]
+        household_id = h.id
+        db.session.commit()
+    return household_id
+
+
+def expected_order(app, household_id, archived: bool, sort: str) -> list[int]:
+    from models import Expense, User
+
+    with app.app_context():
+        names = {u.id: u.name for u in User.query}
+        rows = Expense.query.filter_by(household_id=household_id, is_archived=archived).all()
+    if sort == "person":
+        rows.sort(key=lambda e: e.id, reverse=True)
+        rows.sort(key=lambda e: e.expense_date, reverse=True)
+        rows.sort(key=lambda e: names[e.payer_id])
+    elif sort == "settle":
+        rows.sort(key=lambda e: (e.archived_settled_at is not None, e.archived_settled_at or datetime.min, e.expense_date, e.id), reverse=True)
+    else:
+        rows.sort(key=lambda e: (e.expense_date, e.created_at, e.id), reverse=True)
+    return [e.id for e in rows]
+
+
+def walk(client, url):
+    """Titles in page order, following data-next-page links as the infinite list does; also returns the page count."""
+    response = client.get(url)
+    assert response.status_code == 200
+    body = response.get_data(as_text=True)
+    seen, pages = [int(i) for i in TITLE.findall(body)], 1
+    while match := NEXT_PAGE.search(body):
+        response = client.get(html.unescape(match.group(1)), headers={"X-Requested-With": "page-fragment"})
+        assert response.status_code == 200
+        body = response.get_data(as_text=True)
+        assert "<html" not in body
+        seen.extend(int(i) for i in TITLE.findall(body))
+        pages += 1
+    return seen, pages
+
+
+@pytest.mark.parametrize("path, archived, sort", [
+    ("/expenses", False, "date"),
+    ("/expenses?sort=person", False, "person"),
+    ("/archive?sort=settle", True, "settle"),
+    ("/archive?sort=person", True, "person"),
+])
+def test_every_row_appears_once_in_order(app, household, path, archived, sort):
+    client = app.test_client()
+    client.post("/login", data={"email": "u0@example.com", "password": "pw"})
+
+    seen, pages = walk(client, path)
+
+    expected = expected_order(app, household, archived, sort)
+    assert pages == -(-len(expected) // PAGE_SIZE)
+    assert seen == expected
+
+
+def test_tab_navigation_to_a_cursor_url_gets_the_full_page(app, household):
+    client = app.test_client()
+    client.post("/login", data={"email": "u0@example.com", "password": "pw"})
+    next_url = html.unescape(NEXT_PAGE.search(client.get("/expenses").get_data(as_text=True)).group(1))
+
+    # The SPA tab navigation sends X-Requested-With: fetch
+    body = client.get(next_url, headers={"X-Requested-With": "fetch"}).get_data(as_text=True)
+
+    assert "<html" in body
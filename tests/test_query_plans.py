@@ -0,0 +1,131 @@
+"""The hot expense queries must be served by the indexes declared in models.py.
+
+Each case makes one real request and asks the database how it would run
+every statement that request sent to the expense tables. SQLite always
+runs; Postgres runs when TEST_POSTGRES_URL points at a scratch database
+(its tables are dropped afterwards), with sequential scans disabled so the
+planner reports whether an index can serve the query at all.
+"""
+import os
+import re
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event
+
+# endpoint -> (method, path, index name patterns that each must appear in one of its plans)
+CASES = {
+    # The aggregate reads every active row; either (household_id, is_archived, ...) index narrows it
+    "dashboard": ("GET", "/dashboard", [r"ix_expense_household_archived_(?:date|settled)"]),
+    "expenses": ("GET", "/expenses", [r"ix_expense_household_archived_date"]),
+    "archive": ("GET", "/archive", [r"ix_expense_household_archived_settled"]),
+    # (payer_id, is_archived) also serves "WHERE payer_id = ?"
+    "delete_account": ("POST", "/account/delete", [r"ix_expense_participant_user", r"ix_expense_payer_archived"]),
+}
+# The list views page through the index order instead of sorting
+NO_SORT = {"expenses", "archive"}
+
+
+def backends():
+    yield "sqlite"
+    yield pytest.param(
+        "postgresql",
+        marks=pytest.mark.skipif(not os.environ.get("TEST_POSTGRES_URL"), reason="TEST_POSTGRES_URL is not set"),
+    )
+
+
+@pytest.fixture(scope="module", params=list(backends()))
+def backend(request, tmp_path_factory):
+    if request.param == "sqlite":
+        url = "sqlite:///" + str(tmp_path_factory.mktemp("plans") / "plans.db")
+    else:
+        pytest.importorskip("psycopg2")
+        url = os.environ["TEST_POSTGRES_URL"]
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("DATABASE_URL", url)
+        mp.setenv("SETTLE_NOTIFY_EMAILS", "0")
+        from app import create_app
+        import ledger
+        import migrations
+        from models import db, Household, Membership, User, Expense
+
+        app = create_app()
+        with app.app_context():
+            migrations.migrate(log=lambda _msg: None)
+            users = [User(name=f"u{i}", email=f"u{i}@example.com", password_hash="pw", email_verified=True) for i in range(4)]
+            db.session.add_all(users)
+            db.session.flush()
+            household = Household(name="Plans", join_code="PLANS264", owner_id=users[0].id)
+            db.session.add(household)
+            db.session.flush()
+            # users[3] has no household, so deleting the account goes through ledger.delete_user
+            db.session.add_all(Membership(household_id=household.id, user_id=u.id) for u in users[:3])
+            ids = [u.id for u in users[:3]]
+            expense_ids = ledger.insert_expenses(
+                household.id,
+                [(ids[i % 3], f"e{i}", 1000, date(2024, 1, 1) + timedelta(days=i % 300), ids) for i in range(600)],
+                set(ids),
+            )
+            Expense.query.filter(Expense.id.in_(expense_ids[:300])).update(
+                {Expense.is_archived: True, Expense.archived_settle_id: "plans", Expense.archived_settled_at: date(2024, 6, 1)},
+                synchronize_session=False,
+            )
+            db.session.commit()
+            if request.param == "sqlite":
+                db.session.execute(db.text("ANALYZE"))
+                db.session.commit()
+            engine = db.engine
+        yield request.param, app, engine
+        with app.app_context():
+            db.session.remove()
+            if request.param != "sqlite":
+                db.drop_all()
+
+
+def explain(backend_name, connection, statement, params) -> str:
+    if backend_name == "sqlite":
+        return "\n".join(row[-1] for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, params))
+    connection.exec_driver_sql("SET enable_seqscan = off")
+    return "\n".join(row[0] for row in connection.exec_driver_sql("EXPLAIN " + statement, params))
+
+
+def full_scans(backend_name, plan: str) -> list[str]:
+    if backend_name == "sqlite":
+        # SEARCH uses index keys; SCAN reads the whole table (or a whole index)
+        return re.findall(r"^SCAN (?:expense|expense_participant)\b.*$", plan, re.M)
+    return re.findall(r"Seq Scan on (?:expense|expense_participant)\b.*$", plan, re.M)
+
+
+@pytest.mark.parametrize("endpoint", list(CASES))
+def test_expense_queries_use_indexes(backend, endpoint):
+    backend_name, app, engine = backend
+    method, path, expected_indexes = CASES[endpoint]
+    client = app.test_client()
+    email = "u3@example.com" if endpoint == "delete_account" else "u0@example.com"
+    client.post("/login", data={"email": email, "password": "pw"})
+
+    statements = []
+
+    def record(_conn, _cursor, statement, params, _context, _executemany):
+        if re.search(r"\bexpense(_participant)?\b", statement):
+            statements.append((statement, params))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.open(path, method=method, data={"password": "pw"} if method == "POST" else None)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert response.status_code in (200, 302)
+    assert statements, f"{endpoint} sent no expense queries"
+
+    used, plans = set(), []
+    with engine.connect() as connection:
+        for statement, params in statements:
+            plan = explain(backend_name, connection, statement, params)
+            plans.append(f"{statement}\n{plan}")
+            assert not full_scans(backend_name, plan), f"{endpoint}: full scan in\n{statement}\n{plan}"
+            if backend_name == "sqlite" and endpoint in NO_SORT and statement.lstrip().startswith("SELECT expense.id"):
+                assert "USE TEMP B-TREE FOR ORDER BY" not in plan, f"{endpoint}: sorts instead of walking the index\n{plan}"
+            used.update(pattern for pattern in expected_indexes if re.search(pattern, plan))
+        connection.rollback()
+    assert used == set(expected_indexes), "\n\n".join(plans)
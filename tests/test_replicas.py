@@ -0,0 +1,102 @@
+"""Read replica routing with two SQLite files: a primary and a stale copy standing in for a lagging replica."""
+import shutil
+
+import pytest
+from sqlalchemy import event, select, update
+
+
+@pytest.fixture
+def replicated(tmp_path, monkeypatch):
+    """(app, replica engine); the replica still has the household under its old name, "Home"."""
+    primary, replica = tmp_path / "primary.db", tmp_path / "replica.db"
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{primary}")
+    monkeypatch.setenv("DATABASE_REPLICA_URLS", f"sqlite:///{replica}")
+    from app import create_app
+    import migrations
+    from models import db, User, Household, Membership
+
+    app = create_app()
+    with app.app_context():
+        migrations.migrate(log=lambda _msg: None)
+        user = User(name="Ana", email="ana@example.com", password_hash="pw", email_verified=True)
+        db.session.add(user)
+        db.session.flush()
+        household = Household(name="Home", join_code="REPLICA1", owner_id=user.id)
+        db.session.add(household)
+        db.session.flush()
+        db.session.add(Membership(household_id=household.id, user_id=user.id))
+        db.session.commit()
+        # Closing every connection checkpoints the WAL, so the copy is complete
+        db.session.remove()
+        db.engine.dispose()
+        shutil.copy(primary, replica)
+        db.session.execute(update(Household).values(name="Home (renamed)"))
+        db.session.commit()
+    replica_engine = app.extensions["db_replicas"][0]
+    yield app, replica_engine
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+    replica_engine.dispose()
+
+
+def household_page(client) -> str:
+    response = client.get("/room")
+    assert response.status_code == 200
+    return response.get_data(as_text=True)
+
+
+def test_read_only_views_use_the_replica_until_the_user_writes(replicated):
+    app, _replica = replicated
+    app.config["DB_REPLICA_STICKY_SECONDS"] = 60
+    client = app.test_client()
+    client.post("/login", data={"email": "ana@example.com", "password": "pw"})
+
+    # Logging in was a write, so this user reads from the primary for a while
+    assert "Home (renamed)" in household_page(client)
+
+    with client.session_transaction() as session:
+        session["db_primary_until"] = 0
+    assert "Home (renamed)" not in household_page(client)
+
+    # The rename goes to the primary, and the next read sticks to it
+    client.post("/household/rename", data={"name": "Flat 3"})
+    assert "Flat 3" in household_page(client)
+    with client.session_transaction() as session:
+        session["db_primary_until"] = 0
+    assert "Flat 3" not in household_page(client)
+
+
+def test_views_outside_the_read_list_use_the_primary(replicated):
+    app, replica = replicated
+    app.config["DB_REPLICA_STICKY_SECONDS"] = 0
+    client = app.test_client()
+    client.post("/login", data={"email": "ana@example.com", "password": "pw"})
+    statements = []
+    record = lambda *_args: statements.append(1)
+    event.listen(replica, "before_cursor_execute", record)
+    try:
+        assert client.get("/profile").status_code == 200
+        assert not statements
+        household_page(client)
+        assert statements
+    finally:
+        event.remove(replica, "before_cursor_execute", record)
+
+
+def test_writes_inside_a_replica_request_go_to_the_primary(replicated):
+    app, replica = replicated
+    from flask import g
+    from models import db, Household
+
+    with app.test_request_context("/room"):
+        g.db_replica = replica
+        assert db.session.get_bind(clause=select(Household)) is replica
+        assert db.session.get_bind(clause=update(Household)) is db.engine
+        assert db.session.get_bind(clause=select(Household).with_for_update()) is db.engine
+
+        assert db.session.scalar(select(Household.name)) == "Home"
+        db.session.add(Household(name="New", join_code="REPLICA2"))
+        db.session.commit()
+        g.db_replica = None
+        assert sorted(db.session.scalars(select(Household.name))) == ["Home (renamed)", "New"]
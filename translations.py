@@ -0,0 +1,648 @@
+from functools import cache
+
+
+@cache
+def get_translations() -> dict[str, dict[str, str]]:
+    """UI strings by language, then key; built on the first lookup rather than at import."""
+    return {
+        "en": {
+            "app.name": "Daxli264",
+            "menu.open": "Open menu",
+            "menu.profile": "Profile",
+            "menu.switch_theme": "Switch theme",
+            "menu.switch_to_light": "Switch to light mode",
+            "menu.switch_to_dark": "Switch to dark mode",
+            "menu.language_to_en": "Switch to English",
+            "menu.language_to_ku": "Switch to Kurdish",
+            "menu.logout": "Logout",
+            "menu.settings": "Settings",
+            "nav.dashboard": "Dashboard",
+            "nav.expenses": "Expenses",
+            "nav.household": "Room",
+            "nav.archive": "Archive",
+            "common.confirm_action": "Are you sure",
+            "common.save": "Save",
+            "common.cancel": "Cancel",
+            "common.confirm": "Confirm",
+            "common.you": "You",
+            "common.admin": "Admin",
+            "common.delete": "Delete",
+            "common.add": "Add",
+            "common.filter": "Filter",
+            "common.or": "or",
+            "common.password_placeholder": "Password",
+            "common.logo": "Logo",
+            "common.saving": "Saving...",
+            "common.sending": "Sending",
+            "login.title": "Login",
+            "login.email_label": "Email",
+            "login.password_label": "Password",
+            "login.button": "Login",
+            "login.create_account": "Create account",
+            "login.forgot_password": "Forgot password",
+            "login.email_placeholder": "you@example.com",
+            "login.password_placeholder": "********",
+            "login.email_required": "Email is required",
+            "login.email_invalid": "Please enter a valid email address",
+            "login.password_required": "Password is required",
+            "login.logging_in": "Logging in...",
+            "login.invalid_credentials": "Incorrect email or password",
+            "login.login": "Login",
+            "register.title": "Create account",
+            "register.name_label": "Name",
+            "register.email_label": "Email",
+            "register.password_label": "Password",
+            "register.confirm_password_label": "Confirm password",
+            "register.password_help": "Use at least {min_len} characters, including a letter and a number",
+            "register.password_rules_title": "Password requirements",
+            "register.password_rule_length": "At least {min_len} characters",
+            "register.password_rule_letter": "At least 1 letter (A–Z)",
+            "register.password_rule_number": "At least 1 number (0–9)",
+            "register.button": "Create account",
+            "register.creating_account": "Creating account...",
+            "register.have_account": "Already have an account",
+            "register.name_placeholder": "Name",
+            "register.email_placeholder": "you@example.com",
+            "register.password_placeholder": "********",
+            "register.email_step_title": "What's your email",
+            "register.email_step_subtitle": "We'll use this to sign you in",
+            "register.email_required": "Please enter your email",
+            "register.email_invalid": "Please enter a valid email",
+            "register.have_account_prefix": "Already have an account",
+            "register.login_link": "Sign in",
+            "register.password_step_title": "Create a password",
+            "register.password_step_subtitle": "Choose a secure password",
+            "register.password_required": "Please enter a password",
+            "register.confirm_password_required": "Please confirm your password",
+            "register.verify_step_title": "Check your email",
+            "register.verify_step_subtitle": "Enter the 6-digit code we sent to",
+            "register.start_over": "Start over",
+            "register.change_email": "Change email",
+            "register.profile_step_title": "Set up your profile",
+            "register.profile_step_subtitle": "Tell us a bit about yourself",
+            "register.upload_photo": "Add a photo",
+            "register.name_required": "Please enter your name",
+            "register.complete_button": "Complete setup",
+            "verify.verifying": "Verifying...",
+            "common.continue": "Continue",
+            "common.back": "Back",
+            "common.something_went_wrong": "Something went wrong. Please try again",
+            "welcome.change_later_note": "You can change these later in settings",
+            "reset.request_title": "Reset your password",
+            "reset.request_help": "Enter your email and we'll send a reset link",
+            "reset.email_label": "Email",
+            "reset.email_placeholder": "you@example.com",
+            "reset.request_button": "Send reset link",
+            "reset.title": "Set a new password",
+            "reset.password_label": "New password",
+            "reset.confirm_password_label": "Confirm password",
+            "reset.submit_button": "Update password",
+            "email.greeting": "Hi",
+            "email.there": "there",
+            "email.thanks": "Thanks,",
+            "email.button_not_working": "If the button does not work, copy and paste this link into your browser",
+            "email.ignore_if_not_requested": "If you did not request a password reset, you can ignore this email",
+            "email.ignore_if_not_requested_account": "If you did not create a Daxli264 account, you can ignore this email",
+            "email.verify.subject": "Verify your Daxli264 email",
+            "email.verify.code_is": "Your Daxli264 verification code is",
+            "email.verify.code_help": "Enter this code in the app to verify your email. This code expires in {ttl_hours} hours",
+            "email.reset.subject": "Reset your Daxli264 password",
+            "email.reset.received_request": "We received a request to reset your Daxli264 password. This link expires in {ttl_minutes} minutes",
+            "email.settle.subject": "{household_name}: expenses settled",
+            "email.settle.title": "Expenses settled",
+            "email.settle.intro": "{settled_by} settled {expense_count} expenses totalling {total} in {household_name}",
+            "email.settle.period": "Period: {start} to {end}",
+            "email.settle.you_pay": "You pay {name} {amount}",
+            "email.settle.you_receive": "{name} pays you {amount}",
+            "email.settle.all_square": "You have nothing to pay or receive",
+            "email.settle.view_archive": "View in archive",
+            "verify.title": "Verify your email",
+            "verify.subtitle": "We sent a 6-digit code to {email}",
+            "verify.help": "Enter the code below to verify your email",
+            "verify.code_placeholder": "Enter code",
+            "verify.resend_button": "Resend code",
+            "verify.cancel_button": "Cancel and go back",
+            "verify.logout_button": "Log out",
+            "verify.didnt_receive": "Didn't receive the code? Check spam or",
+            "dashboard.welcome": "Welcome",
+            "dashboard.they_owe_you": "They owe you",
+            "dashboard.you_owe": "You owe",
+            "dashboard.settled": "Settled",
+            "dashboard.spending_by_person": "Spending by person",
+            "dashboard.household_total": "Room total",
+            "dashboard.suggested_payments": "Suggested payments",
+            "dashboard.no_payments": "No payments needed",
+            "dashboard.you_pay": "You pay",
+            "dashboard.pays": "pays",
+            "dashboard.members": "members",
+            "dashboard.since": "Since",
+            "dashboard.all_settled": "All balances are settled",
+            "expenses.title": "Expenses",
+            "expenses.add_title": "Add expense",
+            "expenses.title_label": "Title",
+            "expenses.title_placeholder": "e.g. Groceries",
+            "expenses.amount_label": "Amount (IQD)",
+            "expenses.amount_help": "Steps of 250 IQD",
+            "expenses.date_label": "Date",
+            "expenses.participants_label": "Participants",
+            "expenses.add_button": "Add",
+            "expenses.no_expenses": "No expenses yet",
+            "expenses.delete_button": "Delete",
+            "expenses.delete_confirm": "Delete this expense",
+            "expenses.filtered_by": "Filtered by",
+            "expenses.clear_filter": "Clear",
+            "expenses.add_first": "Add your first expense to get started",
+            "household.page_title": "Room",
+            "household.edit_name": "Edit Name",
+            "household.name_placeholder": "Room name",
+            "household.remove_button": "Remove",
+            "household.remove_confirm": "Remove {name} from the room",
+            "household.join_code": "Join Code",
+            "household.scan_to_join": "Scan to join",
+            "household.qr_alt": "Join room QR code",
+            "household.danger_zone": "Danger zone",
+            "household.leave_title": "Leave room",
+            "household.leave_help": "You can leave your current room and join another",
+            "household.confirm_password": "Confirm password",
+            "household.leave_button": "Leave Room",
+            "household.leave_confirm": "Leave this room",
+            "household.admin_transfer_warning": "As admin, ownership will transfer to the oldest member",
+            "household.removing": "Removing...",
+            "household.leaving": "Leaving...",
+            "household.debt_mode_title": "Payment suggestions",
+            "household.debt_mode_help": "Choose how suggested payments are worked out on the dashboard",
+            "household.debt_mode_greedy": "Quick (largest amounts first)",
+            "household.debt_mode_minimal": "Fewest transfers",
+            "setup.create_title": "Create room",
+            "setup.household_name_label": "Room name",
+            "setup.household_name_placeholder": "Room",
+            "setup.create_button": "Create",
+            "setup.join_title": "Join room",
+            "setup.join_code_label": "Join code",
+            "setup.join_code_placeholder": "CODE",
+            "setup.join_button": "Join",
+            "setup.qr_title": "Join using a QR code",
+            "setup.qr_description": "Scan live with your camera or select a QR image from your gallery",
+            "setup.qr_scan_button": "Scan with camera",
+            "setup.qr_select_button": "Select from gallery",
+            "setup.qr_modal_title": "Scan QR",
+            "setup.qr_modal_subtitle": "Join household",
+            "setup.qr_modal_help": "Point your camera at the QR code",
+            "setup.qr_close": "Close",
+            "setup.qr_detected": "Detected code",
+            "setup.qr_join_button": "Join Household",
+            "setup.qr_scan_again": "Scan Again",
+            "setup.qr_status.camera_not_supported": "Camera not supported in this browser",
+            "setup.qr_status.scanner_unavailable": "Scanner not available. Reload and try again",
+            "setup.qr_status.starting_camera": "Starting camera...",
+            "setup.qr_status.camera_blocked": "Camera access blocked. Enable permissions and try again",
+            "setup.qr_status.camera_failed": "Camera could not start. Try again",
+            "setup.qr_status.invalid_code": "This QR code is not a household join code",
+            "setup.qr_status.reading": "Reading QR...",
+            "setup.qr_status.not_found": "No QR code found in that image. Try another one",
+            "setup.qr_status.detected": "QR detected. Review to join",
+            "setup.creating": "Creating...",
+            "setup.joining": "Joining...",
+            "archive.title": "Archive",
+            "archive.sort_month": "By month",
+            "archive.sort_settle": "By settle",
+            "archive.sort_person": "By person",
+            "archive.all_months": "All months",
+            "archive.all_settles": "All settles",
+            "archive.all_members": "All members",
+            "archive.confirm_action": "Confirm action",
+            "archive.settle_active": "Settle active expenses",
+            "archive.settle_help": "This will archive all active expenses and reset balances for everyone",
+            "archive.enter_password": "Enter your password",
+            "archive.password_help": "We ask for your password to prevent accidental settles",
+            "archive.confirm_settle": "Confirm settle",
+            "archive.total_archived": "Total archived",
+            "archive.expense_count": "expense",
+            "archive.no_archived": "No archived expenses",
+            "archive.danger_zone": "Danger zone",
+            "archive.settle_button": "Settle",
+            "archive.settle_label": "settle",
+            "archive.archived_expenses": "Archived Expenses",
+            "archive.items": "items",
+            "export.download_csv": "Export CSV",
+            "export.date": "Date",
+            "export.title": "Title",
+            "export.amount_iqd": "Amount (IQD)",
+            "export.payer": "Paid by",
+            "export.participants": "Participants",
+            "export.shares": "Shares (IQD)",
+            "export.settled_at": "Settled at",
+            "archive.settled_appear_here": "Settled expenses will appear here",
+            "profile.title": "Profile",
+            "profile.subtitle": "Update your account details and preferences",
+            "profile.email_verified": "Email verified",
+            "profile.email_unverified": "Email not verified",
+            "profile.resend_verification": "Resend verification email",
+            "profile.upload_photo": "Upload photo",
+            "profile.picture_alt": "Profile picture",
+            "profile.password_heading": "Password",
+            "profile.current_password": "Current password",
+            "profile.current_password_placeholder": "Leave blank to keep",
+            "profile.new_password": "New password",
+            "profile.confirm_new_password": "Confirm new password",
+            "profile.password_help": "Leave password fields empty to keep your current password",
+            "profile.save_changes": "Save changes",
+            "profile.danger_zone": "Danger zone",
+            "profile.delete_title": "Delete account",
+            "profile.delete_help": "This action cannot be undone",
+            "profile.confirm_password": "Confirm password",
+            "profile.delete_button": "Delete account",
+            "profile.delete_confirm": "Delete your account? This cannot be undone",
+            "profile.preferences": "Preferences",
+            "profile.preferences_subtitle": "Customize your language and theme settings",
+            "profile.language": "Language",
+            "profile.theme": "Theme",
+            "profile.dark": "Dark",
+            "profile.light": "Light",
+            "flash.fill_all_fields": "Please fill all fields",
+            "flash.email_registered": "Email already registered. Please login",
+            "flash.invalid_login": "Invalid email or password",
+            "flash.already_in_household": "You are already in a household",
+            "flash.invalid_join_code": "Invalid join code",
+            "flash.joined_household": "Joined household {name}",
+            "flash.name_empty": "Name cannot be empty",
+            "flash.email_empty": "Email cannot be empty",
+            "flash.email_invalid": "Please enter a valid email address",
+            "flash.email_in_use": "That email is already in use",
+            "flash.email_change_cancelled": "Email change cancelled",
+            "flash.email_change_cancel_failed": "Couldn't cancel email change. Please try again",
+            "flash.enter_current_password": "Enter your current password to change it",
+            "flash.current_password_incorrect": "Current password is incorrect",
+            "flash.new_passwords_no_match": "New passwords do not match",
+            "flash.passwords_no_match": "Passwords do not match",
+            "flash.password_too_weak": "Password must be at least {min_len} characters and include a letter and a number",
+            "flash.avatar_type_invalid": "Unsupported image type. Use PNG, JPG, or WEBP",
+            "flash.profile_updated": "Profile updated",
+            "flash.verification_email_sent": "Verification code sent. Please check your inbox",
+            "flash.email_verified": "Your email has been verified",
+            "flash.email_already_verified": "Your email is already verified",
+            "flash.verification_code_invalid": "That verification code is incorrect",
+            "flash.verification_code_expired": "That verification code has expired. Please request a new one",
+            "flash.password_reset_sent": "If that email is registered, you'll receive a reset link shortly",
+            "flash.password_reset_invalid": "That reset link is invalid or has expired",
+            "flash.password_reset_success": "Your password has been updated. You can log in now",
+            "flash.household_created": "Room created. Share the join code with your roommates",
+            "flash.password_required": "Please enter your password to confirm",
+            "flash.password_incorrect": "Incorrect password",
+            "flash.admin_cant_leave": "Admins can't leave the room",
+            "flash.settle_admin_only": "Only room admins can settle expenses",
+            "flash.left_household": "You left the room",
+            "flash.delete_account_blocked": "Remove other members or leave the room before deleting your account",
+            "flash.account_deleted": "Account deleted",
+            "flash.enter_join_code": "Please enter a join code",
+            "flash.already_in_this_household": "You're already in this room",
+            "flash.switched_household": "Switched to room {name}",
+            "flash.admin_cant_switch": "Admins can't switch rooms while other members are in the room. Remove members first",
+            "flash.use_leave_household": "Use 'Leave room' to remove yourself",
+            "flash.cant_remove_admin": "You can't remove the room admin",
+            "flash.user_not_member": "User is not a member of this room",
+            "flash.member_removed": "Member removed",
+            "flash.household_name_empty": "Room name cannot be empty",
+            "flash.household_name_updated": "Room name updated",
+            "flash.debt_mode_updated": "Payment suggestion mode updated",
+            "flash.title_required": "Title is required",
+            "flash.amount_positive": "Amount must be a positive integer (IQD)",
+            "flash.invalid_date": "Please enter a valid date",
+            "flash.select_participant": "Select at least one participant (who benefits from the expense)",
+            "flash.invalid_participants": "Invalid participants selected",
+            "flash.expense_added": "Expense added",
+            "flash.batch_added": "{count} expenses added",
+            "flash.batch_empty": "Add at least one expense",
+            "flash.batch_too_large": "You can add up to {max} expenses at once",
+            "flash.batch_line_error": "Line {line}: {error}",
+            "flash.import_no_file": "Choose a CSV or JSON file to import",
+            "flash.import_failed": "The file could not be read",
+            "flash.import_stopped": "The file could not be read after row {read}. The {inserted} expenses before it were imported; fix the file and import it again to add the rest",
+            "flash.import_done": "Imported {inserted} expenses ({duplicates} duplicates and {invalid} invalid rows skipped)",
+            "flash.only_payer_delete": "Only the payer can delete this expense",
+            "flash.expense_deleted": "Expense deleted",
+            "flash.nothing_to_settle": "Nothing to settle - no active expenses",
+            "flash.settled_up": "Settled up! Archived expenses for {month}. Balances are now reset",
+            "household.default_name": "My Household",
+        },
+        "ku": {
+            "app.name": "Daxli264",
+            "menu.open": "کردنەوەی لیست",
+            "menu.profile": "پڕۆفایل",
+            "menu.switch_theme": "گۆڕینی ڕووکار",
+            "menu.switch_to_light": "دۆخی ڕووناک",
+            "menu.switch_to_dark": "دۆخی تاریک",
+            "menu.language_to_en": "English",
+            "menu.language_to_ku": "کوردی",
+            "menu.logout": "چوونەدەرەوە",
+            "menu.settings": "ڕێکخستنەکان",
+            "nav.dashboard": "سەرەکی",
+            "nav.expenses": "خەرجییەکان",
+            "nav.household": "ژوور",
+            "nav.archive": "ئەرشیف",
+            "common.confirm_action": "دڵنیایت؟",
+            "common.save": "هەڵگرتن",
+            "common.cancel": "پاشگەزبوونەوە",
+            "common.confirm": "پشتڕاستکردنەوە",
+            "common.you": "تۆ",
+            "common.admin": "بەڕێوەبەر",
+            "common.delete": "سڕینەوە",
+            "common.add": "زیادکردن",
+            "common.filter": "فلتەر",
+            "common.or": "یان",
+            "common.password_placeholder": "وشەی تێپەڕ",
+            "common.logo": "لۆگۆ",
+            "common.saving": "خەریکە هەڵدەگیرێت...",
+            "common.sending": "ناردن...",
+            "login.title": "چوونەژوورەوە",
+            "login.email_label": "ئیمەیڵ",
+            "login.password_label": "وشەی تێپەڕ",
+            "login.button": "بچۆ ژوورەوە",
+            "login.create_account": "هەژمار دروست بکە",
+            "login.forgot_password": "وشەی تێپەڕت بیرچووە؟",
+            "login.email_placeholder": "ناو@نموونە.com",
+            "login.password_placeholder": "********",
+            "login.email_required": "ئیمەیڵ پێویستە",
+            "login.email_invalid": "تکایە ئیمەیڵێکی ڕاست بنووسە",
+            "login.password_required": "وشەی تێپەڕ بنووسە",
+            "login.logging_in": "خەریکە دەچیتە ژوورەوە...",
+            "login.invalid_credentials": "ئیمەیڵ یان وشەی تێپەڕ هەڵەیە",
+            "login.login": "چوونەژوورەوە",
+            "register.title": "دروستکردنی هەژمار",
+            "register.name_label": "ناوەکەت",
+            "register.email_label": "ئیمەیڵ",
+            "register.password_label": "وشەی تێپەڕ",
+            "register.confirm_password_label": "دووبارەکردنەوەی وشەی تێپەڕ",
+            "register.password_help": "دەبێت لانیکەم {min_len} نووسە بێت، پیت و ژمارەی تێدابێت",
+            "register.password_rules_title": "مەرجەکانی وشەی تێپەڕ",
+            "register.password_rule_length": "لانیکەم {min_len} نووسە",
+            "register.password_rule_letter": "لانیکەم ١ پیت (A–Z)",
+            "register.password_rule_number": "لانیکەم ١ ژمارە (0–9)",
+            "register.button": "تۆمارکردن",
+            "register.creating_account": "خەریکە هەژمار دروست دەکرێت...",
+            "register.have_account": "هەژمارت هەیە؟",
+            "register.name_placeholder": "ناوت لێرە بنووسە",
+            "register.email_placeholder": "name@example.com",
+            "register.password_placeholder": "********",
+            "register.email_step_title": "ئیمەیڵەکەت بنووسە",
+            "register.email_step_subtitle": "ئەم ئیمەیڵە بەکاردێت بۆ چوونەژوورەوە",
+            "register.email_required": "تکایە ئیمەیڵەکەت بنووسە",
+            "register.email_invalid": "ئیمەیڵەکە نادروستە",
+            "register.have_account_prefix": "پێشتر هەژمارت دروستکردووە؟",
+            "register.login_link": "بچۆ ژوورەوە",
+            "register.password_step_title": "وشەی تێپەڕ دابنێ",
+            "register.password_step_subtitle": "وشەیەکی بەهێز هەڵبژێرە",
+            "register.password_required": "وشەی تێپەڕ پێویستە",
+            "register.confirm_password_required": "تکایە وشەی تێپەڕ دووبارە بکەرەوە",
+            "register.verify_step_title": "ئیمەیڵەکەت بپشکنە",
+            "register.verify_step_subtitle": "کۆدێکی ٦ ژمارەییمان نارد بۆ",
+            "register.start_over": "دەستپێکردنەوە",
+            "register.change_email": "گۆڕینی ئیمەیڵ",
+            "register.profile_step_title": "ڕێکخستنی پڕۆفایل",
+            "register.profile_step_subtitle": "کەمێک زانیاری دەربارەی خۆت بنووسە",
+            "register.upload_photo": "وێنەیەک دابنێ",
+            "register.name_required": "تکایە ناوەکەت بنووسە",
+            "register.complete_button": "تەواوکردنی ڕێکخستن",
+            "verify.verifying": "خەریکە پشتڕاست دەکرێتەوە...",
+            "common.continue": "بەردەوامبە",
+            "common.back": "گەڕانەوە",
+            "common.something_went_wrong": "هەڵەیەک ڕوویدا، تکایە دووبارە هەوڵبدەوە",
+            "welcome.change_later_note": "دەتوانیت دواتر لە ڕێکخستنەکاندا ئەم زانیارییانە بگۆڕیت",
+            "reset.request_title": "گۆڕینی وشەی تێپەڕ",
+            "reset.request_help": "ئیمەیڵەکەت بنووسە بۆ ئەوەی لینکی گۆڕینت بۆ بنێرین",
+            "reset.email_label": "ئیمەیڵ",
+            "reset.email_placeholder": "you@example.com",
+            "reset.request_button": "ناردنی لینک",
+            "reset.title": "وشەی تێپەڕی نوێ",
+            "reset.password_label": "وشەی تێپەڕی نوێ",
+            "reset.confirm_password_label": "دووبارەکردنەوەی وشەی تێپەڕ",
+            "reset.submit_button": "نوێکردنەوە",
+            "email.greeting": "سڵاو",
+            "email.there": "بەکارهێنەر",
+            "email.thanks": "سوپاس،",
+            "email.button_not_working": "ئەگەر دوگمەکە کاری نەکرد، ئەم لینکە کۆپی بکە و لە وێبگەڕەکەتدا بیکەرەوە",
+            "email.ignore_if_not_requested": "ئەگەر تۆ داوای گۆڕینی وشەی تێپەڕت نەکردووە، دەتوانیت ئەم ئیمەیڵە پشتگوێ بخەیت",
+            "email.ignore_if_not_requested_account": "ئەگەر تۆ لە Daxli264 هەژمارت دروست نەکردووە، پشتگوێی بخە",
+            "email.verify.subject": "پشتڕاستکردنەوەی ئیمەیڵ - Daxli264",
+            "email.verify.code_is": "کۆدی پشتڕاستکردنەوەی تۆ:",
+            "email.verify.code_help": "ئەم کۆدە لە ئەپەکەدا بەکاربهێنە. کۆدەکە تەنها بۆ {ttl_hours} کاتژمێر کار دەکات",
+            "email.reset.subject": "گۆڕینی وشەی تێپەڕ - Daxli264",
+            "email.reset.received_request": "داواکارییەکمان پێگەیشت بۆ گۆڕینی وشەی تێپەڕ. ئەم لینکە بۆ {ttl_minutes} خولەک کار دەکات",
+            "email.settle.subject": "{household_name}: خەرجییەکان پاکتاوکران",
+            "email.settle.title": "خەرجییەکان پاکتاوکران",
+            "email.settle.intro": "{settled_by} {expense_count} خەرجی بە کۆی {total} لە {household_name} پاکتاو کرد",
+            "email.settle.period": "ماوە: {start} بۆ {end}",
+            "email.settle.you_pay": "{amount} بدە بە {name}",
+            "email.settle.you_receive": "{name} {amount} دەدات بە تۆ",
+            "email.settle.all_square": "هیچ پارەیەک نادەیت و وەرناگریت",
+            "email.settle.view_archive": "بینین لە ئەرشیف",
+            "verify.title": "پشتڕاستکردنەوە",
+            "verify.subtitle": "کۆدێکی ٦ ژمارەییمان نارد بۆ {email}",
+            "verify.help": "کۆدەکە لێرە بنووسە",
+            "verify.code_placeholder": "کۆدەکە بنووسە",
+            "verify.resend_button": "ناردنەوەی کۆد",
+            "verify.cancel_button": "هەڵوەشاندنەوە و گەڕانەوە",
+            "verify.logout_button": "چوونەدەرەوە",
+            "verify.didnt_receive": "کۆدەکەت پێ نەگەیشتووە؟ سپام بپشکنە یان",
+            "dashboard.welcome": "بەخێربێیت",
+            "dashboard.they_owe_you": "قەرزداری تۆن",
+            "dashboard.you_owe": "تۆ قەرزداریت",
+            "dashboard.settled": "پاکتاوکراوە",
+            "dashboard.spending_by_person": "خەرجییەکان بەپێی ئەندام",
+            "dashboard.household_total": "کۆی گشتی خەرجی ژوور",
+            "dashboard.suggested_payments": "پێشنیاری پارەدان",
+            "dashboard.no_payments": "هیچ پارەدانێک پێویست نییە",
+            "dashboard.you_pay": "تۆ دەدەیت بە",
+            "dashboard.pays": "دەدات بە",
+            "dashboard.members": "ئەندام",
+            "dashboard.since": "لە ڕێکەوتی",
+            "dashboard.all_settled": "هەموو حسابەکان پاکتاوکراون",
+            "expenses.title": "خەرجییەکان",
+            "expenses.add_title": "خەرجییەکی نوێ",
+            "expenses.title_label": "بابەت",
+            "expenses.title_placeholder": "بۆ نموونە: کڕینی سەوزە",
+            "expenses.amount_label": "بڕ (بە دینار)",
+            "expenses.amount_help": "جیاوازییەکە بە ٢٥٠ دینار دەبێت",
+            "expenses.date_label": "ڕێکەوت",
+            "expenses.participants_label": "بەشداربووان (کێ لێی سوودمەند بووە)",
+            "expenses.add_button": "زیادکردن",
+            "expenses.no_expenses": "هێشتا هیچ خەرجییەک تۆمار نەکراوە",
+            "expenses.delete_button": "سڕینەوە",
+            "expenses.delete_confirm": "دڵنیایت لە سڕینەوەی ئەم خەرجییە؟",
+            "expenses.filtered_by": "فلتەرکراوە بەپێی:",
+            "expenses.clear_filter": "لابردنی فلتەر",
+            "expenses.add_first": "بۆ دەستپێکردن، یەکەم خەرجی زیاد بکە",
+            "household.page_title": "ژوور",
+            "household.edit_name": "گۆڕینی ناوی ژوور",
+            "household.name_placeholder": "ناوی ژوور",
+            "household.remove_button": "لابردن",
+            "household.remove_confirm": "دڵنیایت لە لابردنی {name} لەم ژوورە؟",
+            "household.join_code": "کۆدی ژوور",
+            "household.scan_to_join": "سکان بکە بۆ هاتنەژوورەوە",
+            "household.qr_alt": "QR کۆدی هاتنەژوورەوە",
+            "household.danger_zone": "ناوچەی مەترسیدار",
+            "household.leave_title": "جێهێشتنی ژوور",
+            "household.leave_help": "دەتوانیت ئەم ژوورە جێبهێڵیت و بچیتە ژوورێکی تر",
+            "household.confirm_password": "وشەی تێپەڕت بنووسە",
+            "household.leave_button": "جێهێشتنی ژوور",
+            "household.leave_confirm": "دڵنیایت لە جێهێشتنی ژوورەکە؟",
+            "household.admin_transfer_warning": "وەک بەڕێوەبەر، ئەگەر بڕۆیت، بەڕێوەبەرایەتی دەدرێت بە کۆنترین ئەندام",
+            "household.removing": "خەریکە لادەبرێت...",
+            "household.leaving": "خەریکە جێدەهێڵرێت...",
+            "household.debt_mode_title": "پێشنیاری پارەدان",
+            "household.debt_mode_help": "دیاری بکە پێشنیارەکانی پارەدان لە داشبۆرد چۆن هەژمار بکرێن",
+            "household.debt_mode_greedy": "خێرا (گەورەترین بڕ سەرەتا)",
+            "household.debt_mode_minimal": "کەمترین ژمارەی پارەدان",
+            "setup.create_title": "دروستکردنی ژوور",
+            "setup.household_name_label": "ناوی ژوور",
+            "setup.household_name_placeholder": "ناوی ژوورەکە بنووسە",
+            "setup.create_button": "دروستکردن",
+            "setup.join_title": "چوونە ناو ژوور",
+            "setup.join_code_label": "کۆدی هاتنەژوورەوە",
+            "setup.join_code_placeholder": "کۆدەکە لێرە بنووسە",
+            "setup.join_button": "بچۆ ناو ژوور",
+            "setup.qr_title": "چوونەژوورەوە بە QR کۆد",
+            "setup.qr_description": "سکان بکە یان وێنەی QR کۆدەکە لێرە دابنێ",
+            "setup.qr_scan_button": "سکانکردن بە کامێرا",
+            "setup.qr_select_button": "هەڵبژاردن لە گەلەری",
+            "setup.qr_modal_title": "سکانکردنی کۆد",
+            "setup.qr_modal_subtitle": "بۆ هاتنە ناو ژوور",
+            "setup.qr_modal_help": "کامێراکەت ڕوو لە کۆدەکە بکە",
+            "setup.qr_close": "داخستن",
+            "setup.qr_detected": "کۆد دۆزرایەوە",
+            "setup.qr_join_button": "بچۆ ناو ژوور",
+            "setup.qr_scan_again": "دووبارە سکانکردنەوە",
+            "setup.qr_status.camera_not_supported": "کامێرا لەم وێبگەڕەدا کار ناکات",
+            "setup.qr_status.scanner_unavailable": "سکانەر بەردەست نییە، لاپەڕەکە نوێ بکەرەوە",
+            "setup.qr_status.starting_camera": "خەریکە کامێرا دەکرێتەوە...",
+            "setup.qr_status.camera_blocked": "ڕێگە بە کامێرا نەدراوە، تکایە مۆڵەت بدە",
+            "setup.qr_status.camera_failed": "کامێرا نەکرایەوە، دووبارە هەوڵبدەوە",
+            "setup.qr_status.invalid_code": "ئەم کۆدە هی هیچ ژوورێک نییە",
+            "setup.qr_status.reading": "خوێندنەوەی کۆد...",
+            "setup.qr_status.not_found": "هیچ کۆدێک لەم وێنەیەدا نەدۆزرایەوە",
+            "setup.qr_status.detected": "کۆد دۆزرایەوە، پشتڕاستی بکەرەوە",
+            "setup.creating": "خەریکە دروست دەکرێت...",
+            "setup.joining": "خەریکە دەچیتە ناو ژوور...",
+            "archive.title": "ئەرشیف",
+            "archive.sort_month": "بەپێی مانگ",
+            "archive.sort_settle": "بەپێی پاکتاوکردن",
+            "archive.sort_person": "بەپێی ئەندام",
+            "archive.all_months": "هەموو مانگەکان",
+            "archive.all_settles": "هەموو پاکتاوەکان",
+            "archive.all_members": "هەموو ئەندامەکان",
+            "archive.confirm_action": "دڵنیابوونەوە",
+            "archive.settle_active": "پاکتاوکردنی خەرجییەکان",
+            "archive.settle_help": "بەمە هەموو خەرجییەکان ئەرشیف دەکرێن و حسابی هەمووان دەبێتەوە بە سفر",
+            "archive.enter_password": "وشەی تێپەڕ بنووسە",
+            "archive.password_help": "بۆ ئەوەی بە هەڵە پاکتاو نەکرێت، وشەی تێپەڕ پێویستە",
+            "archive.confirm_settle": "پاکتاوکردن",
+            "archive.total_archived": "کۆی گشتی ئەرشیفکراو",
+            "archive.expense_count": "خەرجی",
+            "archive.no_archived": "هیچ خەرجییەکی ئەرشیفکراو نییە",
+            "archive.danger_zone": "ناوچەی مەترسیدار",
+            "archive.settle_button": "پاکتاوکردنی ئێستا",
+            "archive.settle_label": "پاکتاوکردن",
+            "archive.archived_expenses": "خەرجییە ئەرشیفکراوەکان",
+            "archive.items": "دانە",
+            "export.download_csv": "هەناردەکردنی CSV",
+            "export.date": "بەروار",
+            "export.title": "ناونیشان",
+            "export.amount_iqd": "بڕ (IQD)",
+            "export.payer": "پارەدەر",
+            "export.participants": "بەشداربووان",
+            "export.shares": "بەشەکان (IQD)",
+            "export.settled_at": "کاتی پاکتاوکردن",
+            "archive.settled_appear_here": "خەرجییە پاکتاوکراوەکان لێرە دەردەکەون",
+            "profile.title": "پڕۆفایل",
+            "profile.subtitle": "زانیارییەکانت نوێ بکەرەوە",
+            "profile.email_verified": "ئیمەیڵ پشتڕاستکراوەتەوە",
+            "profile.email_unverified": "ئیمەیڵ پشتڕاست نەکراوەتەوە",
+            "profile.resend_verification": "ناردنەوەی ئیمەیڵی پشتڕاستکردنەوە",
+            "profile.upload_photo": "گۆڕینی وێنە",
+            "profile.picture_alt": "وێنەی پڕۆفایل",
+            "profile.password_heading": "گۆڕینی وشەی تێپەڕ",
+            "profile.current_password": "وشەی تێپەڕی ئێستا",
+            "profile.current_password_placeholder": "بەتاڵی بکە ئەگەر ناتەوێت بیگۆڕیت",
+            "profile.new_password": "وشەی تێپەڕی نوێ",
+            "profile.confirm_new_password": "دووبارەکردنەوەی وشەی تێپەڕ",
+            "profile.password_help": "ئەگەر ناتەوێت وشەی تێپەڕ بگۆڕیت، ئەم خانانە پڕ مەکەرەوە",
+            "profile.save_changes": "هەڵگرتنی گۆڕانکارییەکان",
+            "profile.danger_zone": "ناوچەی مەترسیدار",
+            "profile.delete_title": "سڕینەوەی هەژمار",
+            "profile.delete_help": "ئەم کارە ناگەڕێتەوە و هەژمارەکەت بە یەکجاری دەسڕێتەوە",
+            "profile.confirm_password": "وشەی تێپەڕ بنووسە",
+            "profile.delete_button": "سڕینەوەی هەژمار",
+            "profile.delete_confirm": "دڵنیایت لە سڕینەوەی هەژمارەکەت؟",
+            "profile.preferences": "هەڵبژاردنەکان",
+            "profile.preferences_subtitle": "زمان و ڕووکاری بەرنامە بگۆڕە",
+            "profile.language": "زمان",
+            "profile.theme": "ڕووکار",
+            "profile.dark": "تاریک",
+            "profile.light": "ڕووناک",
+            "flash.fill_all_fields": "تکایە هەموو خانەکان پڕ بکەرەوە",
+            "flash.email_registered": "ئەم ئیمەیڵە پێشتر تۆمارکراوە، تکایە بچۆ ژوورەوە",
+            "flash.invalid_login": "ئیمەیڵ یان وشەی تێپەڕ هەڵەیە",
+            "flash.already_in_household": "تۆ پێشتر لە ناو ژوورێکدایت",
+            "flash.invalid_join_code": "کۆدەکە هەڵەیە، تکایە دڵنیابەرەوە",
+            "flash.joined_household": "چوویتە ناو ژووری {name}",
+            "flash.name_empty": "ناو پێویستە",
+            "flash.email_empty": "ئیمەیڵ پێویستە",
+            "flash.email_invalid": "تکایە ئیمەیڵێکی ڕاست بنووسە",
+            "flash.email_in_use": "ئەم ئیمەیڵە پێشتر بەکارهێنراوە",
+            "flash.email_change_cancelled": "گۆڕینی ئیمەیڵ هەڵوەشێندراوە",
+            "flash.email_change_cancel_failed": "نەتوانرا گۆڕینی ئیمەیڵ هەڵبوەشێنرێتەوە، دووبارە هەوڵبدە",
+            "flash.enter_current_password": "بۆ گۆڕین، دەبێت وشەی تێپەڕی ئێستات بنووسیت",
+            "flash.current_password_incorrect": "وشەی تێپەڕی ئێستا هەڵەیە",
+            "flash.new_passwords_no_match": "وشە تێپەڕە نوێیەکان وەک یەک نین",
+            "flash.passwords_no_match": "وشە تێپەڕەکان وەک یەک نین",
+            "flash.password_too_weak": "وشەی تێپەڕ دەبێت لانیکەم {min_len} نووسە بێت و پیت و ژمارەی تێدابێت",
+            "flash.avatar_type_invalid": "جۆری وێنەکە گونجاو نییە، تەنها PNG, JPG یان WEBP",
+            "flash.profile_updated": "زانیارییەکانت نوێکرانەوە",
+            "flash.verification_email_sent": "کۆدەکە نێردرا، تکایە ئیمەیڵەکەت بپشکنە",
+            "flash.email_verified": "ئیمەیڵەکەت پشتڕاستکرایەوە",
+            "flash.email_already_verified": "ئیمەیڵەکەت پێشتر پشتڕاستکراوەتەوە",
+            "flash.verification_code_invalid": "کۆدەکە هەڵەیە",
+            "flash.verification_code_expired": "کاتی کۆدەکە بەسەرچووە، داوای یەکێکی نوێ بکە",
+            "flash.password_reset_sent": "ئەگەر ئیمەیڵەکە تۆمار کرابێت، لینکی گۆڕینت بۆ دێت",
+            "flash.password_reset_invalid": "لینکەکە هەڵەیە یان کاتی بەسەرچووە",
+            "flash.password_reset_success": "وشەی تێپەڕ گۆڕدرا، ئێستا دەتوانیت بچیتە ژوورەوە",
+            "flash.household_created": "ژوور دروستکرا، کۆدەکە بدە بە هاوڕێکانت",
+            "flash.password_required": "بۆ دڵنیابوونەوە، وشەی تێپەڕ بنووسە",
+            "flash.password_incorrect": "وشەی تێپەڕ هەڵەیە",
+            "flash.admin_cant_leave": "بەڕێوەبەر ناتوانێت ژوور جێبهێڵێت",
+            "flash.settle_admin_only": "تەنها بەڕێوەبەر دەتوانێت پاکتاو بکات",
+            "flash.left_household": "ژوورەکەت جێهێشت",
+            "flash.delete_account_blocked": "پێش سڕینەوە، دەبێت ژوورەکە جێبهێڵیت یان ئەندامەکان لادەیت",
+            "flash.account_deleted": "هەژمارەکەت سڕایەوە",
+            "flash.enter_join_code": "تکایە کۆدی هاتنەژوورەوە بنووسە",
+            "flash.already_in_this_household": "تۆ پێشتر لەم ژوورەیت",
+            "flash.switched_household": "گواسترایەوە بۆ ژووری {name}",
+            "flash.admin_cant_switch": "بەڕێوەبەر ناتوانێت ژوور بگۆڕێت تا ئەندامی تر مابێت",
+            "flash.use_leave_household": "بۆ دەرچوون 'جێهێشتنی ژوور' بەکاربهێنە",
+            "flash.cant_remove_admin": "ناتوانیت بەڕێوەبەری ژوور لابەیت",
+            "flash.user_not_member": "ئەم بەکارهێنەرە ئەندامی ئەم ژوورە نییە",
+            "flash.member_removed": "ئەندامەکە لابرا",
+            "flash.household_name_empty": "ناوی ژوور نابێت بەتاڵ بێت",
+            "flash.household_name_updated": "ناوی ژوور گۆڕدرا",
+            "flash.debt_mode_updated": "شێوازی پێشنیاری پارەدان گۆڕدرا",
+            "flash.title_required": "ناونیشانی خەرجی بنووسە",
+            "flash.amount_positive": "بڕی پارە دەبێت ژمارەیەکی دروست بێت",
+            "flash.invalid_date": "تکایە بەروارێکی دروست بنووسە",
+            "flash.select_participant": "لانیکەم یەک کەس دیاری بکە کە خەرجییەکە دەگرێتەوە",
+            "flash.invalid_participants": "بەشداربووی هەڵە دیاری کراوە",
+            "flash.expense_added": "خەرجییەکە زیادکرا",
+            "flash.batch_added": "{count} خەرجی زیادکرا",
+            "flash.batch_empty": "لانیکەم یەک خەرجی زیاد بکە",
+            "flash.batch_too_large": "دەتوانیت تا {max} خەرجی لە یەک جاردا زیاد بکەیت",
+            "flash.batch_line_error": "دێڕی {line}: {error}",
+            "flash.import_no_file": "فایلێکی CSV یان JSON هەڵبژێرە بۆ هێنانە ناوەوە",
+            "flash.import_failed": "فایلەکە نەخوێندرایەوە",
+            "flash.import_stopped": "فایلەکە لە دوای دێڕی {read} نەخوێندرایەوە. ئەو {inserted} خەرجییەی پێش کێشەکە هێنرانە ناوەوە؛ فایلەکە چاک بکەرەوە و دووبارە بیهێنە ناوەوە بۆ زیادکردنی ئەوانی تر",
+            "flash.import_done": "{inserted} خەرجی هێنرایە ناوەوە ({duplicates} دووبارە و {invalid} دێڕی نادروست پشتگوێ خران)",
+            "flash.only_payer_delete": "تەنها ئەو کەسەی پارەکەی داوە دەتوانێت بیسڕێتەوە",
+            "flash.expense_deleted": "خەرجییەکە سڕایەوە",
+            "flash.nothing_to_settle": "هیچ خەرجییەک نییە بۆ پاکتاوکردن",
+            "flash.settled_up": "هەموو حسابەکان پاکتاوکران بۆ مانگی {month}",
+            "household.default_name": "ژوورەکەی من",
+        },
+    }
@@ -1,6 +1,12 @@
+import base64
+import binascii
+import json
 import secrets
-from datetime import datetime
-from fractions import Fraction
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from math import gcd, lcm
 
 
 def generate_join_code(length: int = 8) -> str:
@@ -12,6 +18,29 @@ def current_month_yyyy_mm() -> str:
     return datetime.now().strftime("%Y-%m")
 
 
+def current_month_start() -> date:
+    return datetime.now().date().replace(day=1)
+
+
+def parse_iso_date(value: str) -> date | None:
+    """Parse a YYYY-MM-DD string, returning None when it is missing or invalid."""
+    try:
+        return datetime.strptime((value or "").strip(), "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def month_bounds(value: str) -> tuple[date, date] | None:
+    """Return (first day, first day of the next month) for a YYYY-MM string, or None if invalid."""
+    try:
+        start = datetime.strptime((value or "").strip(), "%Y-%m").date()
+    except ValueError:
+        return None
+    if start.month == 12:
+        return start, start.replace(year=start.year + 1, month=1)
+    return start, start.replace(month=start.month + 1)
+
+
 def format_iqd(n: float | int) -> str:
     try:
         n_int = int(round(n))
@@ -20,17 +49,91 @@ def format_iqd(n: float | int) -> str:
     return f"{n_int:,} IQD"
 
 
-def _round_net_fractions_to_int(net_frac_by_user_id: dict[int, Fraction]) -> dict[int, int]:
+def encode_cursor(values) -> str:
+    """Encode a row's sort-key values as an opaque, URL-safe pagination cursor."""
+    items = []
+    for v in values:
+        if isinstance(v, datetime):
+            items.append({"dt": v.isoformat()})
+        elif isinstance(v, date):
+            items.append({"d": v.isoformat()})
+        else:
+            items.append(v)
+    raw = json.dumps(items, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str):
+    """Inverse of encode_cursor; returns None for a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        items = json.loads(raw)
+    except (ValueError, binascii.Error):
+        return None
+    if not isinstance(items, list):
+        return None
+    values = []
+    try:
+        for v in items:
+            if isinstance(v, dict) and "dt" in v:
+                values.append(datetime.fromisoformat(v["dt"]))
+            elif isinstance(v, dict) and "d" in v:
+                values.append(date.fromisoformat(v["d"]))
+            elif v is None or isinstance(v, (str, int)):
+                values.append(v)
+            else:
+                return None
+    except (TypeError, ValueError):
+        return None
+    return values
+
+
+class LRUTTLCache:
+    """Thread-safe LRU cache whose entries also expire ttl_seconds after being stored."""
+
+    def __init__(self, maxsize: int = 512, ttl_seconds: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+def _round_scaled_nets_to_int(net_scaled_by_user_id: dict[int, int], denom: int) -> dict[int, int]:
+    # Nets are exact rationals sharing one denominator: net = scaled / denom.
     base = {}
     frac_parts = []
     base_sum = 0
 
-    for uid, net in net_frac_by_user_id.items():
-        floor_int = net.numerator // net.denominator
-        base[uid] = int(floor_int)
-        base_sum += int(floor_int)
-        frac = net - floor_int
-        frac_parts.append((uid, frac))
+    for uid, scaled in net_scaled_by_user_id.items():
+        floor_int, remainder = divmod(scaled, denom)
+        base[uid] = floor_int
+        base_sum += floor_int
+        frac_parts.append((uid, remainder))
 
     residual = -base_sum
     if residual <= 0:
@@ -44,29 +147,206 @@ def _round_net_fractions_to_int(net_frac_by_user_id: dict[int, Fraction]) -> dic
     return base
 
 
-def compute_net_balances(users, expenses, participants_map):
+def _net_from_split_sums(paid: dict[int, int], consumed_by_split: dict[int, dict[int, int]]) -> dict[int, int]:
+    # consumed_by_split[uid][n] is the total of expenses split n ways that uid took part in.
+    # Scaling everything by the LCM of the split counts keeps the arithmetic on plain ints.
+    denom = 1
+    for n in {n for by_n in consumed_by_split.values() for n in by_n}:
+        denom = lcm(denom, n)
+
+    net_scaled = {}
+    for uid, paid_amt in paid.items():
+        consumed_scaled = sum(total * (denom // n) for n, total in consumed_by_split.get(uid, {}).items())
+        net_scaled[uid] = paid_amt * denom - consumed_scaled
+    return _round_scaled_nets_to_int(net_scaled, denom)
+
+
+def add_share(num: int, den: int, amount: int, n: int) -> tuple[int, int]:
+    """Return num/den + amount/n as a reduced (numerator, denominator) pair."""
+    new_den = lcm(den, n)
+    new_num = num * (new_den // den) + amount * (new_den // n)
+    g = gcd(new_num, new_den)
+    return new_num // g, new_den // g
+
+
+def split_amount(amount: int, user_ids) -> list[tuple[int, int]]:
+    """Split an expense equally into whole-IQD shares that add up to the amount.
+
+    Each participant's exact share is amount / n; the leftover IQD go one each
+    to the lowest user ids, the same tie-break _round_scaled_nets_to_int uses.
+    """
+    user_ids = sorted(user_ids)
+    if not user_ids:
+        return []
+    base, leftover = divmod(int(amount), len(user_ids))
+    return [(uid, base + (1 if i < leftover else 0)) for i, uid in enumerate(user_ids)]
+
+
+def net_balances_from_totals(totals_by_user_id: dict[int, tuple[int, int, int]]) -> dict[int, int]:
+    """Round per-user (paid, consumed_num, consumed_den) totals to integer nets."""
+    denom = 1
+    for _paid, _num, den in totals_by_user_id.values():
+        denom = lcm(denom, den)
+    net_scaled = {
+        uid: paid * denom - num * (denom // den)
+        for uid, (paid, num, den) in totals_by_user_id.items()
+    }
+    return _round_scaled_nets_to_int(net_scaled, denom)
+
+
+def _split_sums(users, expenses, participants_map):
     paid = {u.id: 0 for u in users}
-    consumed = {u.id: Fraction(0, 1) for u in users}
+    consumed = {u.id: {} for u in users}
 
     for e in expenses:
         # Skip expenses from payers no longer in the household
         if e.payer_id not in paid:
             continue
-        paid[e.payer_id] += int(e.amount_iqd)
+        amount = int(e.amount_iqd)
+        paid[e.payer_id] += amount
         parts = participants_map.get(e.id, [])
         if not parts:
             continue
 
         n = len(parts)
-        share = Fraction(int(e.amount_iqd), n)
         for uid in parts:
+            by_n = consumed.get(uid)
             # Skip participants no longer in the household
-            if uid not in consumed:
+            if by_n is None:
+                continue
+            by_n[n] = by_n.get(n, 0) + amount
+
+    return paid, consumed
+
+
+def compute_balance_totals(users, expenses, participants_map) -> dict[int, tuple[int, int, int]]:
+    """Per-user (paid, consumed_num, consumed_den) with the same rules as compute_net_balances."""
+    paid, consumed = _split_sums(users, expenses, participants_map)
+    totals = {}
+    for uid, paid_amt in paid.items():
+        num, den = 0, 1
+        for n, total in consumed[uid].items():
+            num, den = add_share(num, den, total, n)
+        totals[uid] = (paid_amt, num, den)
+    return totals
+
+
+def compute_net_balances(users, expenses, participants_map):
+    paid, consumed = _split_sums(users, expenses, participants_map)
+    return _net_from_split_sums(paid, consumed)
+
+
+def _numpy_or_none():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _batch_split_sums_python(household_ids, payer_ids, amounts_iqd, part_indptr, part_user_ids, members):
+    paid = {}
+    consumed = {}
+    for hid, uid in members:
+        paid.setdefault(hid, {})[uid] = 0
+        consumed.setdefault(hid, {})[uid] = {}
+
+    for i, hid in enumerate(household_ids):
+        hh_paid = paid.get(hid)
+        payer_id = payer_ids[i]
+        # Same rules as compute_net_balances: skip former payers and participants
+        if hh_paid is None or payer_id not in hh_paid:
+            continue
+        amount = int(amounts_iqd[i])
+        hh_paid[payer_id] += amount
+        start, stop = part_indptr[i], part_indptr[i + 1]
+        n = stop - start
+        if n <= 0:
+            continue
+        hh_consumed = consumed[hid]
+        for uid in part_user_ids[start:stop]:
+            by_n = hh_consumed.get(uid)
+            if by_n is None:
                 continue
-            consumed[uid] += share
+            by_n[n] = by_n.get(n, 0) + amount
+    return paid, consumed
+
+
+def _batch_split_sums_numpy(np, household_ids, payer_ids, amounts_iqd, part_indptr, part_user_ids, members):
+    m_hid = np.fromiter((hid for hid, _uid in members), dtype=np.int64, count=len(members))
+    m_uid = np.fromiter((uid for _hid, uid in members), dtype=np.int64, count=len(members))
+    e_hid = np.asarray(household_ids, dtype=np.int64)
+    e_payer = np.asarray(payer_ids, dtype=np.int64)
+    e_amount = np.asarray(amounts_iqd, dtype=np.int64)
+    indptr = np.asarray(part_indptr, dtype=np.int64)
+    p_uid = np.asarray(part_user_ids, dtype=np.int64)
+
+    # Encode (household_id, user_id) as one sortable key to look members up with searchsorted.
+    stride = int(max(m_uid.max(initial=0), e_payer.max(initial=0), p_uid.max(initial=0))) + 1
+    member_keys = m_hid * stride + m_uid
+    order = np.argsort(member_keys, kind="stable")
+    sorted_keys = member_keys[order]
+
+    def member_index(keys):
+        pos = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+        return order[pos], sorted_keys[pos] == keys
+
+    payer_idx, payer_ok = member_index(e_hid * stride + e_payer)
+    paid_arr = np.zeros(len(members), dtype=np.int64)
+    np.add.at(paid_arr, payer_idx[payer_ok], e_amount[payer_ok])
+
+    counts = np.diff(indptr)
+    part_expense = np.repeat(np.arange(len(e_hid)), counts)
+    part_idx, part_ok = member_index(e_hid[part_expense] * stride + p_uid)
+    part_ok &= payer_ok[part_expense]
+    part_n = counts[part_expense]
+
+    consumed_arrs = {}
+    for n in np.unique(part_n[part_ok]).tolist():
+        sel = part_ok & (part_n == n)
+        sums = np.zeros(len(members), dtype=np.int64)
+        np.add.at(sums, part_idx[sel], e_amount[part_expense[sel]])
+        consumed_arrs[n] = sums.tolist()
+
+    paid = {}
+    consumed = {}
+    paid_list = paid_arr.tolist()
+    for i, (hid, uid) in enumerate(members):
+        paid.setdefault(hid, {})[uid] = paid_list[i]
+        consumed.setdefault(hid, {})[uid] = {n: sums[i] for n, sums in consumed_arrs.items() if sums[i]}
+    return paid, consumed
+
 
-    net_frac = {uid: Fraction(paid[uid], 1) - consumed[uid] for uid in paid.keys()}
-    return _round_net_fractions_to_int(net_frac)
+def compute_household_nets_batch(
+    household_ids,
+    payer_ids,
+    amounts_iqd,
+    part_indptr,
+    part_user_ids,
+    member_household_ids,
+    member_user_ids,
+    use_numpy: bool | None = None,
+) -> dict[int, dict[int, int]]:
+    """Net balances for many households in one pass.
+
+    Expenses are columnar (one entry per expense); the participants of expense i
+    are part_user_ids[part_indptr[i]:part_indptr[i + 1]]. Members are given as
+    parallel household/user id columns. Results match compute_net_balances for
+    each household. NumPy is used when installed unless use_numpy is False.
+    """
+    members = list(zip(member_household_ids, member_user_ids))
+    np = _numpy_or_none() if use_numpy is not False else None
+    if use_numpy and np is None:
+        raise RuntimeError("NumPy is not installed")
+    if np is not None and members:
+        paid, consumed = _batch_split_sums_numpy(
+            np, household_ids, payer_ids, amounts_iqd, part_indptr, part_user_ids, members
+        )
+    else:
+        paid, consumed = _batch_split_sums_python(
+            household_ids, payer_ids, amounts_iqd, part_indptr, part_user_ids, members
+        )
+    return {hid: _net_from_split_sums(hh_paid, consumed[hid]) for hid, hh_paid in paid.items()}
 
 
 def simplify_debts(net_by_user_id):
@@ -98,3 +378,99 @@ def simplify_debts(net_by_user_id):
             creditors[j] = (c_uid, c_amt)
 
     return transfers
+
+
+DEBT_MODES = ("greedy", "minimal")
+
+# simplify_debts_optimal is O(2^n * n) in the number of unmatched non-zero balances and runs on
+# the request thread; at 12 the worst case is a few milliseconds (18 took up to half a second)
+OPTIMAL_DEBT_MAX_PARTIES = 12
+
+
+def _max_zero_sum_groups(amounts: list[int]) -> list[list[int]]:
+    # Partition indices into as many zero-sum groups as possible (DP over bitmasks).
+    n = len(amounts)
+    size = 1 << n
+    sums = [0] * size
+    best = [0] * size
+    for mask in range(1, size):
+        low = mask & -mask
+        sums[mask] = sums[mask ^ low] + amounts[low.bit_length() - 1]
+        top = 0
+        rest = mask
+        while rest:
+            bit = rest & -rest
+            if best[mask ^ bit] > top:
+                top = best[mask ^ bit]
+            rest ^= bit
+        best[mask] = top + (sums[mask] == 0)
+
+    # Walk back down, peeling one element at a time; every zero-sum prefix closes a group.
+    order = []
+    mask = size - 1
+    while mask:
+        want = best[mask] - (sums[mask] == 0)
+        rest = mask
+        while rest:
+            bit = rest & -rest
+            if best[mask ^ bit] == want:
+                break
+            rest ^= bit
+        order.append(bit.bit_length() - 1)
+        mask ^= bit
+
+    groups = []
+    current = []
+    running = 0
+    for i in reversed(order):
+        current.append(i)
+        running += amounts[i]
+        if running == 0:
+            groups.append(current)
+            current = []
+    if current:
+        # The amounts did not sum to zero (a member who left still had a share); settle what can be settled
+        groups.append(current)
+    return groups
+
+
+def simplify_debts_optimal(net_by_user_id, max_parties: int = OPTIMAL_DEBT_MAX_PARTIES):
+    """Settle balances with the minimum number of transfers.
+
+    Uses the fewest transfers possible by splitting members into the largest
+    number of zero-sum groups; each group of k members then needs k - 1
+    transfers. Falls back to simplify_debts when more than max_parties
+    balances remain after matching exact opposites. When the balances do not
+    sum to zero, the members left over after the zero-sum groups are settled
+    as far as possible with simplify_debts.
+    """
+    transfers = []
+    debtors_by_amount = {}
+    for uid, amt in net_by_user_id.items():
+        if amt < 0:
+            debtors_by_amount.setdefault(-amt, []).append(uid)
+
+    # A creditor and debtor with equal amounts always form a group of their own in some optimal solution.
+    remaining = {}
+    for uid, amt in net_by_user_id.items():
+        if amt > 0 and debtors_by_amount.get(amt):
+            transfers.append((debtors_by_amount[amt].pop(0), uid, amt))
+        elif amt > 0:
+            remaining[uid] = amt
+    for amt, uids in debtors_by_amount.items():
+        for uid in uids:
+            remaining[uid] = -amt
+
+    if len(remaining) > max_parties:
+        return transfers + simplify_debts(remaining)
+
+    uids = list(remaining)
+    for group in _max_zero_sum_groups([remaining[uid] for uid in uids]):
+        transfers.extend(simplify_debts({uids[i]: remaining[uids[i]] for i in group}))
+    return transfers
+
+
+def simplify_debts_for_mode(net_by_user_id, mode: str):
+    if mode == "minimal":
+        return simplify_debts_optimal(net_by_user_id)
+    return simplify_debts(net_by_user_id)